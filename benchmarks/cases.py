@@ -0,0 +1,237 @@
+"""
+Benchmark cases. Each case is a setup function taking a Context and returning the
+zero-argument callable to time (plus an item count for throughput, e.g. triangles).
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+from . import synthetic
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CONFIG_PATH = REPO_ROOT / "config" / "default.example.yaml"
+INPUT_PATH = REPO_ROOT / "examples" / "input_form4_basic.json"
+
+# (triangles, formats); ASCII is ~20x larger on disk, so it stops earlier
+QUICK_SIZES = ((12, ("binary", "ascii")), (10_000, ("binary", "ascii")), (200_000, ("binary",)))
+FULL_SIZES = QUICK_SIZES + ((200_000, ("ascii",)), (1_000_000, ("binary",)), (4_000_000, ("binary",)))
+QUOTES_PDF_PAGES = 100  # a batch or history export rendered into one PDF
+SERVER_TRIANGLES = 10_000  # uploads are capped at 10 MB by default (SLA_QUOTE_MAX_CAD_MB)
+
+
+@dataclass(frozen=True)
+class Context:
+    work_dir: Path
+
+    def stl(self, n_triangles: int, fmt: str = "binary") -> Path:
+        return synthetic.stl_file(self.work_dir, n_triangles, fmt)
+
+    def input_data(self) -> dict:
+        with INPUT_PATH.open("r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+Timed = Tuple[Callable[[], object], int]
+CASES: Dict[str, Callable[[Context], Timed]] = {}
+
+
+def case(name: str):
+    def register(fn: Callable[[Context], Timed]) -> Callable[[Context], Timed]:
+        CASES[name] = fn
+        return fn
+    return register
+
+
+def _priced(ctx: Context):
+    from sla_quote.config import load_compiled_config
+    from sla_quote.engine import compute_quote
+    from sla_quote.model import QuoteInput
+
+    cfg = load_compiled_config(CONFIG_PATH)
+    q = QuoteInput.model_validate(ctx.input_data())
+    return cfg, q, compute_quote(q, cfg)
+
+
+@case("engine.compute_quote")
+def _compute_quote(ctx: Context) -> Timed:
+    from sla_quote.engine import compute_quote
+
+    cfg, q, _ = _priced(ctx)
+    return (lambda: compute_quote(q, cfg)), 1
+
+
+@case("engine.compute_quote[raw-config]")
+def _compute_quote_raw(ctx: Context) -> Timed:
+    # library callers often pass the YAML dict straight through
+    from sla_quote.engine import compute_quote
+
+    cfg, q, _ = _priced(ctx)
+    return (lambda: compute_quote(q, cfg.raw)), 1
+
+
+@case("render.write_pdf")
+def _write_pdf(ctx: Context) -> Timed:
+    from sla_quote.render_pdf import write_pdf
+
+    _, q, r = _priced(ctx)
+    out = ctx.work_dir / "bench.pdf"
+    return (lambda: write_pdf(out, q, r)), 1
+
+
+def _quotes_pdf_case(name: str, use_forms: bool) -> None:
+    @case(name)
+    def _write_quotes_pdf(ctx: Context) -> Timed:
+        # one page per quote; the static layout goes in a form XObject unless use_forms=False
+        from sla_quote.render_pdf import write_quotes_pdf
+
+        _, q, r = _priced(ctx)
+        pages = [(q, r)] * QUOTES_PDF_PAGES
+        out = ctx.work_dir / f"bench-quotes-{use_forms}.pdf"
+        return (lambda: write_quotes_pdf(out, pages, use_forms=use_forms)), QUOTES_PDF_PAGES
+
+
+_quotes_pdf_case(f"render.write_quotes_pdf[{QUOTES_PDF_PAGES}]", True)
+_quotes_pdf_case(f"render.write_quotes_pdf[{QUOTES_PDF_PAGES}-inline]", False)
+
+
+@case("render.write_xlsx")
+def _write_xlsx(ctx: Context) -> Timed:
+    from sla_quote.render_xlsx import write_xlsx
+
+    _, q, r = _priced(ctx)
+    out = ctx.work_dir / "bench.xlsx"
+    return (lambda: write_xlsx(out, q, r)), 1
+
+
+def _stl_cases(sizes) -> None:
+    for n, formats in sizes:
+        for fmt in formats:
+            @case(f"geometry.load_stl_metrics[{fmt}-{n}]")
+            def _load(ctx: Context, n: int = n, fmt: str = fmt) -> Timed:
+                from sla_quote.geometry import load_stl_metrics
+
+                path = ctx.stl(n, fmt)
+                return (lambda: load_stl_metrics(path)), len(synthetic.mesh(n))
+
+
+_stl_cases(FULL_SIZES)
+
+
+@case("geometry.scan_stl_metrics[binary-200000]")
+def _scan(ctx: Context) -> Timed:
+    # the bounded-memory pass used above CHUNKED_METRICS_BYTES; compare with load_stl_metrics
+    from sla_quote.stl_stream import scan_stl_metrics
+
+    path = ctx.stl(200_000)
+    return (lambda: scan_stl_metrics(path)), len(synthetic.mesh(200_000))
+
+
+@case("geometry.split_bodies[plate-1000x2000]")
+def _split(ctx: Context) -> Timed:
+    from sla_quote.geometry import split_bodies
+
+    tri = synthetic.plate(1000, 2000)
+    return (lambda: split_bodies(tri)), len(tri)
+
+
+@case("geometry.orientation_report[binary-200000]")
+def _orientation(ctx: Context) -> Timed:
+    from sla_quote.config import load_compiled_config
+    from sla_quote.geometry import load_stl_triangles
+    from sla_quote.orientation import orientation_report
+
+    cfg = load_compiled_config(CONFIG_PATH)
+    tri = load_stl_triangles(ctx.stl(200_000))
+    return (lambda: orientation_report(tri, cfg)), len(tri)
+
+
+@case("supports.estimate_supports[binary-200000]")
+def _supports(ctx: Context) -> Timed:
+    from sla_quote.config import load_compiled_config
+    from sla_quote.geometry import load_stl_triangles
+    from sla_quote.supports import estimate_supports
+
+    spec = load_compiled_config(CONFIG_PATH).support
+    tri = load_stl_triangles(ctx.stl(200_000))
+    return (lambda: estimate_supports(tri, spec)), len(tri)
+
+
+@case("api.generate_quote_from_dict[binary-10000]")
+def _generate(ctx: Context) -> Timed:
+    from sla_quote.api import generate_quote_from_dict
+    from sla_quote.config import load_compiled_config
+
+    cfg = load_compiled_config(CONFIG_PATH)
+    data = ctx.input_data()
+    stl = ctx.stl(10_000)
+    out = ctx.work_dir / "dist"
+    return (lambda: generate_quote_from_dict(data, cfg, cad_file=stl, out_dir=out)), 1
+
+
+@case("api.generate_quote_from_dict[result-cache-hit]")
+def _generate_cached(ctx: Context) -> Timed:
+    from sla_quote.api import generate_quote_from_dict
+    from sla_quote.config import load_compiled_config
+    from sla_quote.result_cache import ResultCache
+
+    cfg = load_compiled_config(CONFIG_PATH)
+    data = ctx.input_data()
+    stl = ctx.stl(10_000)
+    out = ctx.work_dir / "dist"
+    cache = ResultCache(ctx.work_dir / "result-cache")
+    generate_quote_from_dict(data, cfg, cad_file=stl, out_dir=out, result_cache=cache)
+    return (lambda: generate_quote_from_dict(data, cfg, cad_file=stl, out_dir=out, result_cache=cache)), 1
+
+
+@case("server.quote[binary-10000]")
+def _server_quote(ctx: Context) -> Timed:
+    # thread workers, so the work (and its memory) stays in this process
+    os.environ.setdefault("SLA_QUOTE_EXECUTOR", "thread")
+    os.environ.setdefault("SLA_QUOTE_GEOMETRY_CACHE", "0")
+    os.environ.setdefault("SLA_QUOTE_RESULT_CACHE", "0")
+    os.environ.setdefault("SLA_QUOTE_JOURNAL", str(ctx.work_dir / "quotes.sqlite"))
+
+    import anyio
+    import httpx
+
+    from sla_quote.server import app
+
+    form = {
+        "input_json": json.dumps(ctx.input_data()),
+        "config_name": "default.example",
+        "out_dir": str(ctx.work_dir / "dist"),
+    }
+    stl = ctx.stl(SERVER_TRIANGLES).read_bytes()
+
+    async def post() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            files = {"cad_file": ("part.stl", io.BytesIO(stl), "model/stl")}
+            resp = await client.post("/quote", data=form, files=files)
+            resp.raise_for_status()
+
+    return (lambda: anyio.run(post)), 1
+
+
+def _cold_start(args) -> Callable[[], object]:
+    cmd = [sys.executable, "-c", "import sys; from sla_quote.cli import main; main(sys.argv[1:])", *args]
+    return lambda: subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL)
+
+
+@case("cli.cold_start[help]")
+def _cli_help(ctx: Context) -> Timed:
+    return _cold_start(["--help"]), 1
+
+
+@case("cli.cold_start[json-only]")
+def _cli_json_only(ctx: Context) -> Timed:
+    out = ctx.work_dir / "cli"
+    args = [str(INPUT_PATH), "--config", str(CONFIG_PATH), "--out", str(out), "--json-only", "--no-journal"]
+    return _cold_start(args), 1
@@ -0,0 +1,88 @@
+"""
+Import-time report, from `python -X importtime` in a fresh interpreter per run.
+
+    python -m benchmarks.importtime            # table
+    python -m benchmarks.importtime --json     # machine-readable
+    python -m benchmarks.importtime --repeat 7
+
+"eager" imports what `sla-quote` used to load before any argument was parsed (the
+geometry stack and both renderers), so its gap to "cli" is what lazy imports save.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+SCENARIOS: Dict[str, str] = {
+    "cli": "import sla_quote.cli",
+    "cli --help": "from sla_quote.cli import build_parser; build_parser().format_help()",
+    "api": "import sla_quote.api",
+    "eager": "import sla_quote.cli, sla_quote.geometry_cache, sla_quote.render_pdf, sla_quote.render_xlsx",
+}
+HEAVY = ("pydantic", "yaml", "numpy", "trimesh", "reportlab", "openpyxl", "fastapi")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) per line of -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            rows.append((m.group(4), int(m.group(1)), int(m.group(2)), len(m.group(3)) // 2))
+    return rows
+
+
+def measure(statement: str) -> List[Tuple[str, int, int, int]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement], cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    return parse_importtime(proc.stderr)
+
+
+def report(name: str, statement: str, repeat: int) -> Dict[str, Any]:
+    # the fastest run is the least disturbed by the rest of the machine
+    runs = [measure(statement) for _ in range(repeat)]
+    rows = min(runs, key=lambda rs: sum(r[1] for r in rs))
+    top = {mod: cum for mod, _, cum, depth in rows if depth == 0}
+    loaded = {mod for mod, _, _, _ in rows}
+    return {
+        "scenario": name,
+        "statement": statement,
+        "total_ms": round(sum(r[1] for r in rows) / 1000.0, 1),
+        "modules": len(rows),
+        "heavy_loaded": [h for h in HEAVY if h in loaded],
+        "slowest_ms": {mod: round(us / 1000.0, 1) for mod, us in sorted(top.items(), key=lambda kv: -kv[1])[:5]},
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(
+        prog="python -m benchmarks.importtime", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    p.add_argument("--repeat", type=int, default=5, help="interpreter runs per scenario (best is kept)")
+    p.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = p.parse_args(argv)
+
+    results = [report(name, stmt, args.repeat) for name, stmt in SCENARIOS.items()]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    print(f"{'scenario':<12}{'import ms':>10}{'modules':>9}  heavy dependencies loaded")
+    for r in results:
+        print(f"{r['scenario']:<12}{r['total_ms']:>10.1f}{r['modules']:>9}  {', '.join(r['heavy_loaded']) or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
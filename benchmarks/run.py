@@ -0,0 +1,188 @@
+"""
+Benchmark runner.
+
+    python -m benchmarks.run                              # quick sizes, JSON to stdout
+    python -m benchmarks.run --full --output bench.json   # adds 1M and 4M triangle meshes
+    python -m benchmarks.run --case 'geometry.*' --baseline benchmarks/baseline.json --threshold 0.25
+
+Every case runs in its own subprocess, so peak RSS is per case. With --baseline the run
+exits with status 1 if any case's median latency regressed by more than --threshold.
+"""
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .cases import CASES, FULL_SIZES, QUICK_SIZES, Context
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile (pct in 0..100)."""
+    xs = sorted(samples)
+    if not xs:
+        raise ValueError("No samples.")
+    k = (len(xs) - 1) * pct / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(xs) - 1)
+    return xs[lo] + (xs[hi] - xs[lo]) * (k - lo)
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def summarize(name: str, samples: Sequence[float], items: int, rss_mb: float) -> Dict[str, Any]:
+    mean = sum(samples) / len(samples)
+    return {
+        "case": name,
+        "runs": len(samples),
+        "mean_s": mean,
+        "min_s": min(samples),
+        "p50_s": percentile(samples, 50),
+        "p90_s": percentile(samples, 90),
+        "p99_s": percentile(samples, 99),
+        "max_s": max(samples),
+        "ops_per_s": 1.0 / mean if mean else None,
+        "items_per_op": items,
+        "items_per_s": items / mean if mean else None,
+        "peak_rss_mb": round(rss_mb, 1),
+    }
+
+
+def run_case(name: str, work_dir: Path, repeat: int, warmup: int, min_time: float) -> Dict[str, Any]:
+    """Time one case in this process (the worker side of the runner)."""
+    fn, items = CASES[name](Context(work_dir))
+    for _ in range(warmup):
+        fn()
+    samples: List[float] = []
+    started = time.perf_counter()
+    while len(samples) < repeat or (time.perf_counter() - started < min_time and len(samples) < 100 * repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(name, samples, items, peak_rss_mb())
+
+
+def _spawn(name: str, work_dir: Path, args: argparse.Namespace) -> Dict[str, Any]:
+    cmd = [
+        sys.executable, "-m", "benchmarks.run", "--worker", name, "--work-dir", str(work_dir),
+        "--repeat", str(args.repeat), "--warmup", str(args.warmup), "--min-time", str(args.min_time),
+    ]
+    proc = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"case": name, "error": proc.stderr.strip().splitlines()[-1:] or ["failed"]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results: Sequence[Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """Cases whose p50 grew by more than `threshold` (0.2 = 20%) over the baseline run."""
+    base = {r["case"]: r for r in baseline.get("results", []) if "p50_s" in r}
+    regressions = []
+    for r in results:
+        old = base.get(r["case"])
+        if old is None or "p50_s" not in r:
+            continue
+        ratio = r["p50_s"] / old["p50_s"] if old["p50_s"] else float("inf")
+        r["baseline_p50_s"] = old["p50_s"]
+        r["vs_baseline"] = round(ratio, 3)
+        if ratio > 1.0 + threshold:
+            regressions.append(
+                {"case": r["case"], "baseline_p50_s": old["p50_s"], "p50_s": r["p50_s"], "ratio": ratio}
+            )
+    return regressions
+
+
+def select_cases(patterns: Optional[Sequence[str]], full: bool) -> List[str]:
+    sizes = {f"[{fmt}-{n}]" for n, formats in (FULL_SIZES if full else QUICK_SIZES) for fmt in formats}
+    names = []
+    for name in CASES:
+        if "[" in name and name.startswith("geometry.load_stl_metrics") and name[name.index("["):] not in sizes:
+            continue
+        if patterns and not any(name == p or fnmatch.fnmatch(name, p) for p in patterns):
+            continue
+        names.append(name)
+    return names
+
+
+def build_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="python -m benchmarks.run", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    p.add_argument(
+        "--case", action="append", help="case name or glob, e.g. 'geometry.*' (repeatable); default: all"
+    )
+    p.add_argument("--list", action="store_true", help="list the selected cases and exit")
+    p.add_argument("--full", action="store_true", help="include the 1M/4M triangle and large ASCII meshes")
+    p.add_argument("--repeat", type=int, default=5, help="minimum timed runs per case (default 5)")
+    p.add_argument("--warmup", type=int, default=1)
+    p.add_argument("--min-time", type=float, default=0.5, help="keep sampling a case for at least this many seconds")
+    p.add_argument("--work-dir", default=None, help="where synthetic STLs are written (default: a temp dir)")
+    p.add_argument("--output", default=None, help="write the JSON report here instead of stdout")
+    p.add_argument("--baseline", default=None, help="JSON report to compare against")
+    p.add_argument("--threshold", type=float, default=0.2, help="allowed p50 slowdown vs baseline (default 0.2)")
+    p.add_argument("--worker", default=None, help=argparse.SUPPRESS)
+    return p
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(run_case(args.worker, Path(args.work_dir), args.repeat, args.warmup, args.min_time)))
+        return 0
+
+    names = select_cases(args.case, args.full)
+    if args.list:
+        print("\n".join(names))
+        return 0
+    if not names:
+        print("No benchmark cases match.", file=sys.stderr)
+        return 2
+
+    with tempfile.TemporaryDirectory(prefix="sla-quote-bench-") as tmp:
+        work_dir = Path(args.work_dir or tmp)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        results = []
+        for name in names:
+            print(f"{name} ...", file=sys.stderr, flush=True)
+            results.append(_spawn(name, work_dir, args))
+
+    report: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "results": results,
+    }
+    status = 1 if any("error" in r for r in results) else 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["regressions"] = compare(results, json.load(f), args.threshold)
+        report["threshold"] = args.threshold
+        if report["regressions"]:
+            status = 1
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    for r in report.get("regressions", []):
+        print(f"REGRESSION {r['case']}: p50 {r['p50_s']:.4f}s vs {r['baseline_p50_s']:.4f}s", file=sys.stderr)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
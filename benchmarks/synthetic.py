@@ -0,0 +1,85 @@
+"""Synthetic closed meshes and STL writers for the benchmarks."""
+from __future__ import annotations
+
+import math
+from pathlib import Path
+
+import numpy as np
+
+from sla_quote.geometry import STL_FACET_DTYPE
+
+
+def box(size=(20.0, 20.0, 20.0)) -> np.ndarray:
+    """The 12-triangle box."""
+    sx, sy, sz = size
+    c = np.array(
+        [[0, 0, 0], [sx, 0, 0], [sx, sy, 0], [0, sy, 0], [0, 0, sz], [sx, 0, sz], [sx, sy, sz], [0, sy, sz]],
+        dtype=np.float64,
+    )
+    faces = [(0, 2, 1), (0, 3, 2), (4, 5, 6), (4, 6, 7), (0, 1, 5), (0, 5, 4),
+             (1, 2, 6), (1, 6, 5), (2, 3, 7), (2, 7, 6), (3, 0, 4), (3, 4, 7)]
+    return c[np.array(faces)]
+
+
+def sphere(n_triangles: int, radius: float = 25.0) -> np.ndarray:
+    """Closed, outward-wound UV sphere with roughly n_triangles triangles."""
+    n_lat = max(int(math.sqrt(n_triangles / 4.0)), 2)
+    n_lon = max(n_triangles // (2 * n_lat), 3)
+    theta = np.linspace(0.0, np.pi, n_lat + 1)
+    phi = np.linspace(0.0, 2.0 * np.pi, n_lon + 1)
+    st, ct = np.sin(theta)[:, None], np.cos(theta)[:, None]
+    grid = np.stack(
+        np.broadcast_arrays(st * np.cos(phi), st * np.sin(phi), ct + 0.0 * phi), axis=-1
+    ) * radius + radius  # (n_lat + 1, n_lon + 1, 3), sitting on z = 0
+    # weld the seam and the poles so the mesh is closed
+    grid[:, -1] = grid[:, 0]
+    grid[0], grid[-1] = grid[0, 0], grid[-1, 0]
+
+    a, b = grid[:-1, :-1], grid[:-1, 1:]
+    c, d = grid[1:, :-1], grid[1:, 1:]
+    # the pole rows are single triangles, not quads
+    upper = np.stack([a, c, d], axis=2)[:-1].reshape(-1, 3, 3)
+    lower = np.stack([a, d, b], axis=2)[1:].reshape(-1, 3, 3)
+    return np.concatenate([upper, lower])
+
+
+def plate(n_bodies: int, triangles_per_body: int) -> np.ndarray:
+    """n_bodies separate small spheres in a grid on z = 0 (a multi-body STL), as float32."""
+    cols = math.ceil(math.sqrt(n_bodies))
+    ij = np.stack(np.divmod(np.arange(n_bodies), cols), axis=-1) * 12.0
+    offsets = np.column_stack([ij, np.zeros(n_bodies)])
+    return (sphere(triangles_per_body, radius=5.0)[None] + offsets[:, None, None]).reshape(-1, 3, 3).astype(np.float32)
+
+
+def mesh(n_triangles: int) -> np.ndarray:
+    return box() if n_triangles <= 12 else sphere(n_triangles)
+
+
+def write_binary(path: Path, triangles: np.ndarray) -> Path:
+    data = np.zeros(len(triangles), dtype=STL_FACET_DTYPE)
+    data["vertices"] = triangles
+    with Path(path).open("wb") as f:
+        f.write(b"\0" * 80)
+        f.write(np.uint32(len(triangles)).tobytes())
+        f.write(data.tobytes())
+    return Path(path)
+
+
+def write_ascii(path: Path, triangles: np.ndarray) -> Path:
+    lines = ["solid synthetic"]
+    for tri in np.asarray(triangles, dtype=np.float32):
+        lines.append("  facet normal 0 0 0\n    outer loop")
+        lines.extend(f"      vertex {x:.6e} {y:.6e} {z:.6e}" for x, y, z in tri)
+        lines.append("    endloop\n  endfacet")
+    lines.append("endsolid synthetic\n")
+    Path(path).write_text("\n".join(lines), encoding="ascii")
+    return Path(path)
+
+
+def stl_file(directory: Path, n_triangles: int, fmt: str = "binary") -> Path:
+    """Create (once) and return a synthetic STL of about n_triangles triangles."""
+    path = Path(directory) / f"synthetic-{n_triangles}-{fmt}.stl"
+    if not path.exists():
+        tri = mesh(n_triangles)
+        (write_binary if fmt == "binary" else write_ascii)(path, tri)
+    return path
@@ -2,17 +2,272 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
-from .engine import compute_quote
+from .config import CompiledConfig, ConfigLike, ensure_compiled, load_compiled_config
+from .engine import LineItem, QuoteResult, combine_quotes, compute_quote
 from .model import QuoteInput
-from .render_pdf import write_pdf
-from .render_xlsx import write_xlsx
-from .utils import load_config
-from .geometry import load_stl_metrics, check_fits_printer
+from .journal import QuoteJournal
+from .metrics import NO_TIMINGS, Timings
 
+# Geometry (numpy, trimesh) and the PDF/XLSX backends (reportlab, openpyxl) are imported
+# where they are used, so pricing-only callers and `sla-quote --help` start fast.
+if TYPE_CHECKING:
+    import numpy as np
 
-def _apply_cad_overrides(q: QuoteInput, cfg: Dict[str, Any], cad_file: Optional[Path]) -> Dict[str, Any]:
+    from .geometry import Bodies, StlMetrics, StlSource
+    from .geometry_cache import GeometryCache
+    from .nesting import Footprint
+    from .orientation import Matrix3, OrientationReport
+    from .config import SupportSpec
+    from .print_time import LayerProfile
+    from .result_cache import ResultCache
+    from .supports import SupportEstimate
+    from .sweep import PriceBreakTable
+
+# CAD content: the upload's bytes, or a file holding them (large uploads spooled to disk)
+CadBytes = Union[bytes, bytearray, memoryview, Path]
+
+
+# Bodies listed in the CAD metadata (largest first), and how many can be priced one by one
+MAX_LISTED_BODIES = 100
+MAX_SEPARATE_BODIES = 100
+
+
+class _PartGeometry:
+    """
+    Orientation, footprint and layer profile of what is being quoted: the whole STL or one of its
+    bodies. `triangles` loads it; `digest` keys its results in the geometry cache.
+
+    Without `triangles` (STLs past the block-wise scan threshold) the source is read one block
+    at a time and never held whole: the part is taken as modeled, with `bounds_in` as its fit.
+    """
+
+    def __init__(
+        self,
+        source: StlSource,
+        cache: Optional[GeometryCache],
+        digest: Optional[str],
+        triangles: Optional[Callable[[], np.ndarray]],
+        bounds_in: Optional[Tuple[float, float, float]] = None,
+    ) -> None:
+        self.source = source
+        self.cache = cache
+        self.digest = digest
+        self.triangles = triangles
+        self.bounds_in = bounds_in
+
+    def orientation(self, cfg: CompiledConfig) -> OrientationReport:
+        from .orientation import modeled_report, orientation_report
+
+        if self.triangles is None:
+            assert self.bounds_in is not None
+            return modeled_report(self.bounds_in, cfg)
+        if self.cache is not None:
+            return self.cache.orientation(self.source, cfg, digest=self.digest, triangles=self.triangles)[0]
+        return orientation_report(self.triangles(), cfg)
+
+    def footprint(self, rotation: Optional[Matrix3]) -> Footprint:
+        from .nesting import footprint
+        from .stl_stream import scan_footprint
+
+        if self.cache is not None:
+            return self.cache.footprint(self.source, digest=self.digest, rotation=rotation, triangles=self.triangles)[0]
+        if self.triangles is None:
+            return scan_footprint(self.source)
+        return footprint(self.triangles(), rotation)
+
+    def layer_profile(self, layer_height_mm: float, rotation: Optional[Matrix3]) -> LayerProfile:
+        from .orientation import rotate_triangles
+        from .print_time import layer_profile
+        from .stl_stream import scan_layer_profile
+
+        if self.cache is not None:
+            return self.cache.layer_profile(
+                self.source, layer_height_mm, digest=self.digest, rotation=rotation, triangles=self.triangles
+            )[0]
+        if self.triangles is None:
+            return scan_layer_profile(self.source, layer_height_mm)
+        triangles = self.triangles()
+        if rotation is not None:
+            triangles = rotate_triangles(triangles, rotation)
+        return layer_profile(triangles, layer_height_mm)
+
+    def supports(self, spec: SupportSpec, rotation: Optional[Matrix3]) -> SupportEstimate:
+        from .stl_stream import scan_supports
+        from .supports import estimate_supports
+
+        if self.cache is not None:
+            return self.cache.supports(
+                self.source, spec, digest=self.digest, rotation=rotation, triangles=self.triangles
+            )[0]
+        if self.triangles is None:
+            return scan_supports(self.source, spec)
+        return estimate_supports(self.triangles(), spec, rotation)
+
+
+def _body_parts(
+    source: StlSource, cache: Optional[GeometryCache], digest: Optional[str], bodies: Bodies
+) -> Callable[[int], _PartGeometry]:
+    """Geometry of body i; the STL is loaded (and re-split when the bodies came from the cache) once."""
+    from .geometry import load_stl_triangles, split_bodies
+
+    split: List[Tuple[np.ndarray, Bodies]] = []
+
+    def body_triangles(i: int) -> np.ndarray:
+        if not split:
+            triangles = load_stl_triangles(source)
+            split.append((triangles, bodies if bodies.labels is not None else split_bodies(triangles)))
+        triangles, labeled = split[0]
+        return labeled.triangles(triangles, i)
+
+    return lambda i: _PartGeometry(source, cache, f"{digest}:body{i}" if digest else None, lambda: body_triangles(i))
+
+
+def _place_part(
+    q: QuoteInput,
+    cfg: CompiledConfig,
+    part: _PartGeometry,
+    bounds_in: Tuple[float, float, float],
+    timings: Timings,
+) -> Dict[str, Any]:
+    """
+    Printer fit (rotating the part if it only fits that way), then nesting, the print-time and
+    the support-resin estimates unless q already gives builds / print_hours / support_volume_ml
+    (supports only with a support section in the config). A given print_hours covers the whole
+    job, so it is not nested either. Updates q.process; returns the metadata.
+    """
+    from .geometry import check_fits_printer
+    from .nesting import nest_for_printer
+    from .print_time import estimate_print_hours
+
+    meta: Dict[str, Any] = {}
+    with timings.stage("orientation"):
+        report = part.orientation(cfg)
+    fit = report.printers[q.process.printer]
+    check_fits_printer(cfg, q.process.printer, bounds_in, fit)
+    # slice (and report) the part the way it has to sit in the build volume
+    rotation = None if fit.as_modeled_fits else fit.rotation
+
+    builds = q.process.builds or 1
+    if q.process.builds is None and q.process.print_hours is None and q.process.qty > 1:
+        with timings.stage("nesting"):
+            nesting = nest_for_printer(part.footprint(rotation), cfg, q.process.printer, q.process.qty)
+        q.process.builds = builds = nesting.builds
+        meta["nesting"] = nesting.to_dict()
+
+    if q.process.print_hours is None:
+        spec = cfg.printer(q.process.printer).print_time
+        if spec is None:
+            raise ValueError(
+                f"print_hours not given and no print_time model for printer {q.process.printer} "
+                "(add printers.<name>.print_time to the config)."
+            )
+        with timings.stage("print_time"):
+            profile = part.layer_profile(spec.layer_height_mm, rotation)
+        # charged per build, so spread the total over the builds
+        hours = estimate_print_hours(profile, spec, q.process.qty, builds) / builds
+        q.process.print_hours = max(round(hours, 2), 0.01)
+        meta["print_hours_estimated"] = q.process.print_hours
+        meta["print_layers"] = profile.layers
+
+    if q.process.support_volume_ml is None and cfg.support is not None:
+        with timings.stage("supports"):
+            est = part.supports(cfg.support, rotation)
+        q.process.support_volume_ml = round(est.volume_ml, 3)
+        meta["support_volume_ml"] = q.process.support_volume_ml
+        meta["support_overhang_area_mm2"] = round(est.overhang_area_mm2, 1)
+
+    meta["stl_obb_in"] = [round(e, 3) for e in report.obb_extents_in]
+    meta["printer_fit"] = {
+        name: {
+            "fits": f.fits,
+            "needs_rotation": f.fits and not f.as_modeled_fits,
+            "extents_in": [round(e, 3) for e in f.extents_in],
+            "z_height_in": round(f.z_height_in, 3),
+        }
+        for name, f in report.printers.items()
+    }
+    if rotation is not None:
+        meta["orientation"] = [list(row) for row in rotation]
+    return meta
+
+
+def _body_summary(i: int, m: StlMetrics) -> Dict[str, Any]:
+    return {
+        "body": i + 1,
+        "volume_ml": float(m.volume_ml),
+        "bounds_in": [float(m.bounds_in[0]), float(m.bounds_in[1]), float(m.bounds_in[2])],
+        "is_watertight": bool(m.is_watertight),
+        "triangles": m.triangles,
+    }
+
+
+def _place_bodies_separately(
+    q: QuoteInput,
+    cfg: CompiledConfig,
+    bodies: Bodies,
+    body_part: Callable[[int], _PartGeometry],
+    timings: Timings,
+) -> List[Dict[str, Any]]:
+    """
+    Fit, nest and time every body as its own part (qty of each = q's qty). A given print_hours
+    or support_volume_ml covers the whole plate and is shared out by volume. q.process ends up
+    with the plate totals.
+    """
+    n = len(bodies.metrics)
+    if n > MAX_SEPARATE_BODIES:
+        raise ValueError(
+            f"STL has {n} bodies; pricing them separately is limited to {MAX_SEPARATE_BODIES}. "
+            'Use process.bodies="as_qty" for copies of one part, or quote the parts as a batch.'
+        )
+    total_ml = sum(m.volume_ml for m in bodies.metrics)
+    entries = []
+    for i, m in enumerate(bodies.metrics):
+        qb = q.model_copy(deep=True)
+        qb.process.part_volume_ml = float(m.volume_ml)
+        share = m.volume_ml / total_ml if total_ml > 0 else 1.0 / n
+        if q.process.print_hours is not None:
+            qb.process.print_hours = max(round(q.process.print_hours * share, 2), 0.01)
+        if q.process.support_volume_ml is not None:
+            qb.process.support_volume_ml = round(q.process.support_volume_ml * share, 3)
+        try:
+            placed = _place_part(qb, cfg, body_part(i), m.bounds_in, timings)
+        except ValueError as e:
+            raise ValueError(f"Body {i + 1} of {n}: {e}") from e
+        process = {
+            "part_volume_ml": qb.process.part_volume_ml,
+            "print_hours": qb.process.print_hours,
+            "builds": qb.process.builds or 1,
+            "support_volume_ml": qb.process.support_volume_ml,
+        }
+        entries.append({**_body_summary(i, m), **placed, "process": process})
+
+    builds = sum(e["process"]["builds"] for e in entries)
+    hours = sum(e["process"]["print_hours"] * e["process"]["builds"] for e in entries)
+    q.process.part_volume_ml = float(bodies.whole.volume_ml)
+    q.process.builds = builds
+    q.process.print_hours = max(round(hours / builds, 2), 0.01)
+    supports = [e["process"]["support_volume_ml"] for e in entries]
+    if all(s is not None for s in supports):
+        q.process.support_volume_ml = round(sum(supports), 3)
+    return entries
+
+
+def _apply_cad_overrides(
+    q: QuoteInput,
+    cfg: CompiledConfig,
+    cad_file: Optional[Path],
+    geometry_cache: Optional[GeometryCache] = None,
+    cad_bytes: Optional[CadBytes] = None,
+    timings: Timings = NO_TIMINGS,
+) -> Dict[str, Any]:
+    """
+    cad_file is the CAD path, or just its name when the content is passed in cad_bytes
+    (bytes, or the path of a spooled copy).
+    An STL with several disconnected bodies is priced the way q.process.bodies says; with
+    "separate", price it with compute_cad_quote (compute_quote sees only the plate totals).
+    """
     meta: Dict[str, Any] = {"input_file": str(cad_file) if cad_file else None}
 
     if not cad_file:
@@ -20,16 +275,50 @@ def _apply_cad_overrides(q: QuoteInput, cfg: Dict[str, Any], cad_file: Optional[
 
     cad_file = Path(cad_file)
     ext = cad_file.suffix.lower()
+    source: StlSource = cad_bytes if cad_bytes is not None else cad_file
 
     if ext != ".stl":
         meta["cad_supported"] = False
         meta["cad_note"] = f"{ext} accepted but not automated; export to STL for geometry extraction."
         return meta
 
-    m = load_stl_metrics(cad_file)
-    check_fits_printer(cfg, q.process.printer, m.bounds_in)
+    from .geometry import (
+        CHUNKED_METRICS_BYTES,
+        StlTooLargeToPlace,
+        is_large_stl,
+        load_stl_metrics,
+        load_stl_triangles,
+        source_size,
+        split_bodies,
+    )
+    from .geometry_cache import file_digest
 
-    q.process.part_volume_ml = float(m.volume_ml)
+    mode = q.process.bodies
+    bodies: Optional[Bodies] = None
+    # past the block-wise scan threshold the mesh is never loaded whole, so memory stays
+    # bounded however large the file is; splitting it into bodies needs it whole
+    large = is_large_stl(source)
+    if large and mode != "combined":
+        raise StlTooLargeToPlace(
+            f"{cad_file.name} is {source_size(source) / 1024 / 1024:.0f} MB; bodies {mode!r} splits the mesh "
+            f"in memory, which stops at {CHUNKED_METRICS_BYTES / 1024 / 1024:g} MB. Quote it with bodies 'combined'."
+        )
+    with timings.stage("stl_metrics"):
+        digest = file_digest(source) if geometry_cache is not None else None
+        hit = False
+        # the body split also yields the whole-mesh metrics
+        if not large:
+            if geometry_cache is not None:
+                bodies, hit = geometry_cache.bodies(source, digest=digest)
+            else:
+                bodies = split_bodies(load_stl_triangles(source))
+            m = bodies.whole
+        elif geometry_cache is not None:
+            m, hit = geometry_cache.stl_metrics(source, digest=digest)
+        else:
+            m = load_stl_metrics(source)
+        if geometry_cache is not None:
+            meta["geometry_cache"] = "hit" if hit else "miss"
 
     meta.update(
         {
@@ -37,32 +326,63 @@ def _apply_cad_overrides(q: QuoteInput, cfg: Dict[str, Any], cad_file: Optional[
             "stl_is_watertight": bool(m.is_watertight),
             "stl_volume_ml": float(m.volume_ml),
             "stl_bounds_in": [float(m.bounds_in[0]), float(m.bounds_in[1]), float(m.bounds_in[2])],
+            "stl_triangles": m.triangles,
+            "stl_boundary_edges": m.boundary_edges,
+            "stl_non_manifold_edges": m.non_manifold_edges,
         }
     )
-    return meta
-
+    if bodies is None or len(bodies.metrics) == 1 or mode == "combined":
+        q.process.part_volume_ml = float(m.volume_ml)
+        if large:
+            whole = _PartGeometry(source, geometry_cache, digest, None, m.bounds_in)
+            meta["cad_note"] = "Large STL: read block by block and placed as modeled (no orientation search)."
+        else:
+            whole = _PartGeometry(source, geometry_cache, digest, lambda: load_stl_triangles(source))
+        meta.update(_place_part(q, cfg, whole, m.bounds_in, timings))
+    elif mode == "as_qty":
+        # copies of one part: the largest body decides fit, nesting and print time
+        q.process.qty *= len(bodies.metrics)
+        q.process.part_volume_ml = float(m.volume_ml) / len(bodies.metrics)
+        body_part = _body_parts(source, geometry_cache, digest, bodies)
+        meta.update(_place_part(q, cfg, body_part(0), bodies.metrics[0].bounds_in, timings))
+    else:
+        body_part = _body_parts(source, geometry_cache, digest, bodies)
+        meta["bodies"] = _place_bodies_separately(q, cfg, bodies, body_part, timings)
 
-def generate_quote_from_dict(
-    input_data: Dict[str, Any],
-    cfg: Dict[str, Any],
-    cad_file: Optional[Path] = None,
-    out_dir: str | Path = "dist",
-) -> Tuple[Dict[str, Any], Path, Path]:
-    q = QuoteInput.model_validate(input_data)
-    cad_meta = _apply_cad_overrides(q, cfg, cad_file)
-
-    r = compute_quote(q, cfg)
+    if bodies is not None:
+        meta["stl_bodies"] = len(bodies.metrics)
+        if len(bodies.metrics) > 1:
+            meta["bodies_mode"] = mode
+            if mode != "separate":
+                listed = bodies.metrics[:MAX_LISTED_BODIES]
+                meta["bodies"] = [_body_summary(i, b) for i, b in enumerate(listed)]
+    return meta
 
-    outdir = Path(out_dir)
-    outdir.mkdir(parents=True, exist_ok=True)
 
-    pdf_path = outdir / f"QUOTE-{r.quote_id}.pdf"
-    xlsx_path = outdir / f"QUOTE-{r.quote_id}.xlsx"
+def compute_cad_quote(q: QuoteInput, cfg: ConfigLike, cad_meta: Dict[str, Any]) -> QuoteResult:
+    """
+    compute_quote for q after _apply_cad_overrides. When the STL's bodies were placed separately
+    each body is priced as its own part and the quotes are combined; per-job charges (docs
+    packet, inspection, outside services) go on the first body only. Fills in each body's sell_price.
+    """
+    if cad_meta.get("bodies_mode") != "separate":
+        return compute_quote(q, cfg)
+    parts = []
+    for i, body in enumerate(cad_meta["bodies"]):
+        qb = q.model_copy(deep=True)
+        for name, value in body["process"].items():
+            setattr(qb.process, name, value)
+        if i:
+            qb.options.docs_packet = qb.options.inspection = False
+            qb.outside_services = []
+        r = compute_quote(qb, cfg)
+        body["sell_price"] = r.sell_price
+        parts.append(r)
+    return combine_quotes(q.quote_id, parts)
 
-    write_pdf(pdf_path, q, r)
-    write_xlsx(xlsx_path, q, r)
 
-    result: Dict[str, Any] = {
+def result_to_dict(r: QuoteResult, extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    return {
         "quote_id": r.quote_id,
         "currency": r.currency,
         "qty": r.qty,
@@ -73,8 +393,212 @@ def generate_quote_from_dict(
         "loaded_cost": r.loaded_cost,
         "sell_price": r.sell_price,
         "price_per_part": r.price_per_part,
-        **cad_meta,
+        **(extra or {}),
     }
+
+
+def result_from_dict(d: Dict[str, Any]) -> QuoteResult:
+    """Inverse of result_to_dict (extra keys are ignored)."""
+    return QuoteResult(
+        quote_id=d["quote_id"],
+        currency=d["currency"],
+        qty=int(d["qty"]),
+        unit_discount_pct=float(d["unit_discount_pct"]),
+        line_items=[LineItem(li["name"], float(li["cost"])) for li in d["line_items"]],
+        direct_cost=float(d["direct_cost"]),
+        overhead=float(d["overhead"]),
+        loaded_cost=float(d["loaded_cost"]),
+        sell_price=float(d["sell_price"]),
+        price_per_part=float(d["price_per_part"]),
+    )
+
+
+def price_quote(
+    input_data: Dict[str, Any] | QuoteInput,
+    cfg: ConfigLike,
+    cad_file: Optional[Path] = None,
+    geometry_cache: Optional[GeometryCache] = None,
+    cad_bytes: Optional[CadBytes] = None,
+    timings: Timings = NO_TIMINGS,
+) -> Tuple[QuoteInput, QuoteResult, Dict[str, Any]]:
+    """
+    Validate, apply CAD overrides and price; no files are written.
+    Returns (input as priced, result, CAD metadata).
+    """
+    cfg = ensure_compiled(cfg)
+    with timings.stage("validate"):
+        if isinstance(input_data, QuoteInput):
+            q = input_data.model_copy(deep=True)
+        else:
+            q = QuoteInput.model_validate(input_data)
+    cad_meta = _apply_cad_overrides(q, cfg, cad_file, geometry_cache, cad_bytes, timings)
+    with timings.stage("compute_quote"):
+        r = compute_cad_quote(q, cfg, cad_meta)
+    return q, r, cad_meta
+
+
+def sweep_cad_quote(
+    input_data: Dict[str, Any] | QuoteInput,
+    cfg: ConfigLike,
+    cad_file: Path,
+    quantities: Optional[Sequence[int]] = None,
+    printers: Optional[Sequence[str]] = None,
+    resins: Optional[Sequence[str]] = None,
+    geometry_cache: Optional[GeometryCache] = None,
+) -> Tuple[QuoteInput, PriceBreakTable]:
+    """
+    sweep_quote with the part measured from its STL (as one part): volume from the mesh and, on
+    every printer it fits (rotated if need be), that printer's nesting and print time for each
+    qty (printers with a print_time model; the others keep q's print_hours) and its support
+    estimate. Printers the part does not fit are left out; STLs past the block-wise scan
+    threshold are only tried as modeled. Returns (input as swept, table).
+    """
+    from .geometry import is_large_stl, load_stl_metrics, load_stl_triangles
+    from .geometry_cache import file_digest
+    from .nesting import nest_for_printer
+    from .sweep import DEFAULT_SWEEP_QTYS, PrinterPlacement, sweep_combos, sweep_quote
+
+    cfg = ensure_compiled(cfg)
+    if isinstance(input_data, QuoteInput):
+        q = input_data.model_copy(deep=True)
+    else:
+        q = QuoteInput.model_validate(input_data)
+    cad_file = Path(cad_file)
+    if cad_file.suffix.lower() != ".stl":
+        raise ValueError(f"A sweep measures the part from an STL; got {cad_file.name}.")
+    qtys = [int(n) for n in (quantities or DEFAULT_SWEEP_QTYS)]
+
+    digest = file_digest(cad_file) if geometry_cache is not None else None
+    if geometry_cache is not None:
+        m = geometry_cache.stl_metrics(cad_file, digest=digest)[0]
+    else:
+        m = load_stl_metrics(cad_file)
+    q.process.part_volume_ml = float(m.volume_ml)
+    if is_large_stl(cad_file):
+        part = _PartGeometry(cad_file, geometry_cache, digest, None, m.bounds_in)
+    else:
+        part = _PartGeometry(cad_file, geometry_cache, digest, lambda: load_stl_triangles(cad_file))
+    report = part.orientation(cfg)
+
+    swept = list(dict.fromkeys(p for p, _ in sweep_combos(cfg, printers, resins)))
+    placements: Dict[str, PrinterPlacement] = {}
+    for printer in swept:
+        fit = report.printers[printer]
+        if not fit.fits:
+            continue
+        rotation = None if fit.as_modeled_fits else fit.rotation
+        spec = cfg.printer(printer).print_time
+        copies = profile = support = None
+        if spec is not None:
+            copies = nest_for_printer(part.footprint(rotation), cfg, printer, max(qtys, default=1)).copies_per_build
+            profile = part.layer_profile(spec.layer_height_mm, rotation)
+        if q.process.support_volume_ml is None and cfg.support is not None:
+            support = round(part.supports(cfg.support, rotation).volume_ml, 3)
+        placements[printer] = PrinterPlacement(copies, profile, support)
+    if not placements:
+        raise ValueError(f"Part does not fit any of the swept printers ({', '.join(swept)}).")
+    return q, sweep_quote(q, cfg, qtys, printers=list(placements), resins=resins, placements=placements)
+
+
+def _cached_result(
+    input_data: Dict[str, Any] | QuoteInput,
+    cfg: CompiledConfig,
+    cad_file: Optional[Path],
+    cad_bytes: Optional[CadBytes],
+    render: bool,
+    cache: ResultCache,
+    out_dir: str | Path,
+) -> Tuple[str, Optional[Tuple[Dict[str, Any], Dict[str, Path]]]]:
+    """(cache key, (result, artifact paths in out_dir) on a hit)."""
+    from .geometry_cache import file_digest
+    from .result_cache import quote_cache_key
+
+    q = input_data if isinstance(input_data, QuoteInput) else QuoteInput.model_validate(input_data)
+    cad_digest = cad_ext = None
+    if cad_file:
+        cad_digest = file_digest(cad_bytes if cad_bytes is not None else Path(cad_file))
+        cad_ext = Path(cad_file).suffix.lower()
+    key = quote_cache_key(q, cfg, cad_digest, cad_ext, render)
+    hit = cache.get(key)
+    if hit is None:
+        return key, None
+    result, artifacts, tier = hit
+    try:
+        paths = cache.materialize(artifacts, out_dir)
+    except FileNotFoundError:
+        return key, None  # evicted by another process between get() and the copy
+    result["result_cache"] = tier
+    return key, (result, paths)
+
+
+def generate_quote_from_dict(
+    input_data: Dict[str, Any] | QuoteInput,
+    cfg: ConfigLike,
+    cad_file: Optional[Path] = None,
+    out_dir: str | Path = "dist",
+    geometry_cache: Optional[GeometryCache] = None,
+    cad_bytes: Optional[CadBytes] = None,
+    render: bool = True,
+    journal: Optional[QuoteJournal] = None,
+    timings: Optional[Timings] = None,
+    result_cache: Optional[ResultCache] = None,
+) -> Tuple[Dict[str, Any], Optional[Path], Optional[Path]]:
+    """
+    input_data may be an already-validated QuoteInput (it is copied, not mutated).
+    Pass cad_bytes (with cad_file as the original file name) to quote an upload without a temp file.
+    With render=False no PDF/XLSX is written and both paths are None.
+    When a journal is given the priced input and result are appended to it.
+    Pass a Timings to get per-stage wall times in result["timings"].
+    With a result_cache, a repeat of the same input, config and CAD content returns the stored
+    result (result["result_cache"] says from which tier) and copies its artifacts into out_dir,
+    without pricing, rendering or journaling again.
+    """
+    t = timings if timings is not None else NO_TIMINGS
+    cfg = ensure_compiled(cfg)
+
+    cache_key = None
+    if result_cache is not None:
+        with t.stage("result_cache"):
+            cache_key, hit = _cached_result(input_data, cfg, cad_file, cad_bytes, render, result_cache, out_dir)
+        if hit is not None:
+            result, paths = hit
+            if timings is not None:
+                result["timings"] = timings.to_dict()
+            return result, paths.get("pdf"), paths.get("xlsx")
+
+    q, r, cad_meta = price_quote(input_data, cfg, cad_file, geometry_cache, cad_bytes, t)
+    result = result_to_dict(r, cad_meta)
+    if journal is not None:
+        with t.stage("journal"):
+            journal.record(q, result, cfg.digest)
+    if not render:
+        if cache_key is not None:
+            result_cache.put(cache_key, result)  # type: ignore[union-attr]
+            result["result_cache"] = "miss"
+        if timings is not None:
+            result["timings"] = timings.to_dict()
+        return result, None, None
+
+    from .render_pdf import write_pdf
+    from .render_xlsx import write_xlsx
+
+    outdir = Path(out_dir)
+    outdir.mkdir(parents=True, exist_ok=True)
+
+    pdf_path = outdir / f"QUOTE-{r.quote_id}.pdf"
+    xlsx_path = outdir / f"QUOTE-{r.quote_id}.xlsx"
+
+    with t.stage("write_pdf"):
+        write_pdf(pdf_path, q, r)
+    with t.stage("write_xlsx"):
+        write_xlsx(xlsx_path, q, r)
+    if cache_key is not None:
+        with t.stage("result_cache"):
+            result_cache.put(cache_key, result, {"pdf": pdf_path, "xlsx": xlsx_path})  # type: ignore[union-attr]
+        result["result_cache"] = "miss"
+
+    if timings is not None:
+        result["timings"] = timings.to_dict()
     return result, pdf_path, xlsx_path
 
 
@@ -83,8 +607,11 @@ def generate_quote_from_files(
     config_path: str | Path,
     cad_file_path: Optional[str | Path] = None,
     out_dir: str | Path = "dist",
+    geometry_cache: Optional[GeometryCache] = None,
+    journal: Optional[QuoteJournal] = None,
+    result_cache: Optional[ResultCache] = None,
 ) -> Dict[str, Any]:
-    cfg = load_config(config_path)
+    cfg = load_compiled_config(config_path)
 
     input_json_path = Path(input_json_path)
     with input_json_path.open("r", encoding="utf-8") as f:
@@ -96,15 +623,28 @@ def generate_quote_from_files(
         cfg=cfg,
         cad_file=cad_path,
         out_dir=out_dir,
+        geometry_cache=geometry_cache,
+        journal=journal,
+        result_cache=result_cache,
     )
 
+    return write_result_json(result, pdf_path, xlsx_path, out_dir)
+
+
+def write_result_json(
+    result: Dict[str, Any],
+    pdf_path: Optional[Path],
+    xlsx_path: Optional[Path],
+    out_dir: str | Path = "dist",
+) -> Dict[str, Any]:
+    """Write QUOTE-<id>.json next to the rendered artifacts and add the artifact_* paths."""
     outdir = Path(out_dir)
     outdir.mkdir(parents=True, exist_ok=True)
     json_path = outdir / f"QUOTE-{result['quote_id']}.json"
     with json_path.open("w", encoding="utf-8") as f:
         json.dump(result, f, indent=2)
 
-    result["artifact_pdf"] = str(pdf_path)
-    result["artifact_xlsx"] = str(xlsx_path)
+    result["artifact_pdf"] = str(pdf_path) if pdf_path else None
+    result["artifact_xlsx"] = str(xlsx_path) if xlsx_path else None
     result["artifact_json"] = str(json_path)
     return result
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .model import QuoteInput
+
+_QUOTE_ID_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9._-]{0,127}")
+
+ARTIFACT_KINDS = ("pdf", "xlsx")
+
+
+def default_store_dir() -> Path:
+    return Path(os.environ.get("SLA_QUOTE_STORE_DIR", "dist/quotes"))
+
+
+def safe_quote_id(quote_id: str) -> str:
+    """quote_id as a single safe path component; raises ValueError otherwise."""
+    if not _QUOTE_ID_RE.fullmatch(quote_id or ""):
+        raise ValueError(f"Invalid quote_id for storage: {quote_id!r}")
+    return quote_id
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return path
+
+
+class ArtifactStore:
+    """
+    Compact per-quote records (priced input + result JSON) with PDF/XLSX rendered on first
+    request and kept on disk. Rendered files are evicted least-recently-used once their
+    total size exceeds max_bytes; the records themselves are never evicted. Sizes and last
+    access of rendered files live in an SQLite index (<root>/artifacts.sqlite, shared by every
+    process using the root), so a render never walks the store.
+
+    Layout: <root>/<quote_id>/{input.json, result.json, QUOTE-<quote_id>.pdf|.xlsx}
+    """
+
+    def __init__(self, root: str | Path | None = None, max_bytes: Optional[int] = None) -> None:
+        self.root = Path(root) if root else default_store_dir()
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("SLA_QUOTE_ARTIFACT_CACHE_MB", "512")) * 1024 * 1024)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None  # opened on first render or access
+
+    def _index(self) -> sqlite3.Connection:
+        # caller holds the lock
+        if self._db is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.root / "artifacts.sqlite"), timeout=30.0, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            new = db.execute("SELECT 1 FROM sqlite_master WHERE name = 'artifacts'").fetchone() is None
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS artifacts ("
+                " path TEXT PRIMARY KEY, bytes INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS artifacts_lru ON artifacts(last_access)")
+            if new:  # a store rendered before the index existed: take stock once
+                for kind in ARTIFACT_KINDS:
+                    for p in self.root.glob(f"*/QUOTE-*.{kind}"):
+                        try:
+                            st = p.stat()
+                        except FileNotFoundError:
+                            continue
+                        db.execute(
+                            "INSERT OR IGNORE INTO artifacts (path, bytes, last_access) VALUES (?, ?, ?)",
+                            (self._key(p), st.st_size, st.st_mtime),
+                        )
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def _dir(self, quote_id: str) -> Path:
+        return self.root / safe_quote_id(quote_id)
+
+    def save(self, q: QuoteInput, result: Dict[str, Any]) -> Path:
+        """Persist a priced quote; drops previously rendered artifacts for the same id."""
+        d = self._dir(result["quote_id"])
+        stale = [p for p in (d / f"QUOTE-{result['quote_id']}.{kind}" for kind in ARTIFACT_KINDS) if p.exists()]
+        if stale:
+            with self._lock:
+                db = self._index()
+                for p in stale:
+                    p.unlink(missing_ok=True)
+                db.executemany("DELETE FROM artifacts WHERE path = ?", [(self._key(p),) for p in stale])
+                db.commit()
+        atomic_write_bytes(d / "input.json", q.model_dump_json().encode("utf-8"))
+        atomic_write_bytes(d / "result.json", json.dumps(result).encode("utf-8"))
+        return d
+
+    def load(self, quote_id: str) -> Tuple[QuoteInput, Dict[str, Any]]:
+        d = self._dir(quote_id)
+        if not (d / "result.json").exists():
+            raise FileNotFoundError(f"Quote not found: {quote_id}")
+        q = QuoteInput.model_validate_json((d / "input.json").read_bytes())
+        result = json.loads((d / "result.json").read_text(encoding="utf-8"))
+        return q, result
+
+    def artifact(self, quote_id: str, kind: str) -> Path:
+        """Path to the rendered artifact, rendering it now if it is not cached."""
+        if kind not in ARTIFACT_KINDS:
+            raise ValueError(f"Unknown artifact kind: {kind}")
+        path = self._dir(quote_id) / f"QUOTE-{quote_id}.{kind}"
+        if path.exists():
+            with self._lock:
+                db = self._index()
+                db.execute("UPDATE artifacts SET last_access = ? WHERE path = ?", (time.time(), self._key(path)))
+                db.commit()
+            return path
+
+        from .api import result_from_dict
+
+        q, result = self.load(quote_id)
+        r = result_from_dict(result)
+        render: Callable[..., Any]
+        if kind == "pdf":
+            from .render_pdf import write_pdf as render
+        else:
+            from .render_xlsx import write_xlsx as render
+
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=f".{kind}")
+        os.close(fd)
+        try:
+            render(Path(tmp), q, r)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            db = self._index()
+            db.execute(
+                "INSERT OR REPLACE INTO artifacts (path, bytes, last_access) VALUES (?, ?, ?)",
+                (self._key(path), path.stat().st_size, time.time()),
+            )
+            db.commit()
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Optional[Path] = None) -> int:
+        """
+        Delete least-recently-used rendered artifacts above max_bytes (never `keep`,
+        the file about to be served); returns bytes freed.
+        """
+        with self._lock:
+            db = self._index()
+            (total,) = db.execute("SELECT COALESCE(SUM(bytes), 0) FROM artifacts").fetchone()
+            if total <= self.max_bytes:
+                return 0
+            keep_key = self._key(keep) if keep is not None else None
+            victims = []
+            freed = 0
+            for key, size in db.execute("SELECT path, bytes FROM artifacts ORDER BY last_access ASC"):
+                if total - freed <= self.max_bytes:
+                    break
+                if key == keep_key:
+                    continue
+                victims.append(key)
+                freed += size
+            for key in victims:
+                (self.root / key).unlink(missing_ok=True)
+            db.executemany("DELETE FROM artifacts WHERE path = ?", [(k,) for k in victims])
+            db.commit()
+            return freed
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
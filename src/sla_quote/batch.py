@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Sequence, Union
+
+import numpy as np
+
+from .config import CompiledConfig, ConfigLike, ensure_compiled
+from .engine import LineItem, QuoteResult
+from .model import QuoteInput
+
+# (option flag, CompiledConfig cost attribute, scales with qty); same order as compute_quote
+_LABOR_STEPS = (
+    ("wash_cure", "wash_cure_cost_per_part", True),
+    ("support_removal", "support_removal_cost_per_part", True),
+    ("finishing", "finishing_cost_per_part", True),
+    ("packaging", "packaging_cost_per_part", True),
+    ("docs_packet", "docs_cost_per_job", False),
+    ("inspection", "inspection_cost_per_job", False),
+)
+
+Columns = Mapping[str, Any]
+
+
+@dataclass(frozen=True)
+class QuoteBatch:
+    """
+    Columnar pricing results, one array element per quote.
+    Values are unrounded; use `results()` for QuoteResult objects identical to compute_quote.
+    """
+    quote_id: List[str]
+    currency: str
+    qty: np.ndarray
+    unit_discount_pct: np.ndarray
+    material: np.ndarray
+    machine: np.ndarray
+    labor: np.ndarray
+    outside_services: np.ndarray
+    direct_cost: np.ndarray
+    overhead: np.ndarray
+    loaded_cost: np.ndarray
+    sell_price: np.ndarray
+    price_per_part: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.quote_id)
+
+    def results(self) -> List[QuoteResult]:
+        out: List[QuoteResult] = []
+        cols = zip(
+            self.quote_id,
+            self.qty.tolist(),
+            self.unit_discount_pct.tolist(),
+            self.material.tolist(),
+            self.machine.tolist(),
+            self.labor.tolist(),
+            self.outside_services.tolist(),
+            self.direct_cost.tolist(),
+            self.overhead.tolist(),
+            self.loaded_cost.tolist(),
+            self.sell_price.tolist(),
+            self.price_per_part.tolist(),
+        )
+        for qid, qty, disc, mat, mach, lab, osv, direct, ovh, loaded, sell, ppp in cols:
+            out.append(
+                QuoteResult(
+                    quote_id=qid,
+                    currency=self.currency,
+                    qty=int(qty),
+                    unit_discount_pct=round(disc, 4),
+                    line_items=[
+                        LineItem("Material", round(mat, 2)),
+                        LineItem("Machine Time", round(mach, 2)),
+                        LineItem("Labor", round(lab, 2)),
+                        LineItem("Outside Services", round(osv, 2)),
+                    ],
+                    direct_cost=round(direct, 2),
+                    overhead=round(ovh, 2),
+                    loaded_cost=round(loaded, 2),
+                    sell_price=round(sell, 2),
+                    price_per_part=round(ppp, 2),
+                )
+            )
+        return out
+
+
+def quotes_to_columns(quotes: Sequence[QuoteInput]) -> Dict[str, Any]:
+    """
+    Flatten QuoteInput objects into the columnar form accepted by compute_quotes_batch.
+    `outside_services` becomes the marked-up total per quote.
+    """
+    missing = [q.quote_id for q in quotes if q.process.print_hours is None]
+    if missing:
+        raise ValueError(f"print_hours is required for batch pricing (missing on: {', '.join(missing[:5])}).")
+    cols: Dict[str, Any] = {
+        "quote_id": [q.quote_id for q in quotes],
+        "printer": [q.process.printer for q in quotes],
+        "resin": [q.process.resin for q in quotes],
+        "part_volume_ml": [q.process.part_volume_ml for q in quotes],
+        "support_volume_ml": [q.process.support_volume_ml or 0.0 for q in quotes],
+        "qty": [q.process.qty for q in quotes],
+        "print_hours": [q.process.print_hours for q in quotes],
+        "builds": [q.process.builds or 1 for q in quotes],
+        "expedite_multiplier": [q.options.expedite_multiplier for q in quotes],
+    }
+    for flag, _, _ in _LABOR_STEPS:
+        cols[flag] = [getattr(q.options, flag) for q in quotes]
+
+    outside: List[float] = []
+    for q in quotes:
+        total = 0.0
+        for svc in q.outside_services:
+            total += float(svc.vendor_cost) * (1.0 + float(svc.markup_pct))
+        outside.append(total)
+    cols["outside_services"] = outside
+    return cols
+
+
+def _lookup(names: Sequence[str], table: Dict[str, float]) -> np.ndarray:
+    uniq = {n: table[n] for n in set(names)}
+    return np.fromiter((uniq[n] for n in names), dtype=np.float64, count=len(names))
+
+
+def volume_unit_discount_pct_array(cfg: ConfigLike, qty: np.ndarray) -> np.ndarray:
+    """Vectorized pricing.volume_unit_discount_pct."""
+    cc = ensure_compiled(cfg)
+    qty = np.asarray(qty, dtype=np.int64)
+    if not cc.tier_min_qty:
+        return np.zeros(qty.shape, dtype=np.float64)
+    best = np.asarray(cc.tier_best_pct, dtype=np.float64)
+    idx = np.searchsorted(np.asarray(cc.tier_min_qty, dtype=np.int64), qty, side="right") - 1
+    pct = np.where(idx >= 0, best[np.clip(idx, 0, None)], 0.0)
+    return np.clip(pct, 0.0, 0.20)
+
+
+def compute_quotes_batch(quotes: Union[Sequence[QuoteInput], Columns], cfg: ConfigLike) -> QuoteBatch:
+    """
+    Price many quotes in one NumPy pass.
+
+    `quotes` is either a sequence of QuoteInput or a mapping of equal-length columns
+    (see quotes_to_columns for the keys; option flags default to the Options defaults,
+    `builds` to 1, `support_volume_ml` and `outside_services` to 0 and `expedite_multiplier`
+    to the policy default).
+    """
+    cols = quotes if isinstance(quotes, Mapping) else quotes_to_columns(quotes)
+
+    cc: CompiledConfig = ensure_compiled(cfg)
+
+    quote_ids = list(cols["quote_id"])
+    n = len(quote_ids)
+
+    qty = np.asarray(cols["qty"], dtype=np.int64)
+    qty_f = qty.astype(np.float64)
+    if n and qty.min() < 1:
+        raise ValueError("qty must be >= 1 for every quote.")
+
+    # resin/material
+    resins = list(cols["resin"])
+    specs = {name: cc.resin(name) for name in set(resins)}
+    cost_per_ml = _lookup(resins, {k: v.cost_per_ml for k, v in specs.items()})
+    waste_pct = _lookup(resins, {k: v.waste_pct for k, v in specs.items()})
+
+    volume = np.asarray(cols["part_volume_ml"], dtype=np.float64)
+    volume = volume + np.asarray(cols.get("support_volume_ml", np.zeros(n)), dtype=np.float64)
+    material = (volume * qty_f) * (1.0 + waste_pct) * cost_per_ml
+
+    printers = list(cols["printer"])
+    machine_rate = _lookup(printers, {p: cc.machine_rate(p) for p in set(printers)})
+    builds = np.asarray(cols.get("builds", np.ones(n)), dtype=np.float64)
+    machine = np.asarray(cols["print_hours"], dtype=np.float64) * machine_rate * builds
+
+    # labor standards (same accumulation order as compute_quote)
+    defaults = QuoteInput.model_fields["options"].default
+    labor = 0.0 + cc.setup_cost_per_job * builds
+    for flag, cost_attr, per_part in _LABOR_STEPS:
+        enabled = np.asarray(cols.get(flag, [getattr(defaults, flag)] * n), dtype=bool)
+        if not enabled.any():
+            continue
+        cost = getattr(cc, cost_attr)
+        step = cost * qty_f if per_part else np.full(n, cost)
+        labor = labor + np.where(enabled, step, 0.0)
+
+    outside = np.asarray(cols.get("outside_services", np.zeros(n)), dtype=np.float64)
+
+    expedite = np.asarray(cols.get("expedite_multiplier", np.zeros(n)), dtype=np.float64)
+    expedite = np.where(expedite != 0.0, expedite, cc.expedite_default)
+    machine = machine * expedite
+    labor = labor * expedite
+    outside = outside * expedite
+
+    direct = material + machine + labor + outside
+    overhead = direct * cc.overhead_pct
+    loaded = direct + overhead
+    sell = loaded / (1.0 - cc.margin_pct) if cc.margin_pct < 1.0 else loaded
+
+    unit_disc = volume_unit_discount_pct_array(cc, qty)
+    sell = sell * (1.0 - unit_disc)
+    ppp = sell / qty_f
+
+    return QuoteBatch(
+        quote_id=quote_ids,
+        currency=cc.currency,
+        qty=qty,
+        unit_discount_pct=unit_disc,
+        material=material,
+        machine=machine,
+        labor=labor,
+        outside_services=outside,
+        direct_cost=direct,
+        overhead=overhead,
+        loaded_cost=loaded,
+        sell_price=sell,
+        price_per_part=ppp,
+    )
@@ -1,20 +1,20 @@
 from __future__ import annotations
 
+import os
 import sys
 import argparse
 import json
 import textwrap
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
-from .utils import load_config
-from .model import QuoteInput
-from .engine import compute_quote
-from .render_pdf import write_pdf
-from .render_xlsx import write_xlsx
-from .geometry import load_stl_metrics, check_fits_printer
+# Everything below the standard library is imported inside the command that needs it:
+# pydantic, numpy, reportlab and openpyxl together cost ~0.4 s of start-up, and
+# `--help` or a `--json-only` quote without a CAD file should not pay for the renderers.
+if TYPE_CHECKING:
+    from .journal import QuoteJournal
 
 ALLOWED_EXTS = {".sldprt", ".igs", ".iges", ".x_t", ".step", ".stp", ".stl"}
-MAX_BYTES = 10 * 1024 * 1024  # 10 MB
 
 
 def build_parser() -> argparse.ArgumentParser:
@@ -27,9 +27,15 @@ def build_parser() -> argparse.ArgumentParser:
             Examples:
               sla-quote examples/input_form4_basic.json --config config/default.example.yaml --out dist
               sla-quote examples/input_form4_basic.json --file examples/cube_mm.stl --out dist
+              sla-quote examples/input_form4_basic.json --json-only > quote.json
+              sla-quote history list --customer "Acme Robotics" --since 2024-01-01
+              sla-quote history export --format csv --output quotes.csv
+              sla-quote sweep examples/input_form4_basic.json --qty 1,5,10,20,50 --pdf dist/breaks.pdf
+              sla-quote watch /srv/quotes/inbox --config config/local.yaml --out /srv/quotes/out
 
             Notes:
-              - Accepted CAD types: .sldprt, .igs/.iges, .x_t, .step/.stp, .stl (<=10MB)
+              - Accepted CAD types: .sldprt, .igs/.iges, .x_t, .step/.stp, .stl
+                (<= 10 MB unless SLA_QUOTE_MAX_CAD_MB says otherwise)
               - Instant geometry extraction is implemented for STL only (for now).
             """
         ),
@@ -39,25 +45,279 @@ def build_parser() -> argparse.ArgumentParser:
     p.add_argument("--out", default="dist", help="Output directory")
     p.add_argument(
         "--file",
-        help="CAD file (.stl/.step/.stp/.igs/.iges/.x_t/.sldprt) <=10MB. STL: auto volume+fit.",
+        help="CAD file (.stl/.step/.stp/.igs/.iges/.x_t/.sldprt), <= $SLA_QUOTE_MAX_CAD_MB (10). STL: auto volume+fit.",
+    )
+    p.add_argument(
+        "--geometry-cache",
+        help="SQLite file for cached STL metrics (default: $SLA_QUOTE_CACHE_DIR or ~/.cache/sla-quote/geometry.sqlite)",
+    )
+    p.add_argument("--no-geometry-cache", action="store_true", help="Always recompute STL metrics")
+    p.add_argument(
+        "--job-log",
+        help="Also append this quote as a row to an XLSX job log (created if missing). The log is rewritten "
+        "on every append; for busy logs use `sla-quote history export --format xlsx` instead",
+    )
+    p.add_argument("--journal", help="Quote journal (SQLite) to record into (default: $SLA_QUOTE_JOURNAL or dist/quotes.sqlite)")
+    p.add_argument("--no-journal", action="store_true", help="Do not record this quote in the journal")
+    p.add_argument(
+        "--json-only",
+        action="store_true",
+        help="Skip the PDF/XLSX; write QUOTE-<id>.json and print it to stdout (messages go to stderr)",
     )
     return p
 
 
-def main() -> None:
+def build_history_parser() -> argparse.ArgumentParser:
+    from .journal import FILTER_COLUMNS
+
+    p = argparse.ArgumentParser(prog="sla-quote history", description="Query and export the quote journal")
+    p.add_argument("--journal", help="Quote journal (default: $SLA_QUOTE_JOURNAL or dist/quotes.sqlite)")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    def add_filters(sp: argparse.ArgumentParser, limit: int | None) -> None:
+        for col in FILTER_COLUMNS:
+            sp.add_argument(f"--{col.replace('_', '-')}", dest=col, help=f"Only quotes with this {col}")
+        sp.add_argument("--since", help="Only quotes created at or after this date/time (ISO, UTC)")
+        sp.add_argument("--until", help="Only quotes created before this date/time (ISO, UTC)")
+        sp.add_argument("--limit", type=int, default=limit, help=f"Max rows, newest first (default: {limit or 'all'})")
+
+    ls = sub.add_parser("list", help="List matching quotes, newest first")
+    add_filters(ls, 50)
+    ls.add_argument("--json", action="store_true", help="Print JSON lines instead of a table")
+
+    show = sub.add_parser("show", help="Print the full input and result of a quote (latest revision)")
+    show.add_argument("quote_id")
+
+    ex = sub.add_parser("export", help="Export matching quotes")
+    add_filters(ex, None)
+    ex.add_argument(
+        "--format",
+        choices=["jsonl", "csv", "xlsx"],
+        default="jsonl",
+        help="xlsx: a job log of the newest --limit quotes, oldest first",
+    )
+    ex.add_argument("--output", help="Output file (default: stdout; required for xlsx)")
+    return p
+
+
+def _open_journal(path: str | None) -> QuoteJournal:
+    from .journal import QuoteJournal, default_journal_path
+
+    # the same default `sla-quote` records into, so history finds what was just quoted
+    journal_path = Path(path) if path else default_journal_path()
+    if not journal_path.exists():
+        raise FileNotFoundError(f"Quote journal not found: {journal_path}")
+    return QuoteJournal(journal_path)
+
+
+def _export_job_log(journal: QuoteJournal, output: str, kwargs: Dict[str, Any]) -> int:
+    # one pass over the journal instead of one XLSX rewrite per quote (--job-log)
+    from .api import result_from_dict
+    from .model import QuoteInput
+    from .render_xlsx import write_job_log
+
+    n = 0
+
+    def rows():
+        nonlocal n
+        for row in journal.query(full=True, oldest_first=True, **kwargs):
+            n += 1
+            yield QuoteInput.model_validate(row["input"]), result_from_dict(row["result"]), row["created_at"]
+
+    write_job_log(output, rows())
+    return n
+
+
+def history_main(argv: List[str]) -> None:
+    from .journal import FILTER_COLUMNS
+
+    args = build_history_parser().parse_args(argv)
+    journal = _open_journal(args.journal)
+    try:
+        if args.command == "show":
+            rows = list(journal.query(quote_id=args.quote_id, limit=1, full=True))
+            if not rows:
+                raise SystemExit(f"Quote not found in journal: {args.quote_id}")
+            print(json.dumps(rows[0], indent=2))
+            return
+
+        filters = {col: getattr(args, col) for col in FILTER_COLUMNS}
+        kwargs = dict(since=args.since, until=args.until, limit=args.limit, **filters)
+        if args.command == "export":
+            if args.format == "xlsx":
+                if not args.output:
+                    raise SystemExit("history export --format xlsx needs --output")
+                n = _export_job_log(journal, args.output, kwargs)
+                print(f"Exported {n} quote(s) to {args.output}", file=sys.stderr)
+            elif args.output:
+                with open(args.output, "w", encoding="utf-8", newline="") as f:
+                    n = journal.export(f, args.format, **kwargs)
+                print(f"Exported {n} quote(s) to {args.output}", file=sys.stderr)
+            else:
+                journal.export(sys.stdout, args.format, **kwargs)
+            return
+
+        for row in journal.query(**kwargs):
+            if args.json:
+                print(json.dumps(row))
+            else:
+                print(
+                    f"{row['created_at']}  {row['quote_id']:<20} {row['customer']:<24} "
+                    f"{row['part_number']:<16} {row['printer']}/{row['resin']}  "
+                    f"qty={row['qty']}  {row['currency']} {row['sell_price']:,.2f}"
+                )
+    finally:
+        journal.close()
+
+
+def build_sweep_parser() -> argparse.ArgumentParser:
+    from .sweep import DEFAULT_SWEEP_QTYS
+
+    p = argparse.ArgumentParser(
+        prog="sla-quote sweep",
+        description="Price-break table for one quote input across qty x printer x compatible resin",
+    )
+    p.add_argument("input", help="Path to quote input JSON")
+    p.add_argument("--config", default="config/default.example.yaml", help="Path to YAML config")
+    p.add_argument(
+        "--qty",
+        default=",".join(str(n) for n in DEFAULT_SWEEP_QTYS),
+        help="Comma-separated quantities (default: %(default)s)",
+    )
+    p.add_argument(
+        "--cad",
+        help="STL of the part: volume, nesting, print hours and supports per printer and qty "
+        "(default: the input's values, print hours held constant)",
+    )
+    p.add_argument("--printer", action="append", help="Limit to this printer (repeatable; default: all)")
+    p.add_argument("--resin", action="append", help="Limit to this resin (repeatable; default: all compatible)")
+    p.add_argument("--json", action="store_true", help="Print the table as JSON")
+    p.add_argument("--pdf", help="Also render the table as a PDF")
+    return p
+
+
+def sweep_main(argv: List[str]) -> None:
+    from .config import load_compiled_config
+    from .model import QuoteInput
+    from .sweep import sweep_quote
+
+    p = build_sweep_parser()
+    args = p.parse_args(argv)
+    try:
+        quantities = [int(n) for n in args.qty.split(",") if n.strip()]
+    except ValueError:
+        p.error(f"--qty must be comma-separated integers, got {args.qty!r}")
+
+    cfg = load_compiled_config(args.config)
+    with open(args.input, "r", encoding="utf-8") as f:
+        q = QuoteInput.model_validate(json.load(f))
+
+    if args.cad:
+        from .api import sweep_cad_quote
+
+        q, table = sweep_cad_quote(q, cfg, Path(args.cad), quantities, printers=args.printer, resins=args.resin)
+    else:
+        table = sweep_quote(q, cfg, quantities, printers=args.printer, resins=args.resin)
+
+    if args.json:
+        print(json.dumps(table.to_dict(), indent=2))
+    else:
+        print(f"Price per part ({table.currency}) for {q.part.part_number}:")
+        print(f"{'Printer | Resin':<36}" + "".join(f"{'Qty ' + str(n):>12}" for n in table.quantities))
+        for (printer, resin), prices in zip(table.combos, table.price_per_part.tolist()):
+            print(f"{printer + ' | ' + resin:<36}" + "".join(f"{v:>12,.2f}" for v in prices))
+        held = list(dict.fromkeys(p for (p, _), est in zip(table.combos, table.hours_estimated) if not est))
+        if held:
+            why = "no print_time model" if args.cad else "give --cad to estimate them per printer and qty"
+            print(f"Print hours held at {q.process.print_hours:g} h per build on {', '.join(held)} ({why}).")
+
+    if args.pdf:
+        from .render_pdf import write_price_break_pdf
+
+        Path(args.pdf).parent.mkdir(parents=True, exist_ok=True)
+        write_price_break_pdf(args.pdf, q, table)
+        print(f"Wrote: {args.pdf}", file=sys.stderr if args.json else sys.stdout)
+
+
+def build_watch_parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(
+        prog="sla-quote watch",
+        description=(
+            "Quote request JSON files (plus a same-named CAD file) dropped into a folder, "
+            "with warm worker processes. Inputs move to <dir>/done or <dir>/failed."
+        ),
+    )
+    p.add_argument("dir", help="Inbox folder to watch")
+    p.add_argument("--config", default="config/default.example.yaml", help="Path to YAML config (reloaded on change)")
+    p.add_argument("--out", help="Output directory (default: <dir>/out)")
+    p.add_argument("--workers", type=int, help="Concurrent quotes (default: $SLA_QUOTE_WORKERS or min(4, cpus))")
+    p.add_argument("--executor", choices=["process", "thread"], help="Worker kind (default: $SLA_QUOTE_EXECUTOR or process)")
+    p.add_argument("--journal", help="Quote journal (SQLite) to record into (default: $SLA_QUOTE_JOURNAL)")
+    p.add_argument("--settle", type=float, default=0.5, help="Seconds a file must be unchanged before it is read")
+    p.add_argument("--poll", action="store_true", help="Poll the folder instead of using file-system notifications")
+    p.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between polls / config checks")
+    p.add_argument("--once", action="store_true", help="Quote what is in the folder now, then exit")
+    return p
+
+
+def watch_main(argv: List[str]) -> None:
+    args = build_watch_parser().parse_args(argv)
+    if args.journal:
+        # workers open the journal themselves (and may be separate processes)
+        os.environ["SLA_QUOTE_JOURNAL"] = str(Path(args.journal).resolve())
+
+    from .watch import QuoteFolderWatcher, watch_folder
+    from .workers import QuotePool
+
+    config = str(Path(args.config).resolve())
+    pool = QuotePool.from_env(preload_configs=[config], kind=args.executor, workers=args.workers)
+    watcher = QuoteFolderWatcher(
+        args.dir,
+        config,
+        out_dir=args.out,
+        pool=pool,
+        settle=args.settle,
+        poll_interval=args.poll_interval,
+        use_notify=not args.poll,
+        log=lambda msg: print(msg, flush=True),
+    )
+    if not args.once:
+        print(f"Watching {Path(args.dir).resolve()} ({pool.workers} {pool.kind} workers); Ctrl-C to stop", flush=True)
+    watch_folder(watcher, once=args.once)
+    print(f"Quoted {watcher.processed}, failed {watcher.failed}", flush=True)
+
+
+SUBCOMMANDS = {"history": history_main, "sweep": sweep_main, "watch": watch_main}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in SUBCOMMANDS:
+        SUBCOMMANDS[argv[0]](argv[1:])
+        return
+
     p = build_parser()
-    args = p.parse_args()
+    args = p.parse_args(argv)
 
     if not args.input:
         p.print_help()
         return
 
-    cfg = load_config(args.config)
+    from .api import compute_cad_quote, result_to_dict
+    from .config import load_compiled_config
+    from .journal import QuoteJournal
+    from .model import QuoteInput
+
+    # with --json-only stdout carries just the result JSON
+    info = sys.stderr if args.json_only else sys.stdout
+
+    cfg = load_compiled_config(args.config)
 
     with open(args.input, "r", encoding="utf-8") as f:
         data = json.load(f)
 
     q = QuoteInput.model_validate(data)
+    meta: dict = {}
 
     # Optional CAD upload handling
     if args.file:
@@ -69,32 +329,69 @@ def main() -> None:
         if ext not in ALLOWED_EXTS:
             raise ValueError(f"Unsupported file type: {ext}. Allowed: {', '.join(sorted(ALLOWED_EXTS))}")
 
+        from .utils import max_cad_bytes, too_large_message
+
         size = fpath.stat().st_size
-        if size > MAX_BYTES:
-            raise ValueError(f"File too large: {size/1024/1024:.2f} MB. Max is 10 MB.")
+        if size > max_cad_bytes():
+            raise ValueError(too_large_message(size, max_cad_bytes()))
 
         if ext == ".stl":
-            m = load_stl_metrics(fpath)
-            check_fits_printer(cfg, q.process.printer, m.bounds_in)
+            from .api import _apply_cad_overrides
+            from .geometry_cache import GeometryCache
 
-            # Auto-fill volume from STL (assumes STL units are mm)
-            q.process.part_volume_ml = float(m.volume_ml)
+            cache = None if args.no_geometry_cache else GeometryCache(args.geometry_cache)
+            try:
+                meta = _apply_cad_overrides(q, cfg, fpath, cache)
+            finally:
+                if cache is not None:
+                    st = cache.stats()
+                    cache.close()
+            if cache is not None:
+                print(
+                    f"Geometry cache: {meta['geometry_cache']} (hits={st['hits']} misses={st['misses']})", file=info
+                )
+            if "orientation" in meta:
+                fit = meta["printer_fit"][q.process.printer]
+                x, y, z = fit["extents_in"]
+                print(f"Part fits {q.process.printer} only when rotated: {x:.2f}x{y:.2f}x{z:.2f} in", file=info)
+            if "nesting" in meta:
+                n = meta["nesting"]
+                print(
+                    f"Nesting: {n['copies_per_build']} per build -> {n['builds']} build(s) for qty {q.process.qty}",
+                    file=info,
+                )
+            if "print_hours_estimated" in meta:
+                spec = cfg.printer(q.process.printer).print_time
+                print(
+                    f"Estimated print_hours={q.process.print_hours:.2f} per build "
+                    f"({meta['print_layers']} layers @ {spec.layer_height_mm:g} mm)",
+                    file=info,
+                )
+            if "support_volume_ml" in meta:
+                print(
+                    f"Estimated support_volume_ml={meta['support_volume_ml']:.2f} per part "
+                    f"({meta['support_overhang_area_mm2']:.0f} mm² of overhang)",
+                    file=info,
+                )
 
-            if not m.is_watertight:
-                print("WARNING: STL is not watertight. Computed volume may be inaccurate.")
+            if meta.get("stl_bodies", 1) > 1:
+                how = {"combined": "priced as one part", "as_qty": "priced as qty", "separate": "priced separately"}
+                print(f"STL has {meta['stl_bodies']} bodies, {how[meta['bodies_mode']]}", file=info)
 
-            print(
-                f"STL volume_ml={m.volume_ml:.2f} | "
-                f"bounds_in={m.bounds_in[0]:.2f}x{m.bounds_in[1]:.2f}x{m.bounds_in[2]:.2f}"
-            )
+            if not meta["stl_is_watertight"]:
+                print("WARNING: STL is not watertight. Computed volume may be inaccurate.", file=info)
+
+            bx, by, bz = meta["stl_bounds_in"]
+            print(f"STL volume_ml={meta['stl_volume_ml']:.2f} | bounds_in={bx:.2f}x{by:.2f}x{bz:.2f}", file=info)
         else:
             print(
                 f"{ext} accepted for upload, but instant quoting is implemented for STL only right now. "
-                "Export to STL for automated quoting (CAD->mesh conversion TBD)."
+                "Export to STL for automated quoting (CAD->mesh conversion TBD).",
+                file=info,
             )
             sys.exit(2)
 
-    r = compute_quote(q, cfg)
+    r = compute_cad_quote(q, cfg, meta)
 
     outdir = Path(args.out)
     outdir.mkdir(parents=True, exist_ok=True)
@@ -103,28 +400,33 @@ def main() -> None:
     xlsx_path = outdir / f"QUOTE-{r.quote_id}.xlsx"
     json_path = outdir / f"QUOTE-{r.quote_id}.json"
 
-    write_pdf(pdf_path, q, r)
-    write_xlsx(xlsx_path, q, r)
+    if not args.json_only:
+        from .render_pdf import write_pdf
+        from .render_xlsx import write_xlsx
+
+        write_pdf(pdf_path, q, r)
+        write_xlsx(xlsx_path, q, r)
 
+    # the same result shape (CAD metadata included) as api.generate_quote_from_dict
+    result = result_to_dict(r, {**meta, "input_file": str(args.file) if args.file else None})
     with open(json_path, "w", encoding="utf-8") as f:
-        json.dump(
-            {
-                "quote_id": r.quote_id,
-                "currency": r.currency,
-                "qty": r.qty,
-                "unit_discount_pct": r.unit_discount_pct,
-                "line_items": [{"name": li.name, "cost": li.cost} for li in r.line_items],
-                "direct_cost": r.direct_cost,
-                "overhead": r.overhead,
-                "loaded_cost": r.loaded_cost,
-                "sell_price": r.sell_price,
-                "price_per_part": r.price_per_part,
-                "input_file": str(args.file) if args.file else None,
-            },
-            f,
-            indent=2,
-        )
-
-    print(f"Wrote: {pdf_path}")
-    print(f"Wrote: {xlsx_path}")
-    print(f"Wrote: {json_path}")
+        json.dump(result, f, indent=2)
+
+    if args.json_only:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"Wrote: {pdf_path}")
+        print(f"Wrote: {xlsx_path}")
+    print(f"Wrote: {json_path}", file=info)
+
+    if not args.no_journal:
+        journal = QuoteJournal(args.journal)  # None: default_journal_path()
+        journal.record(q, result, cfg.digest)
+        journal.close()
+        print(f"Recorded in journal: {journal.path}", file=info)
+
+    if args.job_log:
+        from .render_xlsx import write_job_log
+
+        write_job_log(args.job_log, [(q, r)], append=True)
+        print(f"Appended to job log: {args.job_log}", file=info)
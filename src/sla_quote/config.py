@@ -0,0 +1,329 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+
+from .utils import load_config
+
+
+@dataclass(frozen=True)
+class PrintTimeSpec:
+    """
+    Print-time model: fixed job time + a per-layer time (recoat/peel) + exposure time
+    proportional to the cross-section area (laser scan; 0 for masked/DLP printers).
+    """
+    layer_height_mm: float
+    seconds_per_layer: float
+    seconds_per_cm2: float = 0.0
+    fixed_minutes: float = 0.0
+
+
+@dataclass(frozen=True)
+class SupportSpec:
+    """
+    Support-resin model: down-facing surfaces flatter than self_supporting_deg (from horizontal)
+    get support columns down to the plate or the part below, filled `density` solid.
+    """
+    self_supporting_deg: float = 45.0
+    density: float = 0.15
+    lift_mm: float = 0.0  # part raised off the plate on supports (0: printed on the plate)
+    raster_mm: float = 1.0  # height-map cell size
+
+
+@dataclass(frozen=True)
+class JobPrioritySpec:
+    """
+    Scheduling of queued jobs (POST /jobs): customer.tier's points plus expedite_points for every
+    1.0 of expedite multiplier above 1. Higher runs first.
+    """
+    expedite_points: float = 10.0
+    tiers: Mapping[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class PrinterSpec:
+    name: str
+    build_volume_in: Tuple[float, float, float]  # (x, y, z)
+    materials: Tuple[str, ...]
+    print_time: Optional[PrintTimeSpec] = None
+
+
+@dataclass(frozen=True)
+class ResinSpec:
+    name: str
+    cost_per_ml: float
+    waste_pct: float
+
+
+@dataclass(frozen=True, eq=False)
+class CompiledConfig:
+    """
+    Validated, pre-converted view of a YAML config.
+    Build with compile_config(); engine, geometry and api accept it anywhere a raw dict is accepted.
+    """
+    raw: Dict[str, Any]
+    digest: str
+    currency: str
+
+    overhead_pct: float
+    margin_pct: float
+    expedite_default: float
+
+    printers: Mapping[str, PrinterSpec]
+    resins: Mapping[str, ResinSpec]
+    machine_rates: Mapping[str, float]
+    default_machine_rate: float
+    labor_rates: Mapping[str, float]
+
+    # standards, already converted to cost at the matching labor rate
+    setup_cost_per_job: float
+    wash_cure_cost_per_part: float
+    support_removal_cost_per_part: float
+    finishing_cost_per_part: float
+    packaging_cost_per_part: float
+    docs_cost_per_job: float
+    inspection_cost_per_job: float
+
+    # volume discount tiers: sorted min_qty and the best pct reachable at that tier
+    tier_min_qty: Tuple[int, ...]
+    tier_best_pct: Tuple[float, ...]
+
+    # clearance between copies on a build plate (nesting)
+    part_spacing_mm: float = 3.0
+
+    # support-resin estimate for STL quotes; None: no estimate (resin waste_pct only)
+    support: Optional[SupportSpec] = None
+
+    job_priority: JobPrioritySpec = JobPrioritySpec()
+
+    def machine_rate(self, printer: str) -> float:
+        return self.machine_rates.get(printer, self.default_machine_rate)
+
+    def resin(self, name: str) -> ResinSpec:
+        try:
+            return self.resins[name]
+        except KeyError:
+            raise KeyError(f"Resin not found in config: {name}") from None
+
+    def printer(self, name: str) -> PrinterSpec:
+        try:
+            return self.printers[name]
+        except KeyError:
+            raise KeyError(f"Printer not found in config: {name}") from None
+
+    def unit_discount_pct(self, qty: int) -> float:
+        i = bisect_right(self.tier_min_qty, qty)
+        best = self.tier_best_pct[i - 1] if i else 0.0
+        # clamp to [0, 0.20]; marketing says "up to 20%"
+        return max(0.0, min(best, 0.20))
+
+
+ConfigLike = Union[Dict[str, Any], CompiledConfig]
+
+
+def _get(d: Mapping[str, Any], key: str, path: str) -> Any:
+    if not isinstance(d, Mapping) or key not in d:
+        raise ValueError(f"Config error: missing '{path}.{key}'" if path else f"Config error: missing '{key}'")
+    return d[key]
+
+
+def _num(value: Any, path: str, minimum: Optional[float] = 0.0) -> float:
+    try:
+        x = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Config error: '{path}' must be a number, got {value!r}") from None
+    if minimum is not None and x < minimum:
+        raise ValueError(f"Config error: '{path}' must be >= {minimum}, got {x}")
+    return x
+
+
+def _print_time_spec(pt: Optional[Mapping[str, Any]], path: str) -> Optional[PrintTimeSpec]:
+    if pt is None:
+        return None
+    layer_height = _num(_get(pt, "layer_height_mm", path), f"{path}.layer_height_mm")
+    if layer_height <= 0:
+        raise ValueError(f"Config error: '{path}.layer_height_mm' must be > 0, got {layer_height}")
+    return PrintTimeSpec(
+        layer_height_mm=layer_height,
+        seconds_per_layer=_num(_get(pt, "seconds_per_layer", path), f"{path}.seconds_per_layer"),
+        seconds_per_cm2=_num(pt.get("seconds_per_cm2", 0.0), f"{path}.seconds_per_cm2"),
+        fixed_minutes=_num(pt.get("fixed_minutes", 0.0), f"{path}.fixed_minutes"),
+    )
+
+
+def _support_spec(sp: Optional[Mapping[str, Any]]) -> Optional[SupportSpec]:
+    if sp is None:
+        return None
+    if not isinstance(sp, Mapping):
+        raise ValueError("Config error: 'support' must be a mapping")
+    d = SupportSpec()
+    angle = _num(sp.get("self_supporting_deg", d.self_supporting_deg), "support.self_supporting_deg")
+    if angle > 90.0:
+        raise ValueError(f"Config error: 'support.self_supporting_deg' must be <= 90, got {angle}")
+    density = _num(sp.get("density", d.density), "support.density")
+    if not 0.0 < density <= 1.0:
+        raise ValueError(f"Config error: 'support.density' must be in (0, 1], got {density}")
+    raster = _num(sp.get("raster_mm", d.raster_mm), "support.raster_mm")
+    if raster <= 0:
+        raise ValueError(f"Config error: 'support.raster_mm' must be > 0, got {raster}")
+    return SupportSpec(
+        self_supporting_deg=angle,
+        density=density,
+        lift_mm=_num(sp.get("lift_mm", d.lift_mm), "support.lift_mm"),
+        raster_mm=raster,
+    )
+
+
+def _job_priority_spec(jp: Optional[Mapping[str, Any]]) -> JobPrioritySpec:
+    if jp is None:
+        return JobPrioritySpec()
+    if not isinstance(jp, Mapping):
+        raise ValueError("Config error: 'job_priority' must be a mapping")
+    tiers = jp.get("tiers") or {}
+    if not isinstance(tiers, Mapping):
+        raise ValueError("Config error: 'job_priority.tiers' must map tier names to points")
+    return JobPrioritySpec(
+        expedite_points=_num(
+            jp.get("expedite_points", JobPrioritySpec.expedite_points), "job_priority.expedite_points", minimum=None
+        ),
+        tiers={str(k): _num(v, f"job_priority.tiers.{k}", minimum=None) for k, v in tiers.items()},
+    )
+
+
+def config_digest(cfg: Dict[str, Any]) -> str:
+    blob = json.dumps(cfg, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def compile_config(cfg: Dict[str, Any]) -> CompiledConfig:
+    """
+    Validate a raw config dict once and pre-convert everything the engine needs.
+    Raises ValueError naming the offending key on malformed configs.
+    """
+    if not isinstance(cfg, dict):
+        raise ValueError("Config must be a YAML mapping at the top level.")
+
+    policies = _get(cfg, "policies", "")
+    overhead_pct = _num(_get(policies, "overhead_pct", "policies"), "policies.overhead_pct")
+    margin_pct = _num(_get(policies, "margin_pct", "policies"), "policies.margin_pct")
+    expedite_default = _num(
+        policies.get("expedite_multiplier_default", 1.0), "policies.expedite_multiplier_default", minimum=None
+    )
+
+    tiers: Dict[int, float] = {}
+    for i, t in enumerate(policies.get("volume_discounts", []) or []):
+        path = f"policies.volume_discounts[{i}]"
+        min_qty = int(_num(_get(t, "min_qty", path), f"{path}.min_qty"))
+        pct = _num(_get(t, "unit_discount_pct", path), f"{path}.unit_discount_pct", minimum=None)
+        tiers[min_qty] = max(pct, tiers.get(min_qty, pct))
+    tier_min_qty = tuple(sorted(tiers))
+    tier_best_pct = []
+    best = 0.0
+    for q in tier_min_qty:
+        best = max(best, tiers[q])
+        tier_best_pct.append(best)
+
+    printers: Dict[str, PrinterSpec] = {}
+    for name, p in (cfg.get("printers") or {}).items():
+        path = f"printers.{name}"
+        bv = _get(p, "build_volume_in", path)
+        printers[name] = PrinterSpec(
+            name=name,
+            build_volume_in=tuple(
+                _num(_get(bv, axis, f"{path}.build_volume_in"), f"{path}.build_volume_in.{axis}")
+                for axis in ("x", "y", "z")
+            ),
+            materials=tuple(p.get("materials") or ()),
+            print_time=_print_time_spec(p.get("print_time"), f"{path}.print_time"),
+        )
+
+    resins: Dict[str, ResinSpec] = {}
+    for name, r in (_get(_get(cfg, "materials", ""), "resins", "materials") or {}).items():
+        path = f"materials.resins.{name}"
+        resins[name] = ResinSpec(
+            name=name,
+            cost_per_ml=_num(_get(r, "cost_per_ml", path), f"{path}.cost_per_ml"),
+            waste_pct=_num(r.get("waste_pct", 0.0), f"{path}.waste_pct"),
+        )
+
+    rates = _get(cfg, "rates", "")
+    machine_rates = {
+        name: _num(v, f"rates.machine_rate_per_hr.{name}")
+        for name, v in (_get(rates, "machine_rate_per_hr", "rates") or {}).items()
+    }
+    labor = _get(rates, "labor_rate_per_hr", "rates")
+    labor_rates = {
+        key: _num(_get(labor, key, "rates.labor_rate_per_hr"), f"rates.labor_rate_per_hr.{key}")
+        for key in ("operator", "qc", "docs")
+    }
+
+    s = _get(cfg, "standards", "")
+
+    def cost(key: str, rate_key: str) -> float:
+        return (_num(_get(s, key, "standards"), f"standards.{key}") / 60.0) * labor_rates[rate_key]
+
+    return CompiledConfig(
+        raw=cfg,
+        digest=config_digest(cfg),
+        currency=str(cfg.get("currency", "USD")),
+        overhead_pct=overhead_pct,
+        margin_pct=margin_pct,
+        expedite_default=expedite_default,
+        printers=printers,
+        resins=resins,
+        machine_rates=machine_rates,
+        default_machine_rate=machine_rates.get("GENERIC_SLA", 0.0),
+        labor_rates=labor_rates,
+        setup_cost_per_job=cost("setup_minutes_per_job", "operator"),
+        wash_cure_cost_per_part=cost("wash_cure_minutes_per_part", "operator"),
+        support_removal_cost_per_part=cost("support_removal_minutes_per_part", "operator"),
+        finishing_cost_per_part=cost("finishing_minutes_per_part", "operator"),
+        packaging_cost_per_part=cost("packaging_minutes_per_part", "operator"),
+        docs_cost_per_job=cost("docs_minutes_per_job", "docs"),
+        inspection_cost_per_job=cost("inspection_minutes_per_job", "qc"),
+        tier_min_qty=tier_min_qty,
+        tier_best_pct=tuple(tier_best_pct),
+        part_spacing_mm=_num((cfg.get("nesting") or {}).get("part_spacing_mm", 3.0), "nesting.part_spacing_mm"),
+        support=_support_spec(cfg.get("support")),
+        job_priority=_job_priority_spec(cfg.get("job_priority")),
+    )
+
+
+# raw dicts passed to ensure_compiled: id -> (the dict, a copy to spot in-place edits, compiled)
+_COMPILED_CACHE_SIZE = 8
+_compiled: "OrderedDict[int, Tuple[Dict[str, Any], Dict[str, Any], CompiledConfig]]" = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def ensure_compiled(cfg: ConfigLike) -> CompiledConfig:
+    """
+    cfg as a CompiledConfig. The last few raw dicts are compiled once and remembered by
+    identity; one edited in place since is compiled again.
+    """
+    if isinstance(cfg, CompiledConfig):
+        return cfg
+    key = id(cfg)
+    with _compiled_lock:
+        hit = _compiled.get(key)
+        if hit is not None and hit[0] is cfg and hit[1] == cfg:
+            _compiled.move_to_end(key)
+            return hit[2]
+    cc = compile_config(cfg)
+    with _compiled_lock:
+        # holding the dict keeps its id from being reused
+        _compiled[key] = (cfg, copy.deepcopy(cfg), cc)
+        _compiled.move_to_end(key)
+        while len(_compiled) > _COMPILED_CACHE_SIZE:
+            _compiled.popitem(last=False)
+    return cc
+
+
+def load_compiled_config(path: str | Path) -> CompiledConfig:
+    return compile_config(load_config(path))
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Dict, List, Sequence
 
+from .config import ConfigLike, ensure_compiled
 from .model import QuoteInput
-from .pricing import volume_unit_discount_pct
 
 @dataclass(frozen=True)
 class LineItem:
@@ -24,64 +24,44 @@ class QuoteResult:
     sell_price: float
     price_per_part: float
 
-def _machine_rate(cfg: Dict[str, Any], printer: str) -> float:
-    rates = cfg["rates"]["machine_rate_per_hr"]
-    return float(rates.get(printer, rates.get("GENERIC_SLA", 0.0)))
-
-def _labor_rate(cfg: Dict[str, Any], key: str) -> float:
-    return float(cfg["rates"]["labor_rate_per_hr"][key])
-
-def _resin_cfg(cfg: Dict[str, Any], resin: str) -> Dict[str, Any]:
-    resins = cfg["materials"]["resins"]
-    if resin not in resins:
-        raise KeyError(f"Resin not found in config: {resin}")
-    return resins[resin]
-
-def compute_quote(q: QuoteInput, cfg: Dict[str, Any]) -> QuoteResult:
-    currency = cfg.get("currency", "USD")
+def compute_quote(q: QuoteInput, cfg: ConfigLike) -> QuoteResult:
+    cc = ensure_compiled(cfg)
+    currency = cc.currency
     qty = q.process.qty
 
     # policies
-    overhead_pct = float(cfg["policies"]["overhead_pct"])
-    margin_pct = float(cfg["policies"]["margin_pct"])
-    expedite_default = float(cfg["policies"].get("expedite_multiplier_default", 1.0))
-    expedite = float(q.options.expedite_multiplier or expedite_default)
+    overhead_pct = cc.overhead_pct
+    margin_pct = cc.margin_pct
+    expedite = float(q.options.expedite_multiplier or cc.expedite_default)
 
     # resin/material
-    resin = _resin_cfg(cfg, q.process.resin)
-    cost_per_ml = float(resin["cost_per_ml"])
-    waste_pct = float(resin.get("waste_pct", 0.0))
+    resin = cc.resin(q.process.resin)
 
     # base costs
-    material_cost = (q.process.part_volume_ml * qty) * (1.0 + waste_pct) * cost_per_ml
-
-    machine_rate = _machine_rate(cfg, q.process.printer)
-    machine_cost = q.process.print_hours * machine_rate
-
-    # labor standards
-    s = cfg["standards"]
-    operator_rate = _labor_rate(cfg, "operator")
-    qc_rate = _labor_rate(cfg, "qc")
-    docs_rate = _labor_rate(cfg, "docs")
+    volume_ml = q.process.part_volume_ml + (q.process.support_volume_ml or 0.0)
+    material_cost = (volume_ml * qty) * (1.0 + resin.waste_pct) * resin.cost_per_ml
 
-    def min_to_cost(minutes: float, rate_per_hr: float) -> float:
-        return (minutes / 60.0) * rate_per_hr
+    if q.process.print_hours is None:
+        raise ValueError("print_hours is required (or supply an STL so it can be estimated).")
+    builds = q.process.builds or 1
+    machine_cost = q.process.print_hours * cc.machine_rate(q.process.printer) * builds
 
+    # labor standards (pre-converted to cost by the compiled config)
     labor_cost = 0.0
-    labor_cost += min_to_cost(float(s["setup_minutes_per_job"]), operator_rate)
+    labor_cost += cc.setup_cost_per_job * builds
 
     if q.options.wash_cure:
-        labor_cost += min_to_cost(float(s["wash_cure_minutes_per_part"]) * qty, operator_rate)
+        labor_cost += cc.wash_cure_cost_per_part * qty
     if q.options.support_removal:
-        labor_cost += min_to_cost(float(s["support_removal_minutes_per_part"]) * qty, operator_rate)
+        labor_cost += cc.support_removal_cost_per_part * qty
     if q.options.finishing:
-        labor_cost += min_to_cost(float(s["finishing_minutes_per_part"]) * qty, operator_rate)
+        labor_cost += cc.finishing_cost_per_part * qty
     if q.options.packaging:
-        labor_cost += min_to_cost(float(s["packaging_minutes_per_part"]) * qty, operator_rate)
+        labor_cost += cc.packaging_cost_per_part * qty
     if q.options.docs_packet:
-        labor_cost += min_to_cost(float(s["docs_minutes_per_job"]), docs_rate)
+        labor_cost += cc.docs_cost_per_job
     if q.options.inspection:
-        labor_cost += min_to_cost(float(s["inspection_minutes_per_job"]), qc_rate)
+        labor_cost += cc.inspection_cost_per_job
 
     # outside services
     outside_total = 0.0
@@ -108,7 +88,7 @@ def compute_quote(q: QuoteInput, cfg: Dict[str, Any]) -> QuoteResult:
     sell = loaded / (1.0 - margin_pct) if margin_pct < 1.0 else loaded
 
     # volume discount applies to unit price (per marketing) — apply after margin
-    unit_disc = volume_unit_discount_pct(cfg, qty)
+    unit_disc = cc.unit_discount_pct(qty)
     sell *= (1.0 - unit_disc)
 
     ppp = sell / qty
@@ -125,3 +105,30 @@ def compute_quote(q: QuoteInput, cfg: Dict[str, Any]) -> QuoteResult:
         sell_price=round(sell, 2),
         price_per_part=round(ppp, 2),
     )
+
+def combine_quotes(quote_id: str, parts: Sequence[QuoteResult]) -> QuoteResult:
+    """
+    One quote for parts priced separately (e.g. the bodies of a multi-body STL): line items and
+    totals add up, qty is the total part count and price_per_part the average over it.
+    Parts are expected to share currency and volume discount (same qty each).
+    """
+    if not parts:
+        raise ValueError("Nothing to combine: no priced parts.")
+    costs: Dict[str, float] = {}
+    for p in parts:
+        for li in p.line_items:
+            costs[li.name] = costs.get(li.name, 0.0) + li.cost
+    qty = sum(p.qty for p in parts)
+    sell = round(sum(p.sell_price for p in parts), 2)
+    return QuoteResult(
+        quote_id=quote_id,
+        currency=parts[0].currency,
+        qty=qty,
+        unit_discount_pct=parts[0].unit_discount_pct,
+        line_items=[LineItem(name, round(cost, 2)) for name, cost in costs.items()],
+        direct_cost=round(sum(p.direct_cost for p in parts), 2),
+        overhead=round(sum(p.overhead for p in parts), 2),
+        loaded_cost=round(sum(p.loaded_cost for p in parts), 2),
+        sell_price=sell,
+        price_per_part=round(sell / qty, 2),
+    )
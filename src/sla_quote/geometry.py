@@ -1,34 +1,355 @@
 from __future__ import annotations
 
+import io
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import TYPE_CHECKING, Optional, Tuple, Union
 
-import trimesh
+import numpy as np
+
+from .config import ConfigLike, ensure_compiled
+
+if TYPE_CHECKING:
+    from .orientation import PrinterFit
 
 MM_PER_IN = 25.4
 MM3_PER_ML = 1000.0
 
+# Bump when any geometry result changes for the same input bytes (invalidates GeometryCache rows).
+GEOMETRY_VERSION = "3"
+
+# Binary STL: 80-byte header, uint32 facet count, then 50 bytes per facet.
+STL_HEADER_BYTES = 84
+STL_FACET_DTYPE = np.dtype(
+    [("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attr", "<u2")]
+)
+
 @dataclass(frozen=True)
 class StlMetrics:
     volume_ml: float
     bounds_in: Tuple[float, float, float]  # (x, y, z) in inches
     is_watertight: bool
+    triangles: int = 0
+    boundary_edges: int = 0  # edges used by one face (holes, cracks)
+    non_manifold_edges: int = 0  # edges shared by three or more faces
 
 def _mm_to_in(x_mm: float) -> float:
     return x_mm / MM_PER_IN
 
-def load_stl_metrics(stl_path: str | Path) -> StlMetrics:
-    stl_path = Path(stl_path)
+def _extents_in(extents_mm: np.ndarray) -> Tuple[float, float, float]:
+    return (_mm_to_in(float(extents_mm[0])), _mm_to_in(float(extents_mm[1])), _mm_to_in(float(extents_mm[2])))
+
+StlSource = Union[str, Path, bytes, bytearray, memoryview]
+
+# Sources above this size get their metrics from the block-wise scanner in stl_stream,
+# which holds a fixed amount of memory however large the file is.
+CHUNKED_METRICS_BYTES = 64 * 1024 * 1024
+
+
+class StlTooLargeToPlace(ValueError):
+    """An STL past CHUNKED_METRICS_BYTES asked for work that needs the whole mesh in memory."""
+
+def source_size(source: StlSource) -> int:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source).nbytes
+    stl_path = Path(source)
+    if not stl_path.exists():
+        raise FileNotFoundError(f"STL not found: {stl_path}")
+    return stl_path.stat().st_size
+
+def _facet_count_matches(size: int, header: bytes) -> Optional[int]:
+    if size < STL_HEADER_BYTES:
+        return None
+    n_facets = int(np.frombuffer(header[80:84], dtype="<u4")[0])
+    if size != STL_HEADER_BYTES + n_facets * STL_FACET_DTYPE.itemsize:
+        return None
+    return n_facets
+
+def _read_binary_facets(stl_path: Path) -> Optional[np.ndarray]:
+    """
+    Memory-map a binary STL as a structured facet array.
+    Returns None when the file is not a well-formed binary STL (ASCII or truncated).
+    """
+    size = stl_path.stat().st_size
+    with stl_path.open("rb") as f:
+        n_facets = _facet_count_matches(size, f.read(STL_HEADER_BYTES))
+    if n_facets is None:
+        return None
+    if n_facets == 0:
+        return np.empty(0, dtype=STL_FACET_DTYPE)
+    return np.memmap(stl_path, dtype=STL_FACET_DTYPE, mode="r", offset=STL_HEADER_BYTES, shape=(n_facets,))
+
+def _buffer_binary_facets(data: bytes | bytearray | memoryview) -> Optional[np.ndarray]:
+    """Same as _read_binary_facets for in-memory uploads (zero-copy view of the buffer)."""
+    buf = memoryview(data).cast("B")
+    n_facets = _facet_count_matches(buf.nbytes, bytes(buf[:STL_HEADER_BYTES]))
+    if n_facets is None:
+        return None
+    return np.frombuffer(buf, dtype=STL_FACET_DTYPE, count=n_facets, offset=STL_HEADER_BYTES)
+
+def _binary_facets(source: StlSource) -> Optional[np.ndarray]:
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return _buffer_binary_facets(source)
+    stl_path = Path(source)
     if not stl_path.exists():
         raise FileNotFoundError(f"STL not found: {stl_path}")
+    return _read_binary_facets(stl_path)
 
-    mesh = trimesh.load_mesh(str(stl_path), force="mesh")
+def _load_trimesh(source: StlSource):
+    import trimesh  # heavy import; only needed for ASCII/malformed files
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        mesh = trimesh.load_mesh(io.BytesIO(bytes(source)), file_type="stl", force="mesh")
+    else:
+        mesh = trimesh.load_mesh(str(source), force="mesh")
     if mesh.is_empty:
         raise ValueError("STL mesh is empty.")
+    return mesh
+
+def load_stl_triangles(source: StlSource) -> np.ndarray:
+    """
+    Triangles as an (n, 3, 3) array in file units (mm assumed), from a path or STL bytes.
+    Binary STLs are returned as a zero-copy view of the memory-mapped file or buffer.
+    """
+    facets = _binary_facets(source)
+    if facets is None:
+        return np.asarray(_load_trimesh(source).triangles)
+    if len(facets) == 0:
+        raise ValueError("STL mesh is empty.")
+    return facets["vertices"]
+
+def signed_volume_mm3(triangles: np.ndarray) -> float:
+    """Sum of signed tetrahedra (origin, v0, v1, v2)."""
+    v0 = triangles[:, 0].astype(np.float64)
+    v1 = triangles[:, 1].astype(np.float64)
+    v2 = triangles[:, 2].astype(np.float64)
+    return float(np.einsum("ij,ij->", v0, np.cross(v1, v2))) / 6.0
+
+def _vertex_array(triangles: np.ndarray) -> np.ndarray:
+    # contiguous float32 copy with -0.0 normalized to 0.0 so equal coordinates have equal bits
+    return np.ascontiguousarray(triangles.reshape(-1, 3), dtype=np.float32) + np.float32(0.0)
+
+def _merge_vertices(verts: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Exact vertex merge: sort by a 64-bit hash of the coordinate bits, then verify that
+    equal hashes really are equal coordinates (falls back to a byte-wise unique on collision).
+    """
+    bits = verts.view(np.uint32).astype(np.uint64)
+    h = (bits[:, 0] | (bits[:, 1] << np.uint64(32))) ^ (bits[:, 2] * np.uint64(0x9E3779B97F4A7C15))
+    order = np.argsort(h)
+    hs = h[order]
+    new = np.empty(len(hs), dtype=bool)
+    new[:1] = True
+    np.not_equal(hs[1:], hs[:-1], out=new[1:])
+
+    dup = np.flatnonzero(~new)
+    if dup.size and np.any(verts[order[dup]] != verts[order[dup - 1]]):
+        keys = verts.view(np.dtype((np.void, verts.dtype.itemsize * 3))).ravel()
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        return inverse.astype(np.int64), len(uniq)
+
+    inverse = np.empty(len(hs), dtype=np.int64)
+    inverse[order] = np.cumsum(new) - 1
+    return inverse, int(new.sum())
+
+def vertex_ids(triangles: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Merge identical vertex coordinates: returns (faces (n, 3) int64, vertex count).
+    """
+    inverse, n_vertices = _merge_vertices(_vertex_array(triangles))
+    return inverse.reshape(-1, 3), n_vertices
+
+def edge_keys(faces: np.ndarray, n_vertices: int) -> np.ndarray:
+    """Undirected edge keys (lo * n_vertices + hi), three per face."""
+    a = faces.reshape(-1)
+    b = faces[:, [1, 2, 0]].reshape(-1)
+    lo = np.minimum(a, b)
+    hi = np.maximum(a, b)
+    return lo * n_vertices + hi
+
+def is_watertight_faces(faces: np.ndarray, n_vertices: int) -> bool:
+    """Watertight == every edge is shared by exactly two faces (same rule as trimesh)."""
+    k = np.sort(edge_keys(faces, n_vertices))
+    if k.size == 0 or k.size % 2:
+        return False
+    if not np.array_equal(k[0::2], k[1::2]):
+        return False
+    return bool(np.all(k[1:-1:2] != k[2::2]))
+
+def edge_use_counts(sorted_keys: np.ndarray) -> Tuple[int, int, int]:
+    """(distinct edges, edges used once, edges used three or more times) from sorted edge keys."""
+    if sorted_keys.size == 0:
+        return 0, 0, 0
+    new = np.empty(sorted_keys.size, dtype=bool)
+    new[0] = True
+    np.not_equal(sorted_keys[1:], sorted_keys[:-1], out=new[1:])
+    starts = np.flatnonzero(new)
+    counts = np.diff(np.append(starts, sorted_keys.size))
+    return len(counts), int(np.count_nonzero(counts == 1)), int(np.count_nonzero(counts > 2))
+
+def metrics_from_triangles(triangles: np.ndarray) -> StlMetrics:
+    if len(triangles) == 0:
+        raise ValueError("STL mesh is empty.")
 
-    # Trimesh works in whatever units the STL was authored in.
     # For MVP: assume STL units are millimeters (common in printing workflows).
+    volume_ml = abs(signed_volume_mm3(triangles)) / MM3_PER_ML
+
+    verts = _vertex_array(triangles)
+    extents = verts.max(axis=0).astype(np.float64) - verts.min(axis=0).astype(np.float64)
+
+    inverse, n_vertices = _merge_vertices(verts)
+    edges, boundary, non_manifold = edge_use_counts(np.sort(edge_keys(inverse.reshape(-1, 3), n_vertices)))
+    return StlMetrics(
+        volume_ml=volume_ml,
+        bounds_in=(_mm_to_in(float(extents[0])), _mm_to_in(float(extents[1])), _mm_to_in(float(extents[2]))),
+        is_watertight=edges > 0 and boundary == 0 and non_manifold == 0,
+        triangles=len(triangles),
+        boundary_edges=boundary,
+        non_manifold_edges=non_manifold,
+    )
+
+@dataclass(frozen=True)
+class Bodies:
+    """Disconnected bodies of a mesh (a plate of parts), largest volume first."""
+    metrics: Tuple[StlMetrics, ...]
+    whole: StlMetrics  # the mesh as one part, same as metrics_from_triangles
+    labels: Optional[np.ndarray] = None  # body index per triangle; None when restored from a cache
+
+    def triangles(self, triangles: np.ndarray, i: int) -> np.ndarray:
+        """The triangles of body i (from the array that was split)."""
+        if self.labels is None:
+            raise ValueError("Body labels are not available; split the triangles again.")
+        return triangles[self.labels == i]
+
+def _vertex_components(faces: np.ndarray, n_vertices: int) -> np.ndarray:
+    """
+    Connected-component root per vertex: vectorized union-find that hooks the larger root of
+    every edge onto the smaller one, then pointer-jumps until each vertex points at its root.
+    Edges whose ends already share a root drop out, so later rounds only touch the frontier.
+    """
+    parent = np.arange(n_vertices, dtype=np.int64)
+    # a triangle is connected through (v0, v1) and (v0, v2)
+    u = np.concatenate([faces[:, 0], faces[:, 0]])
+    v = np.concatenate([faces[:, 1], faces[:, 2]])
+    while True:
+        ru, rv = parent[u], parent[v]
+        cross = ru != rv
+        if not cross.any():
+            return parent
+        u, v, ru, rv = u[cross], v[cross], ru[cross], rv[cross]
+        np.minimum.at(parent, np.maximum(ru, rv), np.minimum(ru, rv))
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+def _group_bounds(lo: np.ndarray, hi: np.ndarray, group: np.ndarray, mins: np.ndarray, maxs: np.ndarray) -> None:
+    # per column, on contiguous same-dtype copies: ufunc.at then takes numpy's fast indexed loop
+    for c in range(3):
+        col_lo, col_hi = lo[:, c].copy(), hi[:, c].copy()
+        np.minimum.at(col_lo, group, np.ascontiguousarray(mins[:, c], dtype=lo.dtype))
+        np.maximum.at(col_hi, group, np.ascontiguousarray(maxs[:, c], dtype=hi.dtype))
+        lo[:, c], hi[:, c] = col_lo, col_hi
+
+def _merge_cavities(volume: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+    """
+    Body per shell: an inward-facing shell (negative volume, e.g. a hollow's inner wall) joins the
+    smallest outward shell whose bounds enclose it; everything else is its own body.
+    """
+    body = np.arange(len(volume))
+    inner = np.flatnonzero(volume < 0)
+    outer = np.flatnonzero(volume >= 0)
+    if not inner.size or not outer.size:
+        return body
+    olo, ohi, ovol = lo[outer], hi[outer], volume[outer]
+    step = max(1, 4_000_000 // outer.size)  # bound the (inner x outer) containment matrix
+    for start in range(0, inner.size, step):
+        c = inner[start:start + step]
+        inside = np.all(olo[None] <= lo[c][:, None], axis=2) & np.all(ohi[None] >= hi[c][:, None], axis=2)
+        cost = np.where(inside, ovol[None], np.inf)
+        best = cost.argmin(axis=1)
+        found = np.isfinite(cost[np.arange(len(c)), best])
+        body[c[found]] = outer[best[found]]
+    return body
+
+def split_bodies(triangles: np.ndarray) -> Bodies:
+    """
+    Split a mesh into bodies: shells of faces connected through shared vertices, with cavity
+    shells merged into the body around them. Each body's metrics follow metrics_from_triangles.
+    """
+    if len(triangles) == 0:
+        raise ValueError("STL mesh is empty.")
+
+    verts = _vertex_array(triangles)
+    inverse, n_vertices = _merge_vertices(verts)
+    faces = inverse.reshape(-1, 3)
+    _, vertex_shell = np.unique(_vertex_components(faces, n_vertices), return_inverse=True)
+    vertex_shell = vertex_shell.reshape(-1)
+    n_shells = int(vertex_shell.max()) + 1
+    shell = vertex_shell[faces[:, 0]]
+
+    # per shell: signed volume, bounds (mm), triangles, and edge use counts
+    tri = verts.reshape(-1, 3, 3)
+    v0, v1, v2 = (tri[:, i].astype(np.float64) for i in range(3))
+    volume = np.bincount(shell, weights=np.einsum("ij,ij->i", v0, np.cross(v1, v2)), minlength=n_shells) / 6.0
+    lo = np.full((n_shells, 3), np.inf)
+    hi = np.full((n_shells, 3), -np.inf)
+    _group_bounds(lo, hi, shell, np.minimum(np.minimum(tri[:, 0], tri[:, 1]), tri[:, 2]),
+                  np.maximum(np.maximum(tri[:, 0], tri[:, 1]), tri[:, 2]))
+    counts = np.bincount(shell, minlength=n_shells)
+
+    keys = np.sort(edge_keys(faces, n_vertices))
+    new = np.empty(keys.size, dtype=bool)
+    new[0] = True
+    np.not_equal(keys[1:], keys[:-1], out=new[1:])
+    run_starts = np.flatnonzero(new)
+    uses = np.diff(np.append(run_starts, keys.size))
+    run_shell = vertex_shell[keys[run_starts] // n_vertices]  # both ends of an edge share a shell
+    boundary = np.bincount(run_shell[uses == 1], minlength=n_shells)
+    non_manifold = np.bincount(run_shell[uses > 2], minlength=n_shells)
+
+    _, body = np.unique(_merge_cavities(volume, lo, hi), return_inverse=True)
+    n_bodies = int(body.max()) + 1
+    b_volume = np.abs(np.bincount(body, weights=volume, minlength=n_bodies))
+    b_lo = np.full((n_bodies, 3), np.inf)
+    b_hi = np.full((n_bodies, 3), -np.inf)
+    _group_bounds(b_lo, b_hi, body, lo, hi)
+    b_counts, b_boundary, b_non_manifold = (
+        np.bincount(body, weights=w, minlength=n_bodies).astype(np.int64) for w in (counts, boundary, non_manifold)
+    )
+
+    rank = np.argsort(-b_volume, kind="stable")  # largest first
+    relabel = np.empty(n_bodies, dtype=np.int64)
+    relabel[rank] = np.arange(n_bodies)
+    extents = b_hi - b_lo
+    metrics = tuple(
+        StlMetrics(
+            volume_ml=float(b_volume[i]) / MM3_PER_ML,
+            bounds_in=_extents_in(extents[i]),
+            is_watertight=bool(b_boundary[i] == 0 and b_non_manifold[i] == 0),
+            triangles=int(b_counts[i]),
+            boundary_edges=int(b_boundary[i]),
+            non_manifold_edges=int(b_non_manifold[i]),
+        )
+        for i in rank
+    )
+    whole = hi.max(axis=0) - lo.min(axis=0)
+    return Bodies(
+        metrics=metrics,
+        whole=StlMetrics(
+            volume_ml=abs(float(volume.sum())) / MM3_PER_ML,
+            bounds_in=_extents_in(whole),
+            is_watertight=bool(boundary.sum() == 0 and non_manifold.sum() == 0),
+            triangles=len(triangles),
+            boundary_edges=int(boundary.sum()),
+            non_manifold_edges=int(non_manifold.sum()),
+        ),
+        labels=relabel[body[shell]],
+    )
+
+def _metrics_from_trimesh(mesh) -> StlMetrics:
+    # Trimesh works in whatever units the STL was authored in.
     volume_mm3 = abs(float(mesh.volume))
     volume_ml = volume_mm3 / MM3_PER_ML
 
@@ -38,27 +359,55 @@ def load_stl_metrics(stl_path: str | Path) -> StlMetrics:
     y_in = _mm_to_in(float(extents[1]))
     z_in = _mm_to_in(float(extents[2]))
 
+    e = np.asarray(mesh.edges_sorted, dtype=np.int64)
+    _, boundary, non_manifold = edge_use_counts(np.sort(e[:, 0] * len(mesh.vertices) + e[:, 1]))
     return StlMetrics(
         volume_ml=volume_ml,
         bounds_in=(x_in, y_in, z_in),
         is_watertight=bool(mesh.is_watertight),
+        triangles=len(mesh.faces),
+        boundary_edges=boundary,
+        non_manifold_edges=non_manifold,
     )
 
-def check_fits_printer(cfg: Dict[str, Any], printer_name: str, bounds_in: Tuple[float, float, float]) -> None:
-    printers = cfg.get("printers", {})
-    if printer_name not in printers:
-        raise KeyError(f"Printer not found in config: {printer_name}")
+def is_large_stl(source: StlSource) -> bool:
+    """Past CHUNKED_METRICS_BYTES: read one block at a time (stl_stream), never loaded whole."""
+    return source_size(source) > CHUNKED_METRICS_BYTES
+
+def load_stl_metrics(source: StlSource) -> StlMetrics:
+    """Metrics from an STL path or the raw bytes of an STL upload."""
+    if is_large_stl(source):
+        from .stl_stream import scan_stl_metrics
+
+        return scan_stl_metrics(source)
+
+    # Fast path: binary STL via a memory-mapped (or buffer-backed) facet array, no mesh object.
+    facets = _binary_facets(source)
+    if facets is not None:
+        return metrics_from_triangles(facets["vertices"])
 
-    bv = printers[printer_name]["build_volume_in"]
-    max_x = float(bv["x"])
-    max_y = float(bv["y"])
-    max_z = float(bv["z"])
+    return _metrics_from_trimesh(_load_trimesh(source))
+
+def check_fits_printer(
+    cfg: ConfigLike,
+    printer_name: str,
+    bounds_in: Tuple[float, float, float],
+    fit: Optional["PrinterFit"] = None,
+) -> None:
+    """
+    Raise ValueError if the part does not fit the printer. `bounds_in` are the extents as
+    modeled; pass the orientation search result as `fit` to accept parts that only fit rotated.
+    """
+    max_x, max_y, max_z = ensure_compiled(cfg).printer(printer_name).build_volume_in
 
     x, y, z = bounds_in
-    # MVP: no rotation/orientation optimization; just compare extents
-    if x > max_x or y > max_y or z > max_z:
-        raise ValueError(
-            f"Part does not fit {printer_name} build volume. "
-            f"Part extents (in): {x:.2f} x {y:.2f} x {z:.2f} "
-            f"Build volume (in): {max_x:.2f} x {max_y:.2f} x {max_z:.2f}"
-        )
+    if x <= max_x and y <= max_y and z <= max_z:
+        return
+    if fit is not None and fit.fits:
+        return
+    how = " in any orientation" if fit is not None else ""
+    raise ValueError(
+        f"Part does not fit {printer_name} build volume{how}. "
+        f"Part extents (in): {x:.2f} x {y:.2f} x {z:.2f} "
+        f"Build volume (in): {max_x:.2f} x {max_y:.2f} x {max_z:.2f}"
+    )
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .geometry import (
+    GEOMETRY_VERSION,
+    Bodies,
+    StlMetrics,
+    StlSource,
+    is_large_stl,
+    load_stl_metrics,
+    load_stl_triangles,
+    split_bodies,
+)
+from .config import ConfigLike, SupportSpec
+from .orientation import (
+    Matrix3,
+    OrientationReport,
+    build_volumes_digest,
+    orientation_report,
+    report_from_dict,
+    report_to_dict,
+    rotate_triangles,
+)
+from .nesting import Footprint, footprint
+from .print_time import LayerProfile, layer_profile
+from .supports import SupportEstimate, estimate_supports
+
+_CHUNK = 1024 * 1024
+
+# Loads the triangles to work on when a result is not cached (e.g. one body of the STL)
+TriangleLoader = Callable[[], np.ndarray]
+
+
+def default_cache_dir() -> Path:
+    env = os.environ.get("SLA_QUOTE_CACHE_DIR")
+    if env:
+        return Path(env)
+    base = os.environ.get("XDG_CACHE_HOME") or (Path.home() / ".cache")
+    return Path(base) / "sla-quote"
+
+
+def file_digest(source: StlSource) -> str:
+    """sha256 of a file's content, or of an in-memory buffer."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(source).hexdigest()
+    h = hashlib.sha256()
+    with Path(source).open("rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _rotation_key(rotation: Matrix3) -> str:
+    return hashlib.sha256(json.dumps(rotation).encode("utf-8")).hexdigest()[:16]
+
+
+def _support_key(spec: SupportSpec) -> str:
+    return hashlib.sha256(json.dumps(asdict(spec), sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class GeometryCache:
+    """
+    Content-addressed store for geometry results (SQLite, LRU-evicted by entry count).
+
+    Keys are (content sha256, kind, GEOMETRY_VERSION), so renamed or re-uploaded files hit
+    and a geometry code change invalidates old rows. `kind` lets derived geometry
+    (not just StlMetrics) share the same store. On a miss without `triangles`, sources past
+    the block-wise scan threshold are read one block at a time (stl_stream), as modeled.
+    """
+
+    def __init__(self, path: str | Path | None = None, max_entries: int = 50_000) -> None:
+        self.path = Path(path) if path else default_cache_dir() / "geometry.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = int(max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS geometry ("
+            " key TEXT PRIMARY KEY, payload TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS geometry_lru ON geometry(last_access)")
+        self._db.commit()
+        # Row count at open plus this connection's inserts; put() runs the full COUNT(*) (which also
+        # sees other processes' rows) only once this estimate passes max_entries.
+        (self._entries,) = self._db.execute("SELECT COUNT(*) FROM geometry").fetchone()
+
+    @staticmethod
+    def _key(digest: str, kind: str) -> str:
+        return f"{GEOMETRY_VERSION}:{kind}:{digest}"
+
+    def get(self, digest: str, kind: str) -> Optional[Dict[str, Any]]:
+        key = self._key(digest, kind)
+        with self._lock:
+            row = self._db.execute("SELECT payload FROM geometry WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE geometry SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return json.loads(row[0])
+
+    def put(self, digest: str, kind: str, payload: Dict[str, Any]) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO geometry (key, payload, last_access) VALUES (?, ?, ?)",
+                (self._key(digest, kind), json.dumps(payload), time.time()),
+            )
+            self._entries += 1
+            if self._entries > self.max_entries:
+                (count,) = self._db.execute("SELECT COUNT(*) FROM geometry").fetchone()
+                if count > self.max_entries:
+                    self._db.execute(
+                        "DELETE FROM geometry WHERE key IN"
+                        " (SELECT key FROM geometry ORDER BY last_access ASC LIMIT ?)",
+                        (count - self.max_entries,),
+                    )
+                self._entries = min(count, self.max_entries)
+            self._db.commit()
+
+    def stl_metrics(self, source: StlSource, digest: Optional[str] = None) -> Tuple[StlMetrics, bool]:
+        """Returns (metrics, cache_hit) for an STL path or bytes. Only the hash is computed on a hit."""
+        digest = digest or file_digest(source)
+        cached = self.get(digest, "stl_metrics")
+        if cached is not None:
+            cached["bounds_in"] = tuple(cached["bounds_in"])
+            return StlMetrics(**cached), True
+
+        m = load_stl_metrics(source)
+        self.put(digest, "stl_metrics", asdict(m))
+        return m, False
+
+    def bodies(self, source: StlSource, digest: Optional[str] = None) -> Tuple[Bodies, bool]:
+        """
+        Returns (disconnected bodies, cache_hit). A hit has no per-triangle labels; a miss also
+        stores the whole-mesh stl_metrics, which come out of the same pass.
+        """
+        digest = digest or file_digest(source)
+        cached = self.get(digest, "bodies")
+        if cached is not None:
+            metrics = [StlMetrics(**{**m, "bounds_in": tuple(m["bounds_in"])}) for m in cached["bodies"]]
+            whole = StlMetrics(**{**cached["whole"], "bounds_in": tuple(cached["whole"]["bounds_in"])})
+            return Bodies(metrics=tuple(metrics), whole=whole), True
+
+        bodies = split_bodies(load_stl_triangles(source))
+        self.put(digest, "bodies", {"whole": asdict(bodies.whole), "bodies": [asdict(m) for m in bodies.metrics]})
+        self.put(digest, "stl_metrics", asdict(bodies.whole))
+        return bodies, False
+
+    def layer_profile(
+        self,
+        source: StlSource,
+        layer_height_mm: float,
+        digest: Optional[str] = None,
+        rotation: Optional[Matrix3] = None,
+        triangles: Optional[TriangleLoader] = None,
+    ) -> Tuple[LayerProfile, bool]:
+        """
+        Returns (per-layer area summary, cache_hit) at the given layer height, optionally after `rotation`.
+        `triangles` replaces reading `source` on a miss; `digest` then names what it loads.
+        """
+        digest = digest or file_digest(source)
+        kind = f"layer_profile:{layer_height_mm:g}"
+        if rotation is not None:
+            kind += ":" + _rotation_key(rotation)
+        cached = self.get(digest, kind)
+        if cached is not None:
+            return LayerProfile(**cached), True
+
+        if triangles is None and rotation is None and is_large_stl(source):
+            from .stl_stream import scan_layer_profile
+
+            profile = scan_layer_profile(source, layer_height_mm)
+        else:
+            tri = triangles() if triangles is not None else load_stl_triangles(source)
+            if rotation is not None:
+                tri = rotate_triangles(tri, rotation)
+            profile = layer_profile(tri, layer_height_mm)
+        self.put(digest, kind, asdict(profile))
+        return profile, False
+
+    def orientation(
+        self,
+        source: StlSource,
+        cfg: ConfigLike,
+        digest: Optional[str] = None,
+        triangles: Optional[TriangleLoader] = None,
+    ) -> Tuple[OrientationReport, bool]:
+        """Returns (orientation report for every printer in cfg, cache_hit)."""
+        digest = digest or file_digest(source)
+        kind = f"orientation:{build_volumes_digest(cfg)}"
+        cached = self.get(digest, kind)
+        if cached is not None:
+            return report_from_dict(cached), True
+
+        report = orientation_report(triangles() if triangles is not None else load_stl_triangles(source), cfg)
+        self.put(digest, kind, report_to_dict(report))
+        return report, False
+
+    def footprint(
+        self,
+        source: StlSource,
+        digest: Optional[str] = None,
+        rotation: Optional[Matrix3] = None,
+        triangles: Optional[TriangleLoader] = None,
+    ) -> Tuple[Footprint, bool]:
+        """Returns (build-plate footprint, cache_hit), optionally after `rotation`."""
+        digest = digest or file_digest(source)
+        kind = "footprint" if rotation is None else f"footprint:{_rotation_key(rotation)}"
+        cached = self.get(digest, kind)
+        if cached is not None:
+            return Footprint(tuple(cached["support_mm"])), True
+
+        if triangles is None and rotation is None and is_large_stl(source):
+            from .stl_stream import scan_footprint
+
+            fp = scan_footprint(source)
+        else:
+            fp = footprint(triangles() if triangles is not None else load_stl_triangles(source), rotation)
+        self.put(digest, kind, {"support_mm": list(fp.support_mm)})
+        return fp, False
+
+    def supports(
+        self,
+        source: StlSource,
+        spec: SupportSpec,
+        digest: Optional[str] = None,
+        rotation: Optional[Matrix3] = None,
+        triangles: Optional[TriangleLoader] = None,
+    ) -> Tuple[SupportEstimate, bool]:
+        """Returns (support-resin estimate, cache_hit) for the support model, optionally after `rotation`."""
+        digest = digest or file_digest(source)
+        kind = f"supports:{_support_key(spec)}"
+        if rotation is not None:
+            kind += ":" + _rotation_key(rotation)
+        cached = self.get(digest, kind)
+        if cached is not None:
+            return SupportEstimate(**cached), True
+
+        if triangles is None and rotation is None and is_large_stl(source):
+            from .stl_stream import scan_supports
+
+            est = scan_supports(source, spec)
+        else:
+            tri = triangles() if triangles is not None else load_stl_triangles(source)
+            est = estimate_supports(tri, spec, rotation)
+        self.put(digest, kind, asdict(est))
+        return est, False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM geometry").fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+            "entries": entries,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
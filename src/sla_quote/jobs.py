@@ -0,0 +1,531 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from pydantic import ValidationError
+
+from .config import CompiledConfig
+from .geometry import StlTooLargeToPlace
+from .metrics import JOB_EVENTS, JOB_WAIT_SECONDS, JOBS
+from .model import QuoteInput
+from .registry import ConfigEntry
+from .workers import PoolSaturated, QuoteJob, QuotePool, run_quote_job
+
+JOB_STATES = ("queued", "running", "done", "failed")
+FINISHED = ("done", "failed")
+# A waiting job gains this many priority points per minute, so routine work is never starved.
+AGING_POINTS_PER_MINUTE = 0.1
+# Running jobs are re-stamped every HEARTBEAT_SECONDS; one not stamped for STALE_AFTER_SECONDS
+# belonged to a server that died, and is queued again.
+HEARTBEAT_SECONDS = 5.0
+STALE_AFTER_SECONDS = 30.0
+PURGE_EVERY_SECONDS = 3600.0
+# the queue's statements read rows back with UPDATE/INSERT ... RETURNING
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    status TEXT NOT NULL,
+    priority REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    not_before REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    heartbeat_at REAL,
+    owner TEXT,
+    quote_id TEXT NOT NULL,
+    config_name TEXT NOT NULL,
+    request_json TEXT NOT NULL,
+    cad_name TEXT,
+    cad_path TEXT,
+    result_json TEXT,
+    error TEXT,
+    error_status INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs(finished_at);
+"""
+_COLUMNS = (
+    "seq", "id", "status", "priority", "attempts", "max_attempts", "created_at", "started_at",
+    "finished_at", "quote_id", "config_name", "request_json", "cad_name", "cad_path", "result_json",
+    "error", "error_status",
+)
+_SELECT = ", ".join(_COLUMNS)
+# ready jobs in run order: priority plus aging, then submission order
+_SCORE = "priority + (? - created_at) * ?"
+
+
+def default_jobs_path() -> Path:
+    return Path(os.environ.get("SLA_QUOTE_JOBS_DB", "dist/jobs.sqlite"))
+
+
+def job_priority(q: QuoteInput, cfg: CompiledConfig) -> float:
+    """Scheduling priority from the customer's tier and the expedite multiplier (config job_priority)."""
+    spec = cfg.job_priority
+    expedite = float(q.options.expedite_multiplier or cfg.expedite_default)
+    return spec.tiers.get(q.customer.tier or "", 0.0) + spec.expedite_points * max(expedite - 1.0, 0.0)
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return None if ts is None else time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+
+class QueueFull(RuntimeError):
+    """Raised by JobQueue.submit when max_queued jobs are already waiting."""
+
+
+@dataclass(frozen=True)
+class Job:
+    seq: int
+    id: str
+    status: str  # queued, running, done or failed
+    priority: float
+    attempts: int
+    max_attempts: int
+    created_at: float
+    started_at: Optional[float]  # first start
+    finished_at: Optional[float]
+    quote_id: str
+    config_name: str
+    request: Dict[str, Any]  # quote input and QuoteJob options (out_dir, lazy, store_dir, timings)
+    cad_name: Optional[str]
+    cad_path: Optional[str]  # in the queue's spool directory until the job finishes
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]  # last error; kept while a failed attempt waits for its retry
+    error_status: Optional[int]  # HTTP status matching the error (400, 422, 500)
+
+    @classmethod
+    def _from_row(cls, row: tuple) -> "Job":
+        values = dict(zip(_COLUMNS, row))
+        values["request"] = json.loads(values.pop("request_json"))
+        result = values.pop("result_json")
+        values["result"] = json.loads(result) if result is not None else None
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public view (GET /jobs/{id}) without the stored request."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "quote_id": self.quote_id,
+            "config_name": self.config_name,
+            "priority": round(self.priority, 3),
+            "attempts": self.attempts,
+            "max_attempts": self.max_attempts,
+            "created_at": _iso(self.created_at),
+            "started_at": _iso(self.started_at),
+            "finished_at": _iso(self.finished_at),
+            "error": self.error,
+            "error_status": self.error_status,
+        }
+
+
+class JobQueue:
+    """
+    Persistent priority queue of quote jobs in SQLite (WAL mode), safe to share between server
+    processes. CAD files wait in `<db>.spool/` until their job finishes.
+
+    Ready jobs run highest priority first, gaining AGING_POINTS_PER_MINUTE while they wait, then
+    in submission order. A failed attempt is retried after retry_seconds (doubling each time) up
+    to max_attempts; submit() refuses new jobs once max_queued are waiting. Finished jobs are
+    kept for ttl_seconds.
+    """
+
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        max_queued: int = 1000,
+        max_attempts: int = 3,
+        retry_seconds: float = 2.0,
+        ttl_seconds: float = 7 * 24 * 3600,
+    ) -> None:
+        if max_queued < 1 or max_attempts < 1:
+            raise ValueError("max_queued and max_attempts must be at least 1.")
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            raise RuntimeError(
+                f"The job queue needs SQLite {'.'.join(map(str, MIN_SQLITE_VERSION))} or later;"
+                f" this Python uses SQLite {sqlite3.sqlite_version}."
+            )
+        self.path = Path(path) if path else default_jobs_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.spool_dir = self.path.with_name(self.path.name + ".spool")
+        self.max_queued = max_queued
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.ttl_seconds = ttl_seconds
+        self.owner = uuid.uuid4().hex  # marks the jobs this instance is running
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> "JobQueue":
+        """SLA_QUOTE_JOBS_DB, SLA_QUOTE_JOBS_MAX_QUEUED, _MAX_ATTEMPTS, _RETRY_SECONDS and _TTL (s)."""
+        env = os.environ.get
+        return cls(
+            max_queued=int(env("SLA_QUOTE_JOBS_MAX_QUEUED", "1000")),
+            max_attempts=int(env("SLA_QUOTE_JOBS_MAX_ATTEMPTS", "3")),
+            retry_seconds=float(env("SLA_QUOTE_JOBS_RETRY_SECONDS", "2")),
+            ttl_seconds=float(env("SLA_QUOTE_JOBS_TTL", 7 * 24 * 3600)),
+        )
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock up front, so check-then-write is atomic across processes
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def _queued(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def submit(
+        self,
+        q: QuoteInput,
+        config_name: str,
+        priority: float,
+        request: Dict[str, Any],
+        cad_name: Optional[str] = None,
+        cad: bytes | Path | None = None,
+    ) -> Job:
+        """
+        Queue a quote. `cad` is the CAD content or a file, which is moved into the spool.
+        `request` holds the QuoteJob options; the quote input is added to it.
+        """
+        with self._lock:
+            queued = self._queued()
+        if queued >= self.max_queued:
+            JOB_EVENTS.inc(event="rejected")
+            raise QueueFull(f"{queued} jobs already queued (max {self.max_queued}).")
+
+        job_id = uuid.uuid4().hex
+        cad_path: Optional[Path] = None
+        if cad is not None:
+            self.spool_dir.mkdir(parents=True, exist_ok=True)
+            cad_path = self.spool_dir / f"{job_id}{Path(cad_name or '').suffix}"
+            if isinstance(cad, Path):
+                shutil.move(str(cad), cad_path)
+            else:
+                cad_path.write_bytes(cad)
+        row = (
+            job_id, priority, self.max_attempts, time.time(), q.quote_id, config_name,
+            json.dumps({**request, "quote": q.model_dump(mode="json")}), cad_name,
+            str(cad_path) if cad_path is not None else None,
+        )
+        try:
+            with self._tx() as db:
+                queued = self._queued()
+                if queued >= self.max_queued:
+                    JOB_EVENTS.inc(event="rejected")
+                    raise QueueFull(f"{queued} jobs already queued (max {self.max_queued}).")
+                # the row as inserted: a runner may claim it before the caller looks
+                inserted = db.execute(
+                    "INSERT INTO jobs (id, status, priority, max_attempts, created_at, quote_id, config_name,"
+                    " request_json, cad_name, cad_path) VALUES (?, 'queued', ?, ?, ?, ?, ?, ?, ?, ?)"
+                    f" RETURNING {_SELECT}",
+                    row,
+                ).fetchone()
+        except BaseException:
+            if cad_path is not None:
+                cad_path.unlink(missing_ok=True)
+            raise
+        JOB_EVENTS.inc(event="submitted")
+        return Job._from_row(inserted)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {_SELECT} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job._from_row(row) if row is not None else None
+
+    def position(self, job: Job, now: Optional[float] = None) -> Optional[int]:
+        """Queued jobs that would run before this one (0: next); None unless it is queued."""
+        if job.status != "queued":
+            return None
+        now = time.time() if now is None else now
+        rate = AGING_POINTS_PER_MINUTE / 60.0
+        mine = job.priority + (now - job.created_at) * rate
+        with self._lock:
+            return self._db.execute(
+                f"SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND ({_SCORE} > ? OR ({_SCORE} = ? AND seq < ?))",
+                (now, rate, mine, now, rate, mine, job.seq),
+            ).fetchone()[0]
+
+    def claim(self, now: Optional[float] = None) -> Optional[Job]:
+        """Mark the next ready job running (one attempt) and return it; None when nothing is ready."""
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._db.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1,"
+                " started_at = COALESCE(started_at, ?), heartbeat_at = ?, owner = ?"
+                " WHERE seq = (SELECT seq FROM jobs WHERE status = 'queued' AND not_before <= ?"
+                f" ORDER BY {_SCORE} DESC, seq LIMIT 1) RETURNING {_SELECT}",
+                (now, now, self.owner, now, now, AGING_POINTS_PER_MINUTE / 60.0),
+            ).fetchone()
+        if row is None:
+            return None
+        job = Job._from_row(row)
+        if job.attempts == 1:
+            JOB_WAIT_SECONDS.observe(max(now - job.created_at, 0.0))
+        return job
+
+    def release(self, job_id: str) -> None:
+        """Put a claimed job back without counting the attempt (no worker was free)."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'queued', attempts = attempts - 1, owner = NULL"
+                " WHERE id = ? AND status = 'running'",
+                (job_id,),
+            )
+
+    def _finish(
+        self,
+        job_id: str,
+        status: str,
+        result: Optional[Dict[str, Any]],
+        error: Optional[str],
+        error_status: Optional[int],
+    ) -> Job:
+        with self._lock:
+            row = self._db.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, owner = NULL, result_json = ?, error = ?,"
+                f" error_status = ? WHERE id = ? RETURNING {_SELECT}",
+                (status, time.time(), json.dumps(result) if result is not None else None, error, error_status, job_id),
+            ).fetchone()
+        job = Job._from_row(row)
+        if job.cad_path:
+            Path(job.cad_path).unlink(missing_ok=True)
+        JOB_EVENTS.inc(event=status)
+        return job
+
+    def complete(self, job_id: str, result: Dict[str, Any]) -> Job:
+        return self._finish(job_id, "done", result, None, None)
+
+    def fail(self, job_id: str, error: str, error_status: int, retry: bool = False) -> Job:
+        """Record a failed attempt; with retry=True it is queued again unless out of attempts."""
+        job = self.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown job: {job_id}")
+        if not retry or job.attempts >= job.max_attempts:
+            return self._finish(job_id, "failed", None, error, error_status)
+        delay = self.retry_seconds * 2 ** (job.attempts - 1)
+        with self._lock:
+            row = self._db.execute(
+                "UPDATE jobs SET status = 'queued', not_before = ?, owner = NULL, error = ?, error_status = ?"
+                f" WHERE id = ? RETURNING {_SELECT}",
+                (time.time() + delay, error, error_status, job_id),
+            ).fetchone()
+        JOB_EVENTS.inc(event="retried")
+        return Job._from_row(row)
+
+    def heartbeat(self, now: Optional[float] = None) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status = 'running'",
+                (time.time() if now is None else now, self.owner),
+            )
+
+    def requeue_stale(self, now: Optional[float] = None) -> int:
+        """Queue again the running jobs whose server stopped heart-beating; returns how many."""
+        now = time.time() if now is None else now
+        with self._lock:
+            stale = self._db.execute(
+                "SELECT id, attempts, max_attempts FROM jobs WHERE status = 'running' AND heartbeat_at < ?",
+                (now - STALE_AFTER_SECONDS,),
+            ).fetchall()
+        n = 0
+        for job_id, attempts, max_attempts in stale:
+            if attempts >= max_attempts:
+                self._finish(job_id, "failed", None, "Interrupted: the server stopped while the job ran.", 500)
+                continue
+            with self._lock:
+                n += self._db.execute(
+                    "UPDATE jobs SET status = 'queued', owner = NULL WHERE id = ? AND status = 'running'",
+                    (job_id,),
+                ).rowcount
+        return n
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {**{s: 0 for s in JOB_STATES}, **dict(rows)}
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Delete finished jobs older than ttl_seconds."""
+        cutoff = (time.time() if now is None else now) - self.ttl_seconds
+        with self._lock:
+            return self._db.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'failed') AND finished_at < ?", (cutoff,)
+            ).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class JobRunner:
+    """
+    Runs queued jobs on a QuotePool from the event loop: one dispatcher per pool worker, each
+    claiming the best ready job whenever it is free, so jobs never hold more than the pool's
+    workers and synchronous /quote requests still get their share.
+
+    resolve_config maps a job's config_name to the registry's entry when the job starts.
+    finish(result, pool_seconds, keep_timings) post-processes results (the server's metrics).
+    """
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        get_pool: Callable[[], QuotePool],
+        resolve_config: Callable[[str], ConfigEntry],
+        finish: Optional[Callable[[Dict[str, Any], float, bool], None]] = None,
+        poll_interval: float = 0.5,
+    ) -> None:
+        self.queue = queue
+        self.get_pool = get_pool
+        self.resolve_config = resolve_config
+        self.finish = finish
+        self.poll_interval = poll_interval
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._changed: Optional[asyncio.Event] = None
+
+    def ensure_started(self) -> None:
+        """Start the dispatchers on the running event loop (again, if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._changed = asyncio.Event()
+        workers = self.get_pool().workers
+        self._tasks = [loop.create_task(self._dispatch()) for _ in range(workers)]
+        self._tasks.append(loop.create_task(self._housekeeping()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """A job was submitted: wake idle dispatchers."""
+        if self._wake is not None:
+            self._wake.set()
+        self._signal_changed()
+
+    def _signal_changed(self) -> None:
+        if self._changed is not None:
+            self._changed.set()
+            self._changed = asyncio.Event()
+
+    async def changed(self, timeout: float) -> None:
+        """Wait until some job changes state in this process, or `timeout` seconds."""
+        event = self._changed
+        if event is None:
+            await asyncio.sleep(timeout)
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def refresh_metrics(self) -> None:
+        for status, n in self.queue.counts().items():
+            JOBS.set(n, status=status)
+
+    async def _dispatch(self) -> None:
+        assert self._wake is not None
+        while True:
+            job = await asyncio.to_thread(self.queue.claim)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+            self._signal_changed()
+            try:
+                await self._run(job)
+            finally:
+                self._signal_changed()
+
+    async def _run(self, job: Job) -> None:
+        req = job.request
+        t0 = time.perf_counter()
+        try:
+            entry = self.resolve_config(job.config_name)
+            quote_job = QuoteJob(
+                quote=QuoteInput.model_validate(req["quote"]),
+                config_path=entry.path,
+                config=entry.config,
+                out_dir=req["out_dir"],
+                cad_name=job.cad_name,
+                cad_path=job.cad_path,
+                lazy=req["lazy"],
+                store_dir=req["store_dir"],
+                timings=req["timings"],
+            )
+            result = await self.get_pool().run(run_quote_job, quote_job)
+        except PoolSaturated:
+            # synchronous requests hold every slot; try again shortly
+            await asyncio.to_thread(self.queue.release, job.id)
+            await asyncio.sleep(0.05)
+            return
+        except asyncio.CancelledError:
+            await asyncio.shield(asyncio.to_thread(self.queue.release, job.id))
+            raise
+        except ValidationError as e:
+            await asyncio.to_thread(self.queue.fail, job.id, f"Not a valid quote input: {e}", 400)
+            return
+        except StlTooLargeToPlace as e:
+            # a large STL asked for work that would load the whole mesh: as /quote, 413
+            await asyncio.to_thread(self.queue.fail, job.id, str(e), 413)
+            return
+        except ValueError as e:
+            await asyncio.to_thread(self.queue.fail, job.id, str(e), 400)
+            return
+        except NotImplementedError as e:
+            await asyncio.to_thread(self.queue.fail, job.id, str(e), 422)
+            return
+        except Exception as e:
+            # worker crashes, I/O errors: worth another attempt
+            await asyncio.to_thread(self.queue.fail, job.id, f"Quote generation failed: {e}", 500, True)
+            return
+        if self.finish is not None:
+            self.finish(result, time.perf_counter() - t0, req.get("keep_timings", False))
+        await asyncio.to_thread(self.queue.complete, job.id, result)
+
+    async def _housekeeping(self) -> None:
+        last_purge = 0.0
+        while True:
+            await asyncio.to_thread(self.queue.heartbeat)
+            if await asyncio.to_thread(self.queue.requeue_stale):
+                self.notify()
+            if time.monotonic() - last_purge > PURGE_EVERY_SECONDS:
+                await asyncio.to_thread(self.queue.purge)
+                last_purge = time.monotonic()
+            await asyncio.sleep(HEARTBEAT_SECONDS)
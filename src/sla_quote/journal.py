@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from .model import QuoteInput
+
+# Columns that can be filtered on (each has an index).
+FILTER_COLUMNS = ("quote_id", "customer", "part_number", "printer", "resin")
+SUMMARY_COLUMNS = (
+    "id", "created_at", "quote_id", "customer", "part_number", "printer", "resin",
+    "qty", "currency", "sell_price", "price_per_part", "config_hash",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    quote_id TEXT NOT NULL,
+    customer TEXT NOT NULL COLLATE NOCASE,
+    part_number TEXT NOT NULL,
+    printer TEXT NOT NULL,
+    resin TEXT NOT NULL,
+    qty INTEGER NOT NULL,
+    currency TEXT NOT NULL,
+    sell_price REAL NOT NULL,
+    price_per_part REAL NOT NULL,
+    config_hash TEXT NOT NULL,
+    input_json TEXT NOT NULL,
+    result_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quotes_quote_id ON quotes(quote_id);
+CREATE INDEX IF NOT EXISTS quotes_customer ON quotes(customer, created_at);
+CREATE INDEX IF NOT EXISTS quotes_part_number ON quotes(part_number, created_at);
+CREATE INDEX IF NOT EXISTS quotes_printer ON quotes(printer, created_at);
+CREATE INDEX IF NOT EXISTS quotes_resin ON quotes(resin, created_at);
+CREATE INDEX IF NOT EXISTS quotes_created_at ON quotes(created_at);
+"""
+
+
+def default_journal_path() -> Path:
+    return Path(os.environ.get("SLA_QUOTE_JOURNAL", "dist/quotes.sqlite"))
+
+
+class QuoteJournal:
+    """
+    Append-only quote history in SQLite (WAL mode, safe for several writer processes).
+    Every row keeps the full priced input, the config hash and the result.
+    """
+
+    def __init__(self, path: str | Path | None = None) -> None:
+        self.path = Path(path) if path else default_journal_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), timeout=30.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    def record(
+        self,
+        q: QuoteInput,
+        result: Dict[str, Any],
+        config_hash: str,
+        created_at: Optional[datetime] = None,
+    ) -> int:
+        ts = (created_at or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        row = (
+            ts.isoformat(timespec="seconds"),
+            result["quote_id"],
+            q.customer.name,
+            q.part.part_number,
+            q.process.printer,
+            q.process.resin,
+            int(result["qty"]),
+            result["currency"],
+            float(result["sell_price"]),
+            float(result["price_per_part"]),
+            config_hash,
+            q.model_dump_json(),
+            json.dumps(result),
+        )
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT INTO quotes (created_at, quote_id, customer, part_number, printer, resin, qty,"
+                " currency, sell_price, price_per_part, config_hash, input_json, result_json)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                row,
+            )
+            self._db.commit()
+            return int(cur.lastrowid)
+
+    @staticmethod
+    def _where(
+        filters: Dict[str, Optional[str]],
+        since: Optional[str],
+        until: Optional[str],
+    ) -> Tuple[str, List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        for col in FILTER_COLUMNS:
+            value = filters.get(col)
+            if value is not None:
+                clauses.append(f"{col} = ?")
+                params.append(value)
+        # created_at is ISO-8601 UTC text, so string comparison orders correctly
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("created_at < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: Optional[int] = 100,
+        full: bool = False,
+        oldest_first: bool = False,
+        **filters: Optional[str],
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Newest-first (or oldest_first) rows matching the filters (quote_id, customer, part_number,
+        printer, resin). full=True adds the parsed input and result. limit always keeps the newest
+        rows; oldest_first only changes the order they come back in.
+        """
+        unknown = set(filters) - set(FILTER_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown history filter(s): {', '.join(sorted(unknown))}")
+        cols = list(SUMMARY_COLUMNS) + (["input_json", "result_json"] if full else [])
+        where, params = self._where(filters, since, until)
+        newest = f"FROM quotes{where} ORDER BY created_at DESC, id DESC"
+        if limit is not None:
+            newest += " LIMIT ?"
+            params.append(int(limit))
+        if oldest_first:
+            sql = f"SELECT {', '.join(cols)} FROM (SELECT * {newest}) ORDER BY created_at, id"
+        else:
+            sql = f"SELECT {', '.join(cols)} {newest}"
+
+        # a separate read cursor streams rows without holding the whole result in memory
+        cur = self._db.cursor()
+        try:
+            cur.execute(sql, params)
+            while True:
+                batch = cur.fetchmany(1000)
+                if not batch:
+                    break
+                for values in batch:
+                    row = dict(zip(cols, values))
+                    if full:
+                        row["input"] = json.loads(row.pop("input_json"))
+                        row["result"] = json.loads(row.pop("result_json"))
+                    yield row
+        finally:
+            cur.close()
+
+    def export(self, out: TextIO, fmt: str = "jsonl", **kwargs: Any) -> int:
+        """Write matching rows as JSON lines (full records) or CSV (summary columns)."""
+        n = 0
+        if fmt == "jsonl":
+            for row in self.query(full=True, **kwargs):
+                out.write(json.dumps(row) + "\n")
+                n += 1
+        elif fmt == "csv":
+            w = csv.DictWriter(out, fieldnames=list(SUMMARY_COLUMNS))
+            w.writeheader()
+            for row in self.query(**kwargs):
+                w.writerow(row)
+                n += 1
+        else:
+            raise ValueError(f"Unknown export format: {fmt} (expected 'jsonl' or 'csv')")
+        return n
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Stage histogram buckets (seconds): sub-millisecond pricing up to multi-second geometry
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = tuple(float(1024 * 4 ** i) for i in range(8))  # 1 KiB .. 16 MiB
+TRIANGLE_BUCKETS = tuple(float(10 ** i) for i in range(1, 8))
+WAIT_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Timings:
+    """
+    Wall time per named stage of one quote, in seconds. Stages may repeat (times add up).
+
+        t = Timings()
+        with t.stage("compute_quote"):
+            ...
+        t.to_dict()  # {"compute_quote": 0.0001, "total": ...}
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self._start = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - t0)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def to_dict(self) -> Dict[str, float]:
+        out = {k: round(v, 6) for k, v in self.stages.items()}
+        out["total"] = round(time.perf_counter() - self._start, 6)
+        return out
+
+
+class _NullTimings(Timings):
+    """Stand-in when timing is off: stage() is a shared no-op context manager."""
+
+    enabled = False
+
+    class _Noop:
+        def __enter__(self) -> None:
+            return None
+
+        def __exit__(self, *exc: object) -> None:
+            return None
+
+    _noop = _Noop()
+
+    def __init__(self) -> None:
+        self.stages = {}
+
+    def stage(self, name: str):  # type: ignore[override]
+        return self._noop
+
+    def add(self, name: str, seconds: float) -> None:
+        pass
+
+    def to_dict(self) -> Dict[str, float]:
+        return {}
+
+
+NO_TIMINGS: Timings = _NullTimings()
+
+
+def _labels(labels: Optional[Dict[str, str]]) -> Labels:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _fmt_labels(labels: Labels, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    esc = (v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, esc)) + "}"
+
+
+def _fmt_value(x: float) -> str:
+    if math.isinf(x):
+        return "+Inf" if x > 0 else "-Inf"
+    return repr(float(x)) if not float(x).is_integer() else str(int(x))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str) -> None:
+        super().__init__(name, help)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_labels(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_fmt_labels(k)} {_fmt_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_labels(labels)] = value
+
+    @contextmanager
+    def track(self, **labels: str) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = STAGE_BUCKETS) -> None:
+        super().__init__(name, help)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket (+Inf last)], sum
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[i] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(_labels(labels))
+        return sum(series[0]) if series else 0
+
+    def _samples(self) -> List[str]:
+        out: List[str] = []
+        with self._lock:
+            items = sorted((k, (list(c), t[0])) for k, (c, t) in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for le, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                out.append(f"{self.name}_bucket{_fmt_labels(key, [('le', _fmt_value(le))])} {cumulative}")
+            out.append(f"{self.name}_sum{_fmt_labels(key)} {_fmt_value(total)}")
+            out.append(f"{self.name}_count{_fmt_labels(key)} {cumulative}")
+        return out
+
+
+class Registry:
+    """A set of metrics rendered together in the Prometheus text format (0.0.4)."""
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+STAGE_SECONDS: Histogram = REGISTRY.register(  # type: ignore[assignment]
+    Histogram("sla_quote_stage_seconds", "Wall time per quote stage.", STAGE_BUCKETS)
+)
+REQUESTS: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter("sla_quote_requests_total", "HTTP requests by route and status code.")
+)
+IN_FLIGHT: Gauge = REGISTRY.register(  # type: ignore[assignment]
+    Gauge("sla_quote_in_flight_requests", "Requests currently being handled.")
+)
+UPLOAD_BYTES: Histogram = REGISTRY.register(  # type: ignore[assignment]
+    Histogram("sla_quote_upload_bytes", "Size of uploaded CAD files.", BYTES_BUCKETS)
+)
+MESH_TRIANGLES: Histogram = REGISTRY.register(  # type: ignore[assignment]
+    Histogram("sla_quote_mesh_triangles", "Triangle count of quoted STL meshes.", TRIANGLE_BUCKETS)
+)
+RESULT_CACHE: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter("sla_quote_result_cache_total", "Result cache lookups by outcome (memory, disk, miss).")
+)
+CONFIG_RELOADS: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter("sla_quote_config_reloads_total", "Config files (re)loaded by the server's registry, by outcome.")
+)
+JOBS: Gauge = REGISTRY.register(  # type: ignore[assignment]
+    Gauge("sla_quote_jobs", "Jobs in the job queue by status (queued, running, done, failed).")
+)
+JOB_EVENTS: Counter = REGISTRY.register(  # type: ignore[assignment]
+    Counter("sla_quote_job_events_total", "Job queue events (submitted, rejected, retried, done, failed).")
+)
+JOB_WAIT_SECONDS: Histogram = REGISTRY.register(  # type: ignore[assignment]
+    Histogram("sla_quote_job_wait_seconds", "Time from submission to a job's first start.", WAIT_BUCKETS)
+)
+
+
+def observe_timings(timings: Dict[str, float]) -> None:
+    """Feed a result's `timings` block into the stage histogram."""
+    for stage, seconds in timings.items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 class Customer(BaseModel):
     name: str
     email: Optional[str] = None
+    # service tier (e.g. "key"); only used to order queued jobs, see the config's job_priority
+    tier: Optional[str] = None
 
 class Part(BaseModel):
     name: str
@@ -17,7 +19,16 @@ class Process(BaseModel):
     resin: str
     part_volume_ml: float = Field(gt=0)
     qty: int = Field(ge=1)
-    print_hours: float = Field(gt=0)
+    # None: estimated from the STL (needs the printer's print_time model in the config)
+    print_hours: Optional[float] = Field(default=None, gt=0)
+    # print_hours and setup are charged once per build; None: 1, or nested from the STL
+    builds: Optional[int] = Field(default=None, ge=1)
+    # support resin per part (ml), charged as material; None: estimated from the STL when the
+    # config has a support section, else 0
+    support_volume_ml: Optional[float] = Field(default=None, ge=0)
+    # an STL holding several disconnected bodies: priced as one part ("combined"), as qty copies
+    # of its largest body ("as_qty"), or body by body with the prices added up ("separate")
+    bodies: Literal["combined", "as_qty", "separate"] = "combined"
 
 class Options(BaseModel):
     wash_cure: bool = True
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .config import ConfigLike, ensure_compiled
+from .geometry import MM_PER_IN
+from .orientation import Matrix3, hull_points
+
+# Footprints are convex polygons described by their support distance along this many
+# evenly spaced directions (a multiple of 4, so quarter turns are a cyclic shift).
+N_DIRECTIONS = 32
+MAX_RASTER_POINTS = 1_000_000
+_SCAN_CHUNK = 4096
+
+_ANGLES = 2.0 * np.pi * np.arange(N_DIRECTIONS) / N_DIRECTIONS
+_U = np.column_stack([np.cos(_ANGLES), np.sin(_ANGLES)])  # (K, 2)
+_X, _Y, _NEG_X, _NEG_Y = 0, N_DIRECTIONS // 4, N_DIRECTIONS // 2, 3 * N_DIRECTIONS // 4
+
+
+@dataclass(frozen=True)
+class Footprint:
+    """
+    Convex outline of a part's projection on the build plate (mm), as support distances
+    from an interior origin: the polygon is {p : u_k . p <= support_mm[k] for all k}.
+    It contains the projected convex hull and overshoots it by well under 1%.
+    """
+    support_mm: Tuple[float, ...]
+
+    @property
+    def width_mm(self) -> float:
+        return self.support_mm[_X] + self.support_mm[_NEG_X]
+
+    @property
+    def depth_mm(self) -> float:
+        return self.support_mm[_Y] + self.support_mm[_NEG_Y]
+
+    def turned(self, quarter_turns: int) -> np.ndarray:
+        """Support values after rotating the part by quarter_turns x 90 degrees about Z."""
+        return np.roll(np.asarray(self.support_mm), quarter_turns * (N_DIRECTIONS // 4))
+
+
+@dataclass(frozen=True)
+class NestResult:
+    copies_per_build: int
+    builds: int
+    spacing_mm: float
+    plate_utilization: float  # footprint area of one full build / plate area
+    placements: Tuple[Tuple[float, float, int], ...]  # first build: (x_mm, y_mm, quarter_turns)
+
+    def to_dict(self) -> dict:
+        return {
+            "copies_per_build": self.copies_per_build,
+            "builds": self.builds,
+            "spacing_mm": self.spacing_mm,
+            "plate_utilization": round(self.plate_utilization, 4),
+        }
+
+
+def footprint(triangles: np.ndarray, rotation: Optional[Matrix3] = None) -> Footprint:
+    """Plate footprint of a mesh, optionally after a PrinterFit.rotation."""
+    pts = hull_points(triangles)
+    if rotation is not None:
+        pts = pts @ np.asarray(rotation, dtype=np.float64).T
+    xy = pts[:, :2] - pts[:, :2].mean(axis=0)
+    return Footprint(tuple(float(h) for h in (xy @ _U.T).max(axis=0)))
+
+
+def _area_mm2(support: np.ndarray) -> float:
+    """Area of the K-gon {p : u_k . p <= h_k}; its vertices are consecutive line intersections."""
+    h0, h1 = support, np.roll(support, -1)
+    c0, s0 = _U[:, 0], _U[:, 1]
+    c1, s1 = np.roll(c0, -1), np.roll(s0, -1)
+    det = math.sin(2.0 * np.pi / N_DIRECTIONS)
+    vx = (h0 * s1 - h1 * s0) / det
+    vy = (h1 * c0 - h0 * c1) / det
+    return float(0.5 * abs(np.sum(vx * np.roll(vy, -1) - np.roll(vx, -1) * vy)))
+
+
+class _Raster:
+    """
+    Candidate positions for one part orientation: every lattice point where the part lies
+    inside the plate, plus a `blocked` mask for points that would overlap a placed copy.
+    Acts as the uniform-grid spatial index: a placement only touches the lattice cells
+    under its no-fit region.
+    """
+
+    def __init__(self, support: np.ndarray, plate: Tuple[float, float], step: float) -> None:
+        self.support = support
+        self.step = step
+        self.x0, self.y0 = support[_NEG_X], support[_NEG_Y]
+        nx = int(math.floor((plate[0] - support[_X] - self.x0) / step + 1e-9)) + 1
+        ny = int(math.floor((plate[1] - support[_Y] - self.y0) / step + 1e-9)) + 1
+        self.blocked = np.zeros((max(ny, 0), max(nx, 0)), dtype=bool)
+        self._cursor = 0
+
+    def first_free(self) -> Optional[Tuple[float, float]]:
+        """Lowest, then leftmost free position; blocked cells never free up, so scanning resumes at the last hit."""
+        flat = self.blocked.reshape(-1)
+        while self._cursor < flat.size:
+            chunk = flat[self._cursor:self._cursor + _SCAN_CHUNK]
+            i = int(np.argmin(chunk))
+            if not chunk[i]:
+                self._cursor += i
+                iy, ix = divmod(self._cursor, self.blocked.shape[1])
+                return self.x0 + ix * self.step, self.y0 + iy * self.step
+            self._cursor += len(chunk)
+        return None
+
+    def block(self, pos: Tuple[float, float], placed: np.ndarray, spacing: float) -> None:
+        """Mark positions whose copy would come within `spacing` of a copy placed at `pos`."""
+        if not self.blocked.size:
+            return
+        # no-fit polygon of the two convex outlines: support h_placed(u) + h_self(-u) + spacing
+        nfp = placed + np.roll(self.support, N_DIRECTIONS // 2) + spacing
+        ny, nx = self.blocked.shape
+        ix0 = max(int(math.floor((pos[0] - nfp[_NEG_X] - self.x0) / self.step)), 0)
+        ix1 = min(int(math.ceil((pos[0] + nfp[_X] - self.x0) / self.step)) + 1, nx)
+        iy0 = max(int(math.floor((pos[1] - nfp[_NEG_Y] - self.y0) / self.step)), 0)
+        iy1 = min(int(math.ceil((pos[1] + nfp[_Y] - self.y0) / self.step)) + 1, ny)
+        if ix0 >= ix1 or iy0 >= iy1:
+            return
+        dx = self.x0 + np.arange(ix0, ix1) * self.step - pos[0]
+        dy = self.y0 + np.arange(iy0, iy1) * self.step - pos[1]
+        # (ny, nx, K): u_k . (q - pos) < nfp_k in every direction
+        proj = (dy[:, None] * _U[:, 1])[:, None, :] + (dx[:, None] * _U[:, 0])[None, :, :]
+        inside = (proj < nfp - 1e-9).all(axis=2)
+        self.blocked[iy0:iy1, ix0:ix1] |= inside
+
+
+def nest(
+    fp: Footprint,
+    plate_mm: Tuple[float, float],
+    qty: int,
+    spacing_mm: float = 3.0,
+    step_mm: Optional[float] = None,
+) -> NestResult:
+    """
+    Pack up to `qty` copies of a footprint on one plate (bottom-left fill, quarter turns
+    allowed), then derive how many builds `qty` needs. Raises ValueError if not even one
+    copy fits.
+    """
+    if qty < 1:
+        raise ValueError("qty must be >= 1.")
+    if step_mm is None:
+        # fine enough to lose < ~1/16 of a part per copy, coarse enough for a fast raster
+        step_mm = min(fp.width_mm, fp.depth_mm) / 16.0
+        step_mm = max(step_mm, math.sqrt(plate_mm[0] * plate_mm[1] / MAX_RASTER_POINTS), 0.1)
+
+    turns: List[int] = []
+    rasters: List[_Raster] = []
+    for t in range(4):
+        support = fp.turned(t)
+        if any(np.allclose(support, r.support) for r in rasters):
+            continue  # symmetric outline: this turn adds no new positions
+        turns.append(t)
+        rasters.append(_Raster(support, plate_mm, step_mm))
+
+    placements: List[Tuple[float, float, int]] = []
+    while len(placements) < qty:
+        best: Optional[Tuple[float, float, int]] = None
+        best_key: Tuple[float, float] = (math.inf, math.inf)
+        for i, r in enumerate(rasters):
+            pos = r.first_free()
+            if pos is None:
+                continue
+            key = (pos[1] - r.y0, pos[0] - r.x0)  # bottom edge, then left edge of the copy
+            if key < best_key:
+                best, best_key = (pos[0], pos[1], i), key
+        if best is None:
+            break
+        x, y, i = best
+        placements.append((x, y, turns[i]))
+        for r in rasters:
+            r.block((x, y), rasters[i].support, spacing_mm)
+
+    if not placements:
+        raise ValueError(
+            f"Part footprint {fp.width_mm:.1f} x {fp.depth_mm:.1f} mm does not fit the "
+            f"{plate_mm[0]:.1f} x {plate_mm[1]:.1f} mm build plate."
+        )
+    per_build = len(placements)
+    area = _area_mm2(np.asarray(fp.support_mm)) * per_build
+    return NestResult(
+        copies_per_build=per_build,
+        builds=-(-qty // per_build),
+        spacing_mm=spacing_mm,
+        plate_utilization=area / (plate_mm[0] * plate_mm[1]),
+        placements=tuple((round(x, 3), round(y, 3), t) for x, y, t in placements),
+    )
+
+
+def nest_for_printer(fp: Footprint, cfg: ConfigLike, printer: str, qty: int) -> NestResult:
+    """nest() on the printer's build plate with the configured part spacing."""
+    cc = ensure_compiled(cfg)
+    x_in, y_in, _ = cc.printer(printer).build_volume_in
+    return nest(fp, (x_in * MM_PER_IN, y_in * MM_PER_IN), qty, cc.part_spacing_mm)
@@ -0,0 +1,358 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import ConfigLike, ensure_compiled
+from .geometry import MM_PER_IN
+
+Matrix3 = Tuple[Tuple[float, float, float], Tuple[float, float, float], Tuple[float, float, float]]
+
+
+@dataclass(frozen=True)
+class PrinterFit:
+    """
+    Best orientation of a part for one printer. `rotation` maps part coordinates to build
+    coordinates (build = rotation @ part); the lowest Z height that fits is preferred.
+    """
+    printer: str
+    fits: bool
+    as_modeled_fits: bool
+    rotation: Matrix3
+    extents_in: Tuple[float, float, float]  # (x, y, z) in the chosen orientation
+
+    @property
+    def z_height_in(self) -> float:
+        return self.extents_in[2]
+
+
+@dataclass(frozen=True)
+class OrientationReport:
+    obb_rotation: Matrix3  # approximate minimum-volume oriented bounding box
+    obb_extents_in: Tuple[float, float, float]
+    printers: Dict[str, PrinterFit]
+
+
+def _fibonacci_directions(n: int, hemisphere: bool = False) -> np.ndarray:
+    i = np.arange(n) + 0.5
+    z = 1.0 - i / n if hemisphere else 1.0 - 2.0 * i / n
+    r = np.sqrt(np.clip(1.0 - z * z, 0.0, None))
+    theta = np.pi * (1.0 + 5.0 ** 0.5) * i
+    return np.column_stack([r * np.cos(theta), r * np.sin(theta), z])
+
+
+def _vertex_columns(triangles: np.ndarray) -> np.ndarray:
+    """(3, n) contiguous float32 vertex coordinates."""
+    return np.ascontiguousarray(np.asarray(triangles).reshape(-1, 3).T, dtype=np.float32)
+
+
+def hull_points(triangles: np.ndarray, grid: int = 64, directions: int = 1024) -> np.ndarray:
+    """
+    A few hundred vertices of the mesh's convex hull, as an (m, 3) float64 array.
+
+    Pass 1 keeps, for every cell of a grid x grid raster in each axis projection, the
+    highest and lowest vertex along the projected axis (interior vertices never survive).
+    Pass 2 keeps the vertices extreme along a set of evenly spread directions; each of
+    them is a true hull vertex, and together they resolve the hull to a few degrees.
+    """
+    v = _vertex_columns(triangles)
+    if v.shape[1] == 0:
+        raise ValueError("STL mesh is empty.")
+
+    cells = []
+    for axis in range(3):
+        lo, hi = float(v[axis].min()), float(v[axis].max())
+        scale = np.float32((grid - 1e-3) / (hi - lo)) if hi > lo else np.float32(0.0)
+        cells.append(((v[axis] - np.float32(lo)) * scale).astype(np.int32))
+    keep = []
+    for axis in range(3):
+        a, b = [i for i in range(3) if i != axis]
+        key = cells[a] * grid + cells[b]
+        top = np.full(grid * grid, -np.inf, dtype=np.float32)
+        bottom = np.full(grid * grid, np.inf, dtype=np.float32)
+        np.maximum.at(top, key, v[axis])
+        np.minimum.at(bottom, key, v[axis])
+        for extreme in (top, bottom):
+            hit = np.flatnonzero(v[axis] == extreme[key])
+            # one vertex per cell (the triangle soup repeats every shared vertex)
+            _, first = np.unique(key[hit], return_index=True)
+            keep.append(hit[first])
+
+    pts = v[:, np.unique(np.concatenate(keep))].T.astype(np.float64)
+    if len(pts) <= directions:
+        return pts
+    d = _fibonacci_directions(directions)
+    # a few directions at a time keeps the (directions x points) product small
+    extreme = np.concatenate([np.argmax(d[i:i + 64] @ pts.T, axis=1) for i in range(0, directions, 64)])
+    return pts[np.unique(extreme)]
+
+
+def _frames(up: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Two unit vectors completing each up vector to a right-handed frame (e1, e2, up)."""
+    helper = np.where(np.abs(up[:, :1]) < 0.9, [[1.0, 0.0, 0.0]], [[0.0, 1.0, 0.0]])
+    e1 = helper - np.sum(helper * up, axis=1, keepdims=True) * up
+    e1 /= np.linalg.norm(e1, axis=1, keepdims=True)
+    e2 = np.cross(up, e1)
+    return e1, e2
+
+
+def _sweep(
+    pts: np.ndarray, up: np.ndarray, yaw: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Extents of `pts` for every (up, yaw) rotation: x and y have shape (n_up, n_yaw), z (n_up,).
+    Also returns the frames so a winning cell can be turned into a rotation matrix.
+    """
+    e1, e2 = _frames(up)
+    # float32 halves the memory traffic; winners are re-measured exactly anyway
+    p1, p2, pu = ((pts @ e.T).astype(np.float32) for e in (e1, e2, up))  # (m, n_up)
+    ext_z = pu.max(axis=0) - pu.min(axis=0)
+    ext_x = np.empty((len(up), len(yaw)))
+    ext_y = np.empty((len(up), len(yaw)))
+    for j, (c, s) in enumerate(zip(np.cos(yaw).astype(np.float32), np.sin(yaw).astype(np.float32))):
+        px = c * p1 + s * p2
+        py = c * p2 - s * p1
+        ext_x[:, j] = px.max(axis=0) - px.min(axis=0)
+        ext_y[:, j] = py.max(axis=0) - py.min(axis=0)
+    return ext_x, ext_y, ext_z, e1, e2
+
+
+def _rotation(up: np.ndarray, e1: np.ndarray, e2: np.ndarray, yaw: float, swap_xy: bool = False) -> np.ndarray:
+    c, s = np.cos(yaw), np.sin(yaw)
+    r0 = c * e1 + s * e2
+    r1 = c * e2 - s * e1
+    if swap_xy:
+        r0, r1 = r1, -r0  # still a proper rotation
+    return np.vstack([r0, r1, up])
+
+
+def _exact_extents(v: np.ndarray, rot: np.ndarray) -> np.ndarray:
+    out = rot.astype(np.float32) @ v
+    return (out.max(axis=1) - out.min(axis=1)).astype(np.float64)
+
+
+def _as_tuple(rot: np.ndarray) -> Matrix3:
+    return tuple(tuple(float(x) for x in row) for row in np.round(rot, 9))  # type: ignore[return-value]
+
+
+def dominant_normals(triangles: np.ndarray, k: int = 32) -> np.ndarray:
+    """
+    Up to k face directions carrying the most surface area (flat faces of the part).
+    Laying a flat face on the platform is usually the lowest and tightest orientation.
+    """
+    tri = np.asarray(triangles, dtype=np.float32)
+    n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    area = np.linalg.norm(n, axis=1)
+    nz = area > 0
+    n, area = n[nz] / area[nz, None], area[nz]
+    n = np.where(n[:, 2:3] < 0, -n, n)  # a face and its opposite give the same extents
+    q = np.round(n * 256).astype(np.int64) + 256
+    key = (q[:, 0] * 513 + q[:, 1]) * 513 + q[:, 2]
+    _, inverse = np.unique(key, return_inverse=True)
+    weight = np.bincount(inverse, weights=area)
+    top = np.argsort(weight)[::-1][:k]
+    # area-weighted mean normal of each bin
+    sums = np.stack([np.bincount(inverse, weights=area * n[:, i]) for i in range(3)], axis=1)[top]
+    return sums / np.linalg.norm(sums, axis=1, keepdims=True)
+
+
+def candidate_up_vectors(n: int = 600, extra: Optional[np.ndarray] = None) -> np.ndarray:
+    """The three axes, `extra` directions, then a hemisphere of up directions (flipping a part keeps its extents)."""
+    parts = [np.eye(3)]
+    if extra is not None and len(extra):
+        parts.append(np.asarray(extra, dtype=np.float64))
+    parts.append(_fibonacci_directions(n, hemisphere=True))
+    return np.vstack(parts)
+
+
+def _subset(pts: np.ndarray, directions: int) -> np.ndarray:
+    """The points extreme along fewer directions: a coarser hull for the coarse sweep."""
+    if len(pts) <= directions:
+        return pts
+    return pts[np.unique(np.argmax(_fibonacci_directions(directions) @ pts.T, axis=1))]
+
+
+@dataclass
+class _Sweep:
+    up: np.ndarray
+    yaw: np.ndarray
+    ext_x: np.ndarray
+    ext_y: np.ndarray
+    ext_z: np.ndarray
+    e1: np.ndarray
+    e2: np.ndarray
+
+    @classmethod
+    def run(cls, pts: np.ndarray, up: np.ndarray, yaw: np.ndarray) -> "_Sweep":
+        ext_x, ext_y, ext_z, e1, e2 = _sweep(pts, up, yaw)
+        return cls(up, yaw, ext_x, ext_y, ext_z, e1, e2)
+
+    def refined(self, pts: np.ndarray, i: int, j: int, spacing: float, yaw_step: float) -> "_Sweep":
+        """Finer sweep around cell (i, j)."""
+        local = self.up[i] + spacing * _fibonacci_directions(48)
+        local = np.vstack([self.up[i], local / np.linalg.norm(local, axis=1, keepdims=True)])
+        return _Sweep.run(pts, local, self.yaw[j] + np.linspace(-yaw_step, yaw_step, 17))
+
+    def rotation(self, i: int, j: int, swap_xy: bool = False) -> np.ndarray:
+        return _rotation(self.up[i], self.e1[i], self.e2[i], self.yaw[j], swap_xy)
+
+
+def _fitting_cells(sw: _Sweep, box: np.ndarray) -> List[Tuple[int, int, bool]]:
+    """Cells that fit `box` (lowest Z first, then smallest footprint) as (i, j, swap_xy)."""
+    bx, by, bz = box
+    straight = (sw.ext_x <= bx) & (sw.ext_y <= by)
+    swapped = (sw.ext_y <= bx) & (sw.ext_x <= by)
+    ok = (straight | swapped) & (sw.ext_z <= bz)[:, None]
+    if not ok.any():
+        return []
+    score = np.where(ok, sw.ext_z[:, None] * 1e6 + sw.ext_x * sw.ext_y, np.inf).ravel()
+    order = np.argsort(score)[: int(ok.sum())]
+    cells = []
+    for flat in order[:8]:
+        i, j = np.unravel_index(flat, ok.shape)
+        cells.append((int(i), int(j), not bool(straight[i, j])))
+    return cells
+
+
+def orientation_report(
+    triangles: np.ndarray,
+    cfg: ConfigLike,
+    printers: Optional[Sequence[str]] = None,
+    n_up: int = 600,
+    yaw_step_deg: float = 2.0,
+    pts: Optional[np.ndarray] = None,
+) -> OrientationReport:
+    """
+    Best-fitting orientation and Z height for every printer, plus an approximate
+    minimum-volume oriented bounding box, from one sweep over the hull vertices.
+    Each printer's best cell is refined locally and re-measured on every vertex
+    before it is reported.
+    """
+    cc = ensure_compiled(cfg)
+    names = list(printers) if printers else list(cc.printers)
+    v = _vertex_columns(triangles)
+    if pts is None:
+        pts = hull_points(triangles)
+    pts = pts - pts.mean(axis=0)
+
+    spacing = np.sqrt(2.0 * np.pi / n_up)
+    yaw_step = np.deg2rad(yaw_step_deg)
+    coarse = _Sweep.run(
+        _subset(pts, 256),
+        candidate_up_vectors(n_up, dominant_normals(triangles)),
+        np.deg2rad(np.arange(0.0, 90.0, yaw_step_deg)),
+    )
+
+    # minimum-volume box: best coarse cell, then a finer sweep around it
+    vol = coarse.ext_x * coarse.ext_y * coarse.ext_z[:, None]
+    i, j = np.unravel_index(np.argmin(vol), vol.shape)
+    fine = coarse.refined(pts, i, j, spacing, yaw_step)
+    fvol = fine.ext_x * fine.ext_y * fine.ext_z[:, None]
+    obb_rot = fine.rotation(*np.unravel_index(np.argmin(fvol), fvol.shape))
+    obb_ext = _exact_extents(v, obb_rot) / MM_PER_IN
+
+    modeled = (v.max(axis=1) - v.min(axis=1)).astype(np.float64)
+    fits: Dict[str, PrinterFit] = {}
+    for name in names:
+        box = np.array(cc.printer(name).build_volume_in) * MM_PER_IN
+        as_modeled = bool(np.all(modeled <= box))
+
+        best: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        cells = _fitting_cells(coarse, box)
+        if cells:
+            i, j, _ = cells[0]
+            fine = coarse.refined(pts, i, j, spacing, yaw_step)
+            candidates = [(fine, c) for c in _fitting_cells(fine, box)] + [(coarse, c) for c in cells]
+            for sw, (i, j, swap) in candidates:
+                rot = sw.rotation(i, j, swap)
+                ext = _exact_extents(v, rot)
+                if np.all(ext <= box):
+                    best = (rot, ext)
+                    break
+        if best is None and as_modeled:
+            best = (np.eye(3), modeled)
+        if best is None:
+            # nothing fits: report the lowest orientation found
+            i = int(np.argmin(coarse.ext_z))
+            rot = coarse.rotation(i, 0)
+            best = (rot, _exact_extents(v, rot))
+
+        rot, ext = best
+        fits[name] = PrinterFit(
+            printer=name,
+            fits=bool(np.all(ext <= box)),
+            as_modeled_fits=as_modeled,
+            rotation=_as_tuple(rot),
+            extents_in=tuple(float(e) / MM_PER_IN for e in ext),  # type: ignore[arg-type]
+        )
+
+    return OrientationReport(
+        obb_rotation=_as_tuple(obb_rot),
+        obb_extents_in=tuple(float(e) for e in obb_ext),  # type: ignore[arg-type]
+        printers=fits,
+    )
+
+
+def modeled_report(extents_in: Tuple[float, float, float], cfg: ConfigLike) -> OrientationReport:
+    """The report for a part measured but not searched (no mesh in memory): every printer takes it as modeled."""
+    cc = ensure_compiled(cfg)
+    identity = _as_tuple(np.eye(3))
+    ext = tuple(float(e) for e in extents_in)
+    fits = {}
+    for name in cc.printers:
+        ok = all(e <= b for e, b in zip(ext, cc.printer(name).build_volume_in))
+        fits[name] = PrinterFit(name, ok, ok, identity, ext)  # type: ignore[arg-type]
+    return OrientationReport(obb_rotation=identity, obb_extents_in=ext, printers=fits)  # type: ignore[arg-type]
+
+
+def rotate_triangles(triangles: np.ndarray, rotation: Matrix3) -> np.ndarray:
+    """Triangles in build coordinates for a PrinterFit.rotation."""
+    rot = np.asarray(rotation, dtype=np.float32)
+    return np.asarray(triangles, dtype=np.float32) @ rot.T
+
+
+def build_volumes_digest(cfg: ConfigLike) -> str:
+    """Short hash of every printer's build volume; orientation reports are only valid for these."""
+    cc = ensure_compiled(cfg)
+    volumes = {name: list(cc.printer(name).build_volume_in) for name in sorted(cc.printers)}
+    return hashlib.sha256(json.dumps(volumes).encode("utf-8")).hexdigest()[:16]
+
+
+def report_to_dict(report: OrientationReport) -> Dict[str, object]:
+    return {
+        "obb_rotation": [list(r) for r in report.obb_rotation],
+        "obb_extents_in": list(report.obb_extents_in),
+        "printers": {
+            name: {
+                "fits": f.fits,
+                "as_modeled_fits": f.as_modeled_fits,
+                "rotation": [list(r) for r in f.rotation],
+                "extents_in": list(f.extents_in),
+                "z_height_in": f.z_height_in,
+            }
+            for name, f in report.printers.items()
+        },
+    }
+
+
+def report_from_dict(d: Dict[str, object]) -> OrientationReport:
+    printers = d["printers"]
+    assert isinstance(printers, dict)
+    return OrientationReport(
+        obb_rotation=tuple(tuple(r) for r in d["obb_rotation"]),  # type: ignore[arg-type, union-attr]
+        obb_extents_in=tuple(d["obb_extents_in"]),  # type: ignore[arg-type]
+        printers={
+            name: PrinterFit(
+                printer=name,
+                fits=bool(f["fits"]),
+                as_modeled_fits=bool(f["as_modeled_fits"]),
+                rotation=tuple(tuple(r) for r in f["rotation"]),  # type: ignore[arg-type]
+                extents_in=tuple(f["extents_in"]),  # type: ignore[arg-type]
+            )
+            for name, f in printers.items()
+        },
+    )
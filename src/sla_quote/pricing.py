@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import List
 
-def volume_unit_discount_pct(cfg: Dict[str, Any], qty: int) -> float:
+from .config import CompiledConfig, ConfigLike
+
+def volume_unit_discount_pct(cfg: ConfigLike, qty: int) -> float:
     """
     Returns a unit discount percent based on qty tiers in config.
     Expects cfg['policies']['volume_discounts'] = [{min_qty, unit_discount_pct}, ...]
+    A CompiledConfig answers from its pre-sorted tiers via bisect.
     """
+    if isinstance(cfg, CompiledConfig):
+        return cfg.unit_discount_pct(qty)
     tiers: List[dict] = cfg.get("policies", {}).get("volume_discounts", []) or []
     best = 0.0
     for t in tiers:
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from .config import PrintTimeSpec
+
+MM2_PER_CM2 = 100.0
+
+# Upper bound on (triangle, layer) crossings held in memory at once while slicing.
+MAX_SEGMENTS_PER_CHUNK = 2_000_000
+
+
+@dataclass(frozen=True)
+class LayerProfile:
+    layer_height_mm: float
+    layers: int
+    height_mm: float
+    area_mm2_total: float  # sum of the per-layer cross-section areas
+    area_mm2_max: float
+
+
+def _chunk_bounds(counts: np.ndarray, max_segments: int) -> np.ndarray:
+    """Triangle index boundaries so that each chunk crosses at most ~max_segments layers."""
+    ends = np.cumsum(counts)
+    if len(ends) == 0 or ends[-1] <= max_segments:
+        return np.array([0, len(counts)])
+    targets = np.arange(max_segments, int(ends[-1]), max_segments)
+    cuts = np.searchsorted(ends, targets, side="right")
+    return np.unique(np.concatenate(([0], cuts, [len(counts)])))
+
+
+def layer_areas_mm2(
+    triangles: np.ndarray,
+    layer_height_mm: float,
+    max_segments: int = MAX_SEGMENTS_PER_CHUNK,
+) -> np.ndarray:
+    """
+    Cross-section area of every layer, sliced at the middle of each layer.
+
+    Each (triangle, layer) crossing contributes one segment; orienting the segment by the
+    face normal (interior on the left) makes the shoelace sum of all segments in a layer
+    equal to twice its area, without ever assembling the contour loops.
+    """
+    if layer_height_mm <= 0:
+        raise ValueError("layer_height_mm must be > 0.")
+    tri = np.asarray(triangles)
+    if len(tri) == 0:
+        raise ValueError("STL mesh is empty.")
+    h = float(layer_height_mm)
+
+    # contiguous float64 columns: v[coord][vertex] is one value per triangle
+    v = np.ascontiguousarray(tri.transpose(2, 1, 0), dtype=np.float64)
+    # xy relative to the centroid keeps the shoelace products small; z from the bottom
+    v[0] -= v[0].mean()
+    v[1] -= v[1].mean()
+    v[2] -= v[2].min()
+    n_layers = max(1, math.ceil(float(v[2].max()) / h - 1e-9))
+    return np.abs(_layer_areas2(v, h, n_layers, max_segments)) * 0.5
+
+
+def _layer_areas2(
+    v: np.ndarray, h: float, n_layers: int, max_segments: int = MAX_SEGMENTS_PER_CHUNK
+) -> np.ndarray:
+    """
+    Signed shoelace sums (twice the areas) of the layers, from (3 coords, 3 vertices, faces)
+    columns with z measured from the part's bottom. Sums over disjoint sets of faces add up.
+    """
+    z_lo = np.minimum(np.minimum(v[2, 0], v[2, 1]), v[2, 2])
+    z_hi = np.maximum(np.maximum(v[2, 0], v[2, 1]), v[2, 2])
+
+    # layer k is sampled at z = (k + 0.5) * h; a triangle (and each of its two pieces below)
+    # owns the planes with z_lo <= z < z_hi. Drop triangles that own none.
+    first = np.maximum(np.ceil(z_lo / h - 0.5), 0)
+    last = np.minimum(np.ceil(z_hi / h - 0.5) - 1, n_layers - 1)
+    crossing = last >= first
+    v = v[:, :, crossing]
+    first, last = first[crossing], last[crossing]
+
+    # orientation needs the normal of the original winding, before the vertices are reordered
+    (x0, x1, x2), (y0, y1, y2), (z0, z1, z2) = v
+    nx = (y1 - y0) * (z2 - z0) - (z1 - z0) * (y2 - y0)
+    ny = (z1 - z0) * (x2 - x0) - (x1 - x0) * (z2 - z0)
+
+    # sort each triangle's vertices by z (3-element sorting network)
+    p = [[x0, y0, z0], [x1, y1, z1], [x2, y2, z2]]
+    for i, j in ((0, 1), (1, 2), (0, 1)):
+        swap = p[i][2] > p[j][2]
+        p[i], p[j] = (
+            [np.where(swap, cj, ci) for ci, cj in zip(p[i], p[j])],
+            [np.where(swap, ci, cj) for ci, cj in zip(p[i], p[j])],
+        )
+    (ax, ay, az), (bx, by, bz), (dx, dy, dz) = p
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lx = (dx - ax) / (dz - az)
+        ly = (dy - ay) / (dz - az)
+        # Every segment of a triangle is parallel to z x n and runs from the long edge (a-d)
+        # towards the side holding b, so one sign per triangle orients all of them.
+        sign = np.sign((bx - ax - (bz - az) * lx) * -ny + (by - ay - (bz - az) * ly) * nx)
+
+    # Two z-monotone pieces per triangle: short edge a-b below b, b-d from b up.
+    # The sign is folded into the short-edge terms (the shoelace term is linear in them).
+    mid = np.ceil(bz / h - 0.5)
+    pieces = (
+        (bx - ax, by - ay, bz - az, ax, ay, az, first, np.minimum(mid - 1, last)),
+        (dx - bx, dy - by, dz - bz, bx, by, bz, np.maximum(mid, first), last),
+    )
+    areas2 = np.zeros(n_layers, dtype=np.float64)
+    for ex_d, ey_d, ez_d, ex, ey, ez, lo, hi in pieces:
+        counts = np.maximum(hi - lo + 1, 0).astype(np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # pieces with zero height have count 0 and are never expanded
+            sx = ex_d / ez_d * sign
+            sy = ey_d / ez_d * sign
+        ex = ex * sign
+        ey = ey * sign
+        lo = lo.astype(np.int64)
+
+        bounds = _chunk_bounds(counts, max_segments)
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            c = counts[start:stop]
+            total = int(c.sum())
+            if total == 0:
+                continue
+            idx = np.repeat(np.arange(start, stop), c)
+            k = lo[idx] + (np.arange(total) - np.repeat(np.cumsum(c) - c, c))
+            zk = (k + 0.5) * h
+
+            t = zk - az[idx]
+            px = ax[idx] + t * lx[idx]
+            py = ay[idx] + t * ly[idx]
+            t = zk - ez[idx]
+            qx = ex[idx] + t * sx[idx]
+            qy = ey[idx] + t * sy[idx]
+            areas2 += np.bincount(k, weights=px * qy - qx * py, minlength=n_layers)
+    return areas2
+
+
+def layer_profile(triangles: np.ndarray, layer_height_mm: float) -> LayerProfile:
+    areas = layer_areas_mm2(triangles, layer_height_mm)
+    z = np.asarray(triangles[:, :, 2])
+    return LayerProfile(
+        layer_height_mm=float(layer_height_mm),
+        layers=int(len(areas)),
+        height_mm=float(z.max()) - float(z.min()),
+        area_mm2_total=float(areas.sum()),
+        area_mm2_max=float(areas.max()),
+    )
+
+
+def estimate_print_hours(profile: LayerProfile, spec: PrintTimeSpec, qty: int = 1, builds: int = 1) -> float:
+    """
+    Print hours for `qty` copies built side by side in `builds` jobs: fixed and per-layer
+    time is paid once per build, exposure time scales with the total area printed.
+    """
+    seconds = (
+        builds * (spec.fixed_minutes * 60.0 + profile.layers * spec.seconds_per_layer)
+        + qty * (profile.area_mm2_total / MM2_PER_CM2) * spec.seconds_per_cm2
+    )
+    return seconds / 3600.0
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .config import CompiledConfig, compile_config
+from .metrics import CONFIG_RELOADS
+from .utils import parse_config
+
+CONFIG_EXTS = (".yaml", ".yml")
+DEFAULT_POLL_SECONDS = 2.0
+
+
+@dataclass(frozen=True)
+class ConfigEntry:
+    """One loaded shop config; replaced, never mutated, when its file changes."""
+    name: str  # file stem, e.g. "default.example"
+    path: str  # absolute path of the YAML file
+    config: CompiledConfig
+    sha256: str  # of the file bytes
+    version: int  # 1 when first loaded, +1 on every reload that changed the config
+    loaded_at: float
+    mtime_ns: int
+    size: int
+
+    @property
+    def digest(self) -> str:
+        """Digest of the compiled config, as recorded in the journal and result cache keys."""
+        return self.config.digest
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "file": Path(self.path).name,
+            "version": self.version,
+            "digest": self.digest,
+            "sha256": self.sha256,
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.loaded_at)),
+        }
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    by_name: Dict[str, ConfigEntry] = field(default_factory=dict)
+    by_path: Dict[str, ConfigEntry] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)  # file name -> why it did not load
+
+
+class ConfigRegistry:
+    """
+    The shop configs in `directory` (*.yaml, *.yml), parsed once and served from memory by name.
+
+    reload() re-reads only files whose mtime or size changed and swaps in a new snapshot in one
+    assignment, so a lookup never sees a half-updated registry. A file that fails to parse keeps
+    serving its last good version and is listed under errors. start() polls for changes on a
+    daemon thread every `poll_interval` seconds.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        poll_interval: float = DEFAULT_POLL_SECONDS,
+        log: Callable[[str], None] = print,
+    ) -> None:
+        self.directory = Path(directory).resolve()
+        if not self.directory.is_dir():
+            raise FileNotFoundError(f"Config directory not found: {self.directory}")
+        self.poll_interval = poll_interval
+        self.log = log
+        self._snapshot = _Snapshot()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reload()
+        if not self._snapshot.by_name:
+            detail = "; ".join(f"{k}: {v}" for k, v in self._snapshot.errors.items())
+            raise ValueError(f"No loadable configs in {self.directory}" + (f" ({detail})" if detail else ""))
+
+    @classmethod
+    def from_env(cls, default_dir: str | Path) -> "ConfigRegistry":
+        """SLA_QUOTE_CONFIG_DIR and SLA_QUOTE_CONFIG_POLL (seconds) override the defaults."""
+        return cls(
+            os.environ.get("SLA_QUOTE_CONFIG_DIR", str(default_dir)),
+            poll_interval=float(os.environ.get("SLA_QUOTE_CONFIG_POLL", DEFAULT_POLL_SECONDS)),
+        )
+
+    def _load(self, name: str, path: Path, prev: Optional[ConfigEntry]) -> ConfigEntry:
+        st = path.stat()
+        if prev is not None and (prev.mtime_ns, prev.size) == (st.st_mtime_ns, st.st_size):
+            return prev
+        data = path.read_bytes()
+        sha = hashlib.sha256(data).hexdigest()
+        if prev is not None and prev.sha256 == sha:
+            # touched but not edited
+            return replace(prev, mtime_ns=st.st_mtime_ns, size=st.st_size)
+        cfg = compile_config(parse_config(data))
+        version = 1 if prev is None else prev.version + (cfg.digest != prev.digest)
+        return ConfigEntry(name, str(path), cfg, sha, version, time.time(), st.st_mtime_ns, st.st_size)
+
+    def reload(self) -> List[str]:
+        """Pick up added, edited and removed files; returns the names whose config changed."""
+        with self._reload_lock:
+            old = self._snapshot
+            by_name: Dict[str, ConfigEntry] = {}
+            errors: Dict[str, str] = {}
+            changed: List[str] = []
+            for path in sorted(self.directory.iterdir()):
+                if path.suffix.lower() not in CONFIG_EXTS or path.name.startswith(".") or not path.is_file():
+                    continue
+                name = path.stem
+                if name in by_name:
+                    errors[path.name] = f"name {name!r} is already taken by {Path(by_name[name].path).name}"
+                    continue
+                prev = old.by_name.get(name)
+                try:
+                    entry = self._load(name, path, prev)
+                except Exception as e:
+                    errors[path.name] = str(e)
+                    if old.errors.get(path.name) != str(e):
+                        CONFIG_RELOADS.inc(outcome="error")
+                        self.log(f"Config {path.name} did not load, keeping the previous version: {e}")
+                    if prev is not None:
+                        by_name[name] = prev
+                    continue
+                by_name[name] = entry
+                if prev is None or entry.digest != prev.digest:
+                    CONFIG_RELOADS.inc(outcome="loaded")
+                    changed.append(name)
+            changed.extend(sorted(set(old.by_name) - set(by_name)))
+            self._snapshot = _Snapshot(by_name, {e.path: e for e in by_name.values()}, errors)
+        return changed
+
+    def get(self, name: str) -> ConfigEntry:
+        """
+        Entry by name. For older clients, a path to one of the registered files also works;
+        anything else is refused rather than read from disk.
+        """
+        snap = self._snapshot
+        entry = snap.by_name.get(name) or snap.by_path.get(os.path.abspath(name))
+        if entry is None:
+            failed = [msg for file, msg in snap.errors.items() if Path(file).stem == name]
+            if failed:
+                raise ValueError(f"Config {name!r} did not load: {failed[0]}")
+            raise ValueError(f"Unknown config: {name!r} (available: {', '.join(sorted(snap.by_name))})")
+        return entry
+
+    def entries(self) -> List[ConfigEntry]:
+        return sorted(self._snapshot.by_name.values(), key=lambda e: e.name)
+
+    def describe(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        return {
+            "dir": str(self.directory),
+            "configs": [e.describe() for e in sorted(snap.by_name.values(), key=lambda e: e.name)],
+            "errors": dict(snap.errors),
+        }
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                for name in self.reload():
+                    entry = self._snapshot.by_name.get(name)
+                    self.log(f"Config {name} reloaded (v{entry.version})" if entry else f"Config {name} removed")
+            except Exception as e:  # e.g. the directory went away; keep serving what is loaded
+                self.log(f"Config reload failed: {e}")
+
+    def start(self) -> None:
+        if self._thread is None and self.poll_interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="sla-quote-config-watch", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -1,64 +1,235 @@
 from __future__ import annotations
 
+import io
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Dict, Iterable, List, Tuple, Union
+
 from reportlab.lib.pagesizes import LETTER
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
+from reportlab.pdfbase.pdfmetrics import stringWidth
 
 from .engine import QuoteResult
 from .model import QuoteInput
 
-def write_pdf(outpath: str | Path, q: QuoteInput, r: QuoteResult) -> Path:
-    outpath = Path(outpath)
-    c = canvas.Canvas(str(outpath), pagesize=LETTER)
-    w, h = LETTER
+if TYPE_CHECKING:
+    from .sweep import PriceBreakTable
+
+PdfTarget = Union[str, Path, BinaryIO]
 
-    y = h - 1.0 * inch
-    c.setFont("Helvetica-Bold", 18)
-    c.drawString(1.0 * inch, y, "QUOTE")
-    y -= 0.35 * inch
-
-    c.setFont("Helvetica", 11)
-    c.drawString(1.0 * inch, y, f"Quote ID: {r.quote_id}")
-    y -= 0.2 * inch
-    c.drawString(1.0 * inch, y, f"Customer: {q.customer.name}")
-    y -= 0.2 * inch
-    c.drawString(1.0 * inch, y, f"Part: {q.part.name} ({q.part.part_number} rev {q.part.revision})")
-    y -= 0.2 * inch
-    c.drawString(1.0 * inch, y, f"Printer: {q.process.printer} | Resin: {q.process.resin}")
-    y -= 0.2 * inch
-    c.drawString(1.0 * inch, y, f"Qty: {r.qty} | Print Hours: {q.process.print_hours}")
-    y -= 0.35 * inch
-
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(1.0 * inch, y, "Line Items")
-    y -= 0.2 * inch
-
-    c.setFont("Helvetica", 11)
-    for li in r.line_items:
-        c.drawString(1.0 * inch, y, li.name)
-        c.drawRightString(w - 1.0 * inch, y, f"{r.currency} {li.cost:,.2f}")
+DISCLAIMER = "Estimate only. Final pricing may change after CAD review, tolerances, and QA requirements."
+
+class _QuoteLayout:
+    """
+    Page layout for one quote. The static part (title, labels, section headers, disclaimer)
+    is drawn once per document as a form XObject; each page then only draws the values.
+    Positions depend on the number of line items and whether a discount line is shown,
+    so a document holds one form per (n_items, has_discount) variant.
+    """
+
+    def __init__(self, n_items: int, has_discount: bool) -> None:
+        w, h = LETTER
+        self.left = 1.0 * inch
+        self.right = w - 1.0 * inch
+        self.form_name = f"QuoteLayout{n_items}{'D' if has_discount else ''}"
+
+        y = h - 1.0 * inch
+        self.title_y = y
+        y -= 0.35 * inch
+        self.header_y: List[float] = []
+        for _ in range(5):
+            self.header_y.append(y)
+            y -= 0.2 * inch
+        y -= 0.15 * inch
+        self.items_title_y = y
+        y -= 0.2 * inch
+        self.item_y = [y - i * 0.2 * inch for i in range(n_items)]
+        y -= n_items * 0.2 * inch
+        y -= 0.10 * inch
+        self.sell_y = y
+        y -= 0.2 * inch
+        self.ppp_y = y
         y -= 0.2 * inch
+        self.discount_y = y if has_discount else None
+        if has_discount:
+            y -= 0.2 * inch
+        y -= 0.25 * inch
+        self.disclaimer_y = y
 
-    y -= 0.10 * inch
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(1.0 * inch, y, "Sell Price (Pre-Tax)")
-    c.drawRightString(w - 1.0 * inch, y, f"{r.currency} {r.sell_price:,.2f}")
-    y -= 0.2 * inch
+        self.header_labels = ["Quote ID: ", "Customer: ", "Part: ", "Printer: ", "Qty: "]
+        self.header_value_x = [self.left + stringWidth(s, "Helvetica", 11) for s in self.header_labels]
+        self.discount_label = "Volume discount applied: "
+        self.discount_value_x = self.left + stringWidth(self.discount_label, "Helvetica", 10)
 
-    c.drawString(1.0 * inch, y, "Price / Part")
-    c.drawRightString(w - 1.0 * inch, y, f"{r.currency} {r.price_per_part:,.2f}")
-    y -= 0.2 * inch
+    def draw_static(self, c: canvas.Canvas, header_labels: bool = True) -> None:
+        c.setFont("Helvetica-Bold", 18)
+        c.drawString(self.left, self.title_y, "QUOTE")
 
-    if r.unit_discount_pct > 0:
-        c.setFont("Helvetica", 10)
-        c.drawString(1.0 * inch, y, f"Volume discount applied: {r.unit_discount_pct*100:.1f}%")
+        if header_labels:
+            c.setFont("Helvetica", 11)
+            for label, y in zip(self.header_labels, self.header_y):
+                c.drawString(self.left, y, label)
+
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(self.left, self.items_title_y, "Line Items")
+
+        c.setFont("Helvetica-Bold", 11)
+        c.drawString(self.left, self.sell_y, "Sell Price (Pre-Tax)")
+        c.drawString(self.left, self.ppp_y, "Price / Part")
+
+        if self.discount_y is not None:
+            c.setFont("Helvetica", 10)
+            c.drawString(self.left, self.discount_y, self.discount_label)
+
+        c.setFont("Helvetica", 9)
+        c.drawString(self.left, self.disclaimer_y, DISCLAIMER)
+
+    def draw_values(self, c: canvas.Canvas, q: QuoteInput, r: QuoteResult, header_labels: bool = False) -> None:
+        """header_labels=True draws "label value" strings, for pages drawn without the form."""
+        values = [
+            f"{r.quote_id}",
+            f"{q.customer.name}",
+            f"{q.part.name} ({q.part.part_number} rev {q.part.revision})",
+            f"{q.process.printer} | Resin: {q.process.resin}",
+            f"{r.qty} | Print Hours: {q.process.print_hours}" + (
+                f" x {q.process.builds} builds" if (q.process.builds or 1) > 1 else ""
+            ),
+        ]
+        c.setFont("Helvetica", 11)
+        if header_labels:
+            for label, y, v in zip(self.header_labels, self.header_y, values):
+                c.drawString(self.left, y, label + v)
+        else:
+            for x, y, v in zip(self.header_value_x, self.header_y, values):
+                c.drawString(x, y, v)
+
+        for li, y in zip(r.line_items, self.item_y):
+            c.drawString(self.left, y, li.name)
+            c.drawRightString(self.right, y, f"{r.currency} {li.cost:,.2f}")
+
+        c.setFont("Helvetica-Bold", 11)
+        c.drawRightString(self.right, self.sell_y, f"{r.currency} {r.sell_price:,.2f}")
+        c.drawRightString(self.right, self.ppp_y, f"{r.currency} {r.price_per_part:,.2f}")
+
+        if self.discount_y is not None:
+            c.setFont("Helvetica", 10)
+            c.drawString(self.discount_value_x, self.discount_y, f"{r.unit_discount_pct*100:.1f}%")
+
+_layouts: Dict[Tuple[int, bool], _QuoteLayout] = {}
+
+def _layout(r: QuoteResult) -> _QuoteLayout:
+    key = (len(r.line_items), r.unit_discount_pct > 0)
+    layout = _layouts.get(key)
+    if layout is None:
+        layout = _layouts[key] = _QuoteLayout(*key)
+    return layout
+
+def write_quotes_pdf(
+    target: PdfTarget,
+    quotes: Iterable[Tuple[QuoteInput, QuoteResult]],
+    use_forms: bool = True,
+) -> PdfTarget:
+    """
+    Write one page per (input, result) pair into a single PDF (path or binary file object).
+    Output is byte-stable for the same inputs (no timestamps or random document IDs).
+    use_forms=False draws the static layout inline, which is cheaper for a single page.
+    """
+    if isinstance(target, (str, Path)):
+        target = Path(target)
+        c = canvas.Canvas(str(target), pagesize=LETTER, invariant=1)
+    else:
+        c = canvas.Canvas(target, pagesize=LETTER, invariant=1)
+
+    defined = set()
+    for q, r in quotes:
+        layout = _layout(r)
+        if not use_forms:
+            layout.draw_static(c, header_labels=False)
+            layout.draw_values(c, q, r, header_labels=True)
+            c.showPage()
+            continue
+        if layout.form_name not in defined:
+            c.beginForm(layout.form_name)
+            layout.draw_static(c)
+            c.endForm()
+            defined.add(layout.form_name)
+        c.doForm(layout.form_name)
+        layout.draw_values(c, q, r)
+        c.showPage()
+
+    c.save()
+    return target
+
+def render_pdf_bytes(q: QuoteInput, r: QuoteResult) -> bytes:
+    buf = io.BytesIO()
+    write_quotes_pdf(buf, [(q, r)], use_forms=False)
+    return buf.getvalue()
+
+def write_pdf(outpath: str | Path, q: QuoteInput, r: QuoteResult) -> Path:
+    outpath = Path(outpath)
+    write_quotes_pdf(outpath, [(q, r)], use_forms=False)
+    return outpath
+
+def write_price_break_pdf(target: PdfTarget, q: QuoteInput, table: "PriceBreakTable") -> PdfTarget:
+    """
+    Price-break table (price per part; printer/resin rows x qty columns), continuing
+    on further pages only when the rows do not fit on one.
+    """
+    if isinstance(target, (str, Path)):
+        target = Path(target)
+        c = canvas.Canvas(str(target), pagesize=LETTER, invariant=1)
+    else:
+        c = canvas.Canvas(target, pagesize=LETTER, invariant=1)
+
+    w, h = LETTER
+    left = 0.75 * inch
+    right = w - 0.75 * inch
+    label_w = 2.6 * inch
+    col_w = (right - left - label_w) / max(1, len(table.quantities))
+    row_h = 0.2 * inch
+
+    def header() -> float:
+        y = h - 1.0 * inch
+        c.setFont("Helvetica-Bold", 18)
+        c.drawString(left, y, "PRICE BREAKS")
+        y -= 0.35 * inch
+        c.setFont("Helvetica", 11)
+        c.drawString(left, y, f"Quote ID: {table.quote_id}  |  Customer: {q.customer.name}")
+        y -= 0.2 * inch
+        c.drawString(left, y, f"Part: {q.part.name} ({q.part.part_number} rev {q.part.revision})")
         y -= 0.2 * inch
+        c.drawString(left, y, f"Price per part ({table.currency}, pre-tax)")
+        y -= 0.3 * inch
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(left, y, "Printer / Resin")
+        for j, qty in enumerate(table.quantities):
+            c.drawRightString(left + label_w + (j + 1) * col_w, y, f"Qty {qty}")
+        y -= row_h
+        c.setFont("Helvetica", 9)
+        for j, pct in enumerate(table.unit_discount_pct):
+            if pct > 0:
+                c.drawRightString(left + label_w + (j + 1) * col_w, y, f"-{pct*100:.1f}%")
+        y -= row_h
+        c.setFont("Helvetica", 10)
+        return y
 
-    y -= 0.25 * inch
-    c.setFont("Helvetica", 9)
-    c.drawString(1.0 * inch, y, "Estimate only. Final pricing may change after CAD review, tolerances, and QA requirements.")
+    y = header()
+    ppp = table.price_per_part.tolist()
+    for (printer, resin), prices in zip(table.combos, ppp):
+        if y < 1.0 * inch:
+            c.showPage()
+            y = header()
+        c.drawString(left, y, f"{printer} | {resin}")
+        for j, price in enumerate(prices):
+            c.drawRightString(left + label_w + (j + 1) * col_w, y, f"{price:,.2f}")
+        y -= row_h
 
+    c.setFont("Helvetica", 9)
+    held = list(dict.fromkeys(p for (p, _), est in zip(table.combos, table.hours_estimated) if not est))
+    if held:
+        y -= 0.1 * inch
+        c.drawString(left, max(y, 0.7 * inch), f"Print hours held constant across quantities on {', '.join(held)}.")
+    c.drawString(left, max(y - 0.25 * inch, 0.5 * inch), DISCLAIMER)
     c.showPage()
     c.save()
-    return outpath
+    return target
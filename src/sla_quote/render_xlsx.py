@@ -1,7 +1,13 @@
 from __future__ import annotations
 
+import os
+import tempfile
+from datetime import datetime
 from pathlib import Path
-from openpyxl import Workbook
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font
 
 from .engine import QuoteResult
@@ -30,6 +36,7 @@ def write_xlsx(outpath: str | Path, q: QuoteInput, r: QuoteResult) -> Path:
     row("Resin", q.process.resin, 9)
     row("Part Volume (ml)", q.process.part_volume_ml, 10)
     row("Print Hours", q.process.print_hours, 11)
+    row("Builds", q.process.builds or 1, 12)
 
     row("Sell Price (pre-tax)", r.sell_price, 13)
     ws["B13"].number_format = '"$"#,##0.00'
@@ -50,3 +57,106 @@ def write_xlsx(outpath: str | Path, q: QuoteInput, r: QuoteResult) -> Path:
 
     wb.save(outpath)
     return outpath
+
+# Job log: one row per quote, line items as columns. Written in openpyxl write-only mode so
+# memory stays flat no matter how many rows the log holds.
+LINE_ITEM_COLUMNS = ["Material", "Machine Time", "Labor", "Outside Services"]
+JOB_LOG_COLUMNS = [
+    "Logged At", "Quote ID", "Customer", "Part", "Part Number", "Revision", "Qty",
+    "Printer", "Resin", "Part Volume (ml)", "Print Hours", "Builds", "Support Volume (ml)",
+    *LINE_ITEM_COLUMNS,
+    "Direct Cost", "Overhead", "Loaded Cost", "Sell Price (pre-tax)", "Price / Part", "Volume Discount",
+]
+MONEY_FORMAT = '"$"#,##0.00'
+_JOB_LOG_FORMATS: Dict[str, str] = {
+    **{name: MONEY_FORMAT for name in LINE_ITEM_COLUMNS},
+    **{name: MONEY_FORMAT for name in ("Direct Cost", "Overhead", "Loaded Cost", "Sell Price (pre-tax)", "Price / Part")},
+    "Volume Discount": "0.00%",
+}
+
+def _formatted(ws, value: Any, number_format: str | None) -> Any:
+    if number_format is None or value is None:
+        return value
+    cell = WriteOnlyCell(ws, value=value)
+    cell.number_format = number_format
+    return cell
+
+def _job_log_cells(ws, values: Iterable[Any]) -> List[Any]:
+    return [_formatted(ws, v, _JOB_LOG_FORMATS.get(name)) for name, v in zip(JOB_LOG_COLUMNS, values)]
+
+def _job_log_row(q: QuoteInput, r: QuoteResult, logged_at: str) -> List[Any]:
+    costs = {li.name: li.cost for li in r.line_items}
+    values = [
+        logged_at, r.quote_id, q.customer.name, q.part.name, q.part.part_number, q.part.revision, r.qty,
+        q.process.printer, q.process.resin, q.process.part_volume_ml, q.process.print_hours,
+        q.process.builds or 1, q.process.support_volume_ml,
+        *(costs.get(name, 0.0) for name in LINE_ITEM_COLUMNS),
+        r.direct_cost, r.overhead, r.loaded_cost, r.sell_price, r.price_per_part, r.unit_discount_pct,
+    ]
+    return values
+
+def _old_job_log_rows(rows: Iterator[Tuple[Any, ...]], header: List[Any]) -> Iterator[List[Any]]:
+    # logs written before columns were added: move values under their names, new columns blank
+    index = [header.index(name) if name in header else None for name in JOB_LOG_COLUMNS]
+    for values in rows:
+        yield [values[i] if i is not None and i < len(values) else None for i in index]
+
+def write_job_log(
+    outpath: str | Path,
+    quotes: Iterable[Tuple[QuoteInput, QuoteResult] | Tuple[QuoteInput, QuoteResult, str]],
+    append: bool = False,
+) -> Path:
+    """
+    Stream quotes into a single-sheet XLSX job log, one row per quote; a third item in a
+    tuple is its Logged At time (default: now).
+    With append=True, rows of an existing log at outpath are streamed across first
+    (read-only -> write-only), and the file is replaced atomically. That rewrites the whole
+    log, so append many quotes per call, or build the log from the journal in one pass
+    (sla-quote history export --format xlsx).
+    """
+    outpath = Path(outpath)
+    outpath.parent.mkdir(parents=True, exist_ok=True)
+    logged_at = datetime.now().isoformat(timespec="seconds")
+
+    existing = load_workbook(outpath, read_only=True) if append and outpath.exists() else None
+    old_rows: Iterable[Any] = ()
+    if existing is not None:
+        old_rows = existing.worksheets[0].iter_rows(values_only=True)
+        old_header = next(old_rows, None)
+        if old_header is not None and list(old_header) != JOB_LOG_COLUMNS:
+            header = list(old_header)
+            if not {"Logged At", "Quote ID"} <= set(header) <= set(JOB_LOG_COLUMNS):
+                existing.close()
+                raise ValueError(f"{outpath} is not a job log with the expected columns.")
+            old_rows = _old_job_log_rows(old_rows, header)
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Job Log")
+    bold = Font(bold=True)
+
+    header = []
+    for name in JOB_LOG_COLUMNS:
+        cell = WriteOnlyCell(ws, value=name)
+        cell.font = bold
+        header.append(cell)
+    ws.append(header)
+
+    fd, tmp = tempfile.mkstemp(dir=outpath.parent, prefix=f".{outpath.name}.", suffix=".xlsx")
+    os.close(fd)
+    try:
+        for values in old_rows:
+            ws.append(_job_log_cells(ws, values))
+        for q, r, *when in quotes:
+            ws.append(_job_log_cells(ws, _job_log_row(q, r, when[0] if when else logged_at)))
+        wb.save(tmp)
+        if existing is not None:
+            existing.close()
+            existing = None
+        os.replace(tmp, outpath)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    finally:
+        if existing is not None:
+            existing.close()
+    return outpath
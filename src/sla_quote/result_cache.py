@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import CompiledConfig
+from .geometry import GEOMETRY_VERSION
+from .geometry_cache import default_cache_dir
+from .model import QuoteInput
+
+# Bump when pricing or rendering changes what a cached quote would contain.
+RESULT_CACHE_VERSION = "1"
+
+Artifacts = Dict[str, Path]  # kind ("pdf", "xlsx") -> file
+
+
+def quote_cache_key(
+    q: QuoteInput,
+    cfg: CompiledConfig,
+    cad_digest: Optional[str] = None,
+    cad_ext: Optional[str] = None,
+    render: bool = True,
+) -> str:
+    """
+    sha256 over the validated input (canonical JSON, so key order and number formatting in the
+    request don't matter), the config content digest and the CAD content digest.
+    """
+    blob = json.dumps(
+        {
+            "v": RESULT_CACHE_VERSION,
+            "geometry": GEOMETRY_VERSION,
+            "input": q.model_dump(mode="json"),
+            "config": cfg.digest,
+            "cad": cad_digest,
+            "cad_ext": cad_ext,
+            "render": render,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _copy_atomic(src: Path, dest: Path) -> Path:
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dest.parent, prefix=f".{dest.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return dest
+
+
+class ResultCache:
+    """
+    Priced results and their rendered artifacts, keyed by quote_cache_key().
+
+    Two tiers: an in-process LRU (max_memory_entries) in front of an SQLite index plus a
+    directory of artifact copies under `root`, shared by every process using the same root.
+    Disk entries expire after ttl_seconds and are evicted least-recently-used once results
+    and artifacts together exceed max_bytes. Artifacts are copied (never linked) in both
+    directions, so re-rendering into an output directory cannot change a cached file.
+    """
+
+    def __init__(
+        self,
+        root: str | Path | None = None,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+        max_memory_entries: int = 256,
+    ) -> None:
+        self.root = Path(root) if root else default_cache_dir() / "results"
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_bytes = int(max_bytes)
+        self.max_memory_entries = int(max_memory_entries)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any], Artifacts]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.root / "results.sqlite"), timeout=30.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY, payload TEXT NOT NULL, artifacts TEXT NOT NULL,"
+            " bytes INTEGER NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_lru ON results(last_access)")
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls) -> Optional["ResultCache"]:
+        """None when SLA_QUOTE_RESULT_CACHE=0; else SLA_QUOTE_RESULT_CACHE_TTL (s) / _MB."""
+        if os.environ.get("SLA_QUOTE_RESULT_CACHE", "1") == "0":
+            return None
+        return cls(
+            ttl_seconds=float(os.environ.get("SLA_QUOTE_RESULT_CACHE_TTL", 7 * 24 * 3600)),
+            max_bytes=int(float(os.environ.get("SLA_QUOTE_RESULT_CACHE_MB", "256")) * 1024 * 1024),
+        )
+
+    def _blob_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, entry: Tuple[float, Dict[str, Any], Artifacts]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _drop(self, keys: List[str]) -> None:
+        # caller holds the lock
+        for key in keys:
+            self._memory.pop(key, None)
+            shutil.rmtree(self._blob_dir(key), ignore_errors=True)
+        self._db.executemany("DELETE FROM results WHERE key = ?", [(k,) for k in keys])
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[Tuple[Dict[str, Any], Artifacts, str]]:
+        """(result, cached artifact files, tier "memory"|"disk"), or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            fresh = entry is not None and not self._expired(entry[0], now)
+            if fresh and all(p.exists() for p in entry[2].values()):
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return json.loads(json.dumps(entry[1])), dict(entry[2]), "memory"
+            self._memory.pop(key, None)
+
+            row = self._db.execute(
+                "SELECT payload, artifacts, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                artifacts = {kind: Path(p) for kind, p in json.loads(row[1]).items()}
+                if self._expired(row[2], now) or not all(p.exists() for p in artifacts.values()):
+                    self._drop([key])
+                else:
+                    self._db.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+                    self._db.commit()
+                    self._remember(key, (row[2], json.loads(row[0]), artifacts))
+                    self.disk_hits += 1
+                    return json.loads(row[0]), artifacts, "disk"
+            self.misses += 1
+            return None
+
+    def put(self, key: str, result: Dict[str, Any], artifacts: Optional[Artifacts] = None) -> None:
+        """Store a result and copies of its artifacts (e.g. {"pdf": path, "xlsx": path})."""
+        blob_dir = self._blob_dir(key)
+        stored: Artifacts = {}
+        for kind, path in (artifacts or {}).items():
+            stored[kind] = _copy_atomic(Path(path), blob_dir / Path(path).name)
+        payload = json.dumps(result)
+        size = len(payload) + sum(p.stat().st_size for p in stored.values())
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, payload, artifacts, bytes, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, json.dumps({k: str(p) for k, p in stored.items()}), size, now, now),
+            )
+            self._db.commit()
+            self._remember(key, (now, json.loads(payload), stored))
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        # caller holds the lock
+        cutoff = now - self.ttl_seconds
+        expired = [k for (k,) in self._db.execute("SELECT key FROM results WHERE created_at < ?", (cutoff,))]
+        if expired:
+            self._drop(expired)
+        (total,) = self._db.execute("SELECT COALESCE(SUM(bytes), 0) FROM results").fetchone()
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in self._db.execute("SELECT key, bytes FROM results ORDER BY last_access ASC"):
+            if total <= self.max_bytes:
+                break
+            victims.append(key)
+            total -= size
+        self._drop(victims)
+
+    def materialize(self, artifacts: Artifacts, out_dir: str | Path) -> Artifacts:
+        """Copy cached artifacts into out_dir under their original names."""
+        out = Path(out_dir)
+        return {kind: _copy_atomic(path, out / path.name) for kind, path in artifacts.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM results").fetchone()
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": (hits / total) if total else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
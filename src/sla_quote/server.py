@@ -1,31 +1,318 @@
 from __future__ import annotations
 
+import asyncio
+import copy
+import io
 import json
+import os
 import tempfile
-from pathlib import Path
-from typing import Optional
+import time
+import zipfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path, PurePosixPath
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
-from fastapi import FastAPI, File, Form, HTTPException, UploadFile
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
 
-from .api import generate_quote_from_files
+from .artifacts import ARTIFACT_KINDS, default_store_dir, safe_quote_id
+from .geometry import StlTooLargeToPlace
+from .jobs import FINISHED, Job, JobQueue, JobRunner, QueueFull, job_priority
+from .metrics import (
+    IN_FLIGHT,
+    MESH_TRIANGLES,
+    REGISTRY,
+    REQUESTS,
+    RESULT_CACHE,
+    UPLOAD_BYTES,
+    observe_timings,
+)
+from .model import QuoteInput
+from .registry import ConfigEntry, ConfigRegistry
+from .utils import max_cad_bytes, too_large_message
+from .workers import PoolSaturated, QuoteJob, QuotePool, render_stored_artifact, run_quote_job
 
-app = FastAPI(title="SLA Quote Server", version="0.1.0")
-
-DEFAULT_CONFIG = "config/default.example.yaml"
-MAX_BYTES = 10 * 1024 * 1024  # 10 MB
+DEFAULT_CONFIG = "default.example"
+# named configs: every *.yaml / *.yml here, by file stem (SLA_QUOTE_CONFIG_DIR, SLA_QUOTE_CONFIG_POLL)
+DEFAULT_CONFIG_DIR = "config"
+MAX_BYTES = max_cad_bytes()  # CAD uploads; SLA_QUOTE_MAX_CAD_MB, default 10 MB
+MAX_INPUT_BYTES = 10 * 1024 * 1024  # quote input JSON
+# CAD uploads larger than this are written to a temp file and handed to workers by path
+SPOOL_BYTES = 10 * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 256 * 1024
 ALLOWED_EXTS = {".sldprt", ".igs", ".iges", ".x_t", ".step", ".stp", ".stl", ".json", ".yaml", ".yml"}
+# /quote/batch: total upload size, parts per batch, and entries a zip may list at all
+MAX_BATCH_BYTES = 256 * 1024 * 1024
+MAX_BATCH_PARTS = 500
+MAX_ZIP_ENTRIES = 5000
+MAX_BATCH_PART_BYTES = min(MAX_BYTES, MAX_BATCH_BYTES)  # batch parts are held in memory
+BATCH_CAD_EXTS = {".sldprt", ".igs", ".iges", ".x_t", ".step", ".stp", ".stl"}
+# Declared request sizes refused before the body is read. Starlette buffers (and spools to disk)
+# the whole multipart body before a handler runs, so the per-file limits above only apply after
+# it has arrived; this catches oversized uploads that announce their Content-Length up front.
+_FORM_OVERHEAD_BYTES = 64 * 1024
+MAX_REQUEST_BYTES = {
+    "/quote": MAX_BYTES + MAX_INPUT_BYTES + _FORM_OVERHEAD_BYTES,
+    "/jobs": MAX_BYTES + MAX_INPUT_BYTES + _FORM_OVERHEAD_BYTES,
+    "/quote/batch": MAX_BATCH_BYTES + MAX_INPUT_BYTES + _FORM_OVERHEAD_BYTES,
+}
+# SLA_QUOTE_METRICS=0 turns off request/stage metrics (and the per-stage timers in workers)
+METRICS_ENABLED = os.environ.get("SLA_QUOTE_METRICS", "1") != "0"
+
+
+_pool: Optional[QuotePool] = None
+_registry: Optional[ConfigRegistry] = None
+_jobs: Optional[JobRunner] = None
+
+
+def _get_registry() -> ConfigRegistry:
+    # Configs are parsed once here, looked up by name and shipped to workers with each job; only this reads YAML.
+    global _registry
+    if _registry is None:
+        _registry = ConfigRegistry.from_env(DEFAULT_CONFIG_DIR)
+    return _registry
+
+
+def _get_pool() -> QuotePool:
+    # Geometry + PDF/XLSX rendering run here, off the event loop (see SLA_QUOTE_EXECUTOR etc.).
+    global _pool
+    if _pool is None:
+        _pool = QuotePool.from_env()
+    return _pool
+
+
+def _get_jobs() -> JobRunner:
+    # POST /jobs: persistent queue (SLA_QUOTE_JOBS_*) drained into the same pool as /quote
+    global _jobs
+    if _jobs is None:
+        _jobs = JobRunner(JobQueue.from_env(), _get_pool, lambda name: _get_registry().get(name), _finish_result)
+    return _jobs
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI):
+    global _pool, _registry, _jobs
+    _get_registry().start()
+    await _get_pool().warm()
+    _get_jobs().ensure_started()
+    yield
+    if _jobs is not None:
+        await _jobs.stop()
+        _jobs.queue.close()
+        _jobs = None
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+        _pool = None
+    if _registry is not None:
+        _registry.stop()
+        _registry = None
+
+
+app = FastAPI(title="SLA Quote Server", version="0.1.0", lifespan=_lifespan)
+
+
+@app.middleware("http")
+async def _refuse_declared_oversize(request: Request, call_next):
+    limit = MAX_REQUEST_BYTES.get(request.url.path) if request.method == "POST" else None
+    declared = request.headers.get("content-length", "")
+    if limit is not None and declared.isdigit() and int(declared) > limit:
+        detail = f"Request too large: {int(declared) / 1024 / 1024:.2f} MB. Max is {limit / 1024 / 1024:.2f} MB."
+        return JSONResponse({"detail": detail}, status_code=413)
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def _count_requests(request: Request, call_next):
+    if not METRICS_ENABLED:
+        return await call_next(request)
+    status = 500
+    with IN_FLIGHT.track():
+        try:
+            response = await call_next(request)
+            status = response.status_code
+        finally:
+            route = request.scope.get("route")
+            path = getattr(route, "path", None) or (request.url.path if request.url.path in MAX_REQUEST_BYTES else None)
+            REQUESTS.inc(route=path or "unmatched", status=str(status))
+    return response
 
 
 def _safe_ext(name: str) -> str:
     return Path(name).suffix.lower()
 
 
-async def _read_upload_limited(upload: UploadFile, max_bytes: int = MAX_BYTES) -> bytes:
-    data = await upload.read()
-    if len(data) > max_bytes:
-        raise HTTPException(status_code=413, detail=f"File too large: {len(data)/1024/1024:.2f} MB. Max is 10 MB.")
-    return data
+def _too_large(n: int, max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=too_large_message(n, max_bytes))
+
+
+async def _read_upload_limited(upload: UploadFile, max_bytes: int = MAX_BYTES) -> bytearray:
+    """
+    Read an upload in chunks, aborting as soon as it exceeds max_bytes
+    (or immediately, when the multipart parser already knows the size).
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large(upload.size, max_bytes)
+
+    buf = bytearray()
+    while True:
+        chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        if len(buf) + len(chunk) > max_bytes:
+            raise _too_large(len(buf) + len(chunk), max_bytes)
+        buf += chunk
+    return buf
+
+
+async def _spool_upload(
+    upload: UploadFile, suffix: str, max_bytes: int = MAX_BYTES
+) -> Tuple[Optional[bytes], Optional[Path], int]:
+    """
+    Like _read_upload_limited, but once the upload passes SPOOL_BYTES the rest goes to a temp
+    file, so large CAD files are neither held in memory nor pickled to a worker process.
+    Returns (content, None, size) or (None, temp file, size); the caller deletes the file.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise _too_large(upload.size, max_bytes)
+
+    buf = bytearray()
+    spool = None
+    size = 0
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise _too_large(size, max_bytes)
+            if spool is None and size > SPOOL_BYTES:
+                spool = tempfile.NamedTemporaryFile(prefix="sla-quote-upload-", suffix=suffix, delete=False)
+                await asyncio.to_thread(spool.write, bytes(buf))
+                buf = bytearray()
+            if spool is None:
+                buf += chunk
+            else:
+                await asyncio.to_thread(spool.write, chunk)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            Path(spool.name).unlink(missing_ok=True)
+        raise
+    if spool is None:
+        return bytes(buf), None, size
+    spool.close()
+    return None, Path(spool.name), size
+
+
+def _config(name: str) -> ConfigEntry:
+    try:
+        return _get_registry().get(name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+def _validate_input(raw: str | bytes | bytearray, field: str) -> QuoteInput:
+    try:
+        return QuoteInput.model_validate_json(raw)
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=f"{field} is not a valid quote input: {e}") from e
+
+
+def _finish_result(
+    result: Dict[str, Any], pool_seconds: float, keep_timings: bool, read_upload: Optional[float] = None
+) -> None:
+    """Add the server-side stages, feed /metrics, and drop "timings" unless the client asked for it."""
+    if METRICS_ENABLED and "result_cache" in result:
+        RESULT_CACHE.inc(outcome=result["result_cache"])
+    if "timings" not in result:
+        return
+    stages = result["timings"]
+    if read_upload is not None:
+        stages["read_upload"] = round(read_upload, 6)
+    # queue wait + hand-off to the worker (pickling, process hop)
+    stages["pool_overhead"] = round(max(pool_seconds - stages.get("total", 0.0), 0.0), 6)
+    if METRICS_ENABLED:
+        observe_timings(stages)
+        if "stl_triangles" in result:
+            MESH_TRIANGLES.observe(result["stl_triangles"])
+    if not keep_timings:
+        del result["timings"]
+
+
+def _artifact_links(result: Dict[str, Any], lazy: bool) -> Dict[str, Optional[str]]:
+    if lazy:
+        return {kind: f"/quote/{result['quote_id']}/{kind}" for kind in ARTIFACT_KINDS}
+    return {
+        "pdf": result.get("artifact_pdf"),
+        "xlsx": result.get("artifact_xlsx"),
+        "json": result.get("artifact_json"),
+    }
+
+
+@dataclass
+class _QuoteRequest:
+    quote: QuoteInput
+    config: ConfigEntry
+    lazy: bool
+    cad_name: Optional[str] = None
+    cad_bytes: Optional[bytes] = None
+    cad_path: Optional[Path] = None  # large upload spooled to a temp file; the caller deletes it
+    read_upload: Optional[float] = None
+
+
+async def _read_quote_request(
+    input_json: Optional[str],
+    input_file: Optional[UploadFile],
+    cad_file: Optional[UploadFile],
+    config_name: str,
+    artifacts: str,
+) -> _QuoteRequest:
+    """The form fields /quote and /jobs share, validated (400 / 413 on bad input)."""
+    if (input_json is None) and (input_file is None):
+        raise HTTPException(status_code=400, detail="Provide either input_json (string) or input_file (upload).")
+    if (input_json is not None) and (input_file is not None):
+        raise HTTPException(status_code=400, detail="Provide only one of input_json or input_file, not both.")
+
+    if artifacts not in ("eager", "lazy"):
+        raise HTTPException(status_code=400, detail="artifacts must be 'eager' or 'lazy'.")
+    lazy = artifacts == "lazy"
+
+    config = _config(config_name)
+
+    if input_json is not None:
+        q = _validate_input(input_json, "input_json")
+    else:
+        assert input_file is not None
+        if _safe_ext(input_file.filename or "") != ".json":
+            raise HTTPException(status_code=400, detail="input_file must be a .json file.")
+        q = _validate_input(await _read_upload_limited(input_file, MAX_INPUT_BYTES), "input_file")
+
+    if lazy:
+        try:
+            safe_quote_id(q.quote_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+    # Optional CAD file: handed to the geometry code as bytes; only large uploads touch the disk
+    cad_name: Optional[str] = None
+    cad_bytes: Optional[bytes] = None
+    cad_path: Optional[Path] = None
+    read_upload: Optional[float] = None
+    if cad_file is not None:
+        ext = _safe_ext(cad_file.filename or "")
+        if ext not in ALLOWED_EXTS:
+            raise HTTPException(status_code=400, detail=f"Unsupported CAD extension: {ext}")
+        t0 = time.perf_counter()
+        cad_bytes, cad_path, cad_size = await _spool_upload(cad_file, ext)
+        read_upload = time.perf_counter() - t0
+        cad_name = f"cad{ext}"
+        if METRICS_ENABLED:
+            UPLOAD_BYTES.observe(cad_size)
+
+    return _QuoteRequest(q, config, lazy, cad_name, cad_bytes, cad_path, read_upload)
 
 
 @app.get("/health")
@@ -33,6 +320,20 @@ def health():
     return {"ok": True}
 
 
+@app.get("/configs")
+def configs():
+    """Loaded configs with their version and digests, plus files that failed to (re)load."""
+    return _get_registry().describe()
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text format: stage histograms, request counts, upload sizes, mesh sizes, in-flight."""
+    if _jobs is not None:
+        _jobs.refresh_metrics()
+    return PlainTextResponse(REGISTRY.render(), media_type=REGISTRY.content_type)
+
+
 @app.post("/quote")
 async def quote(
     # Either input_json string OR input_file upload
@@ -42,69 +343,423 @@ async def quote(
     # Optional CAD upload
     cad_file: Optional[UploadFile] = File(default=None),
 
-    # Config selection: default to example config
+    # Config name (see GET /configs); a path to a registered config file also works
     config_name: str = Form(default=DEFAULT_CONFIG),
 
     # Output directory (relative or absolute). For local dev, dist is fine.
     out_dir: str = Form(default="dist"),
+
+    # "eager": render PDF + XLSX now. "lazy": price only; fetch GET /quote/{id}/pdf|xlsx later.
+    artifacts: str = Form(default="eager"),
+
+    # include per-stage wall times ("timings") in the response
+    timings: bool = Form(default=False),
 ):
-    if (input_json is None) and (input_file is None):
-        raise HTTPException(status_code=400, detail="Provide either input_json (string) or input_file (upload).")
-    if (input_json is not None) and (input_file is not None):
-        raise HTTPException(status_code=400, detail="Provide only one of input_json or input_file, not both.")
+    req = await _read_quote_request(input_json, input_file, cad_file, config_name, artifacts)
+    job = QuoteJob(
+        quote=req.quote,
+        config_path=req.config.path,
+        config=req.config.config,
+        out_dir=str(Path(out_dir).resolve()),
+        cad_name=req.cad_name,
+        cad_bytes=req.cad_bytes,
+        cad_path=str(req.cad_path) if req.cad_path is not None else None,
+        lazy=req.lazy,
+        store_dir=str(default_store_dir().resolve()),
+        timings=timings or METRICS_ENABLED,
+    )
+
+    # Run quote generation in the worker pool (writes artifacts to out_dir)
+    try:
+        t0 = time.perf_counter()
+        result = await _get_pool().run(run_quote_job, job)
+        pool_seconds = time.perf_counter() - t0
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"}) from e
+    except StlTooLargeToPlace as e:
+        # a large STL asked for work that would load the whole mesh (e.g. splitting its bodies)
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    except ValueError as e:
+        # e.g. an empty mesh or a part that fits no printer: the request's fault, as in /jobs
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except NotImplementedError as e:
+        # Non-STL CAD types are accepted but not automated (yet)
+        raise HTTPException(status_code=422, detail=str(e)) from e
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Quote generation failed: {e}") from e
+    finally:
+        if req.cad_path is not None:
+            req.cad_path.unlink(missing_ok=True)
+
+    _finish_result(result, pool_seconds, timings, req.read_upload)
+    return JSONResponse({"quote": result, "artifacts": _artifact_links(result, req.lazy)})
+
+
+class _PartTooLarge(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class _BatchPart:
+    name: str  # upload file name, or the path inside the zip
+    load: Callable[[], bytes | bytearray]  # raises _PartTooLarge past MAX_BATCH_PART_BYTES
 
-    cfg_path = Path(config_name)
-    if not cfg_path.exists():
-        raise HTTPException(status_code=400, detail=f"Config not found: {cfg_path}")
-
-    # Prepare a temp workspace for uploaded files
-    with tempfile.TemporaryDirectory(prefix="sla_quote_") as td:
-        td_path = Path(td)
-
-        # Write input JSON
-        input_json_path = td_path / "input.json"
-        if input_json is not None:
-            try:
-                parsed = json.loads(input_json)
-            except json.JSONDecodeError as e:
-                raise HTTPException(status_code=400, detail=f"input_json is invalid JSON: {e}") from e
-            input_json_path.write_text(json.dumps(parsed), encoding="utf-8")
+
+class _BufferFile(io.RawIOBase):
+    """A seekable, read-only file over a buffer; io.BytesIO would copy a bytearray."""
+
+    def __init__(self, data: bytearray) -> None:
+        self._view = memoryview(data)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        chunk = self._view[self._pos : self._pos + len(b)]
+        b[: len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = (0, self._pos, len(self._view))[whence]
+        self._pos = max(base + offset, 0)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+def _zip_parts(data: bytearray, zip_name: str) -> List[_BatchPart]:
+    """
+    CAD entries of an uploaded zip, decompressed only when their part is quoted.
+    Zip-bomb guards: entry count, declared sizes, and reads capped at MAX_BATCH_PART_BYTES whatever
+    the header says.
+    """
+    try:
+        zf = zipfile.ZipFile(_BufferFile(data))
+    except zipfile.BadZipFile as e:
+        raise HTTPException(status_code=400, detail=f"{zip_name} is not a valid zip file.") from e
+    infos = zf.infolist()
+    if len(infos) > MAX_ZIP_ENTRIES:
+        raise HTTPException(
+            status_code=400, detail=f"{zip_name} lists {len(infos)} entries (max {MAX_ZIP_ENTRIES})."
+        )
+
+    def reader(info: zipfile.ZipInfo) -> Callable[[], bytes]:
+        def load() -> bytes:
+            if info.file_size > MAX_BATCH_PART_BYTES:
+                raise _PartTooLarge(too_large_message(info.file_size, MAX_BATCH_PART_BYTES))
+            with zf.open(info) as f:
+                out = f.read(MAX_BATCH_PART_BYTES + 1)
+            if len(out) > MAX_BATCH_PART_BYTES:
+                raise _PartTooLarge(
+                    f"File too large: more than {MAX_BATCH_PART_BYTES/1024/1024:g} MB once decompressed."
+                )
+            return out
+        return load
+
+    parts = []
+    for info in infos:
+        path = PurePosixPath(info.filename)
+        if info.is_dir() or path.name.startswith(".") or "__MACOSX" in path.parts:
+            continue
+        if path.suffix.lower() in BATCH_CAD_EXTS:
+            parts.append(_BatchPart(info.filename, reader(info)))
+    return parts
+
+
+async def _collect_batch_parts(files: List[UploadFile]) -> List[_BatchPart]:
+    parts: List[_BatchPart] = []
+    budget = MAX_BATCH_BYTES
+    for upload in files:
+        name = upload.filename or "upload"
+        ext = _safe_ext(name)
+        if ext == ".zip":
+            data = await _read_upload_limited(upload, budget)
+            parts.extend(_zip_parts(data, name))
+        elif ext in BATCH_CAD_EXTS:
+            data = await _read_upload_limited(upload, min(MAX_BATCH_PART_BYTES, budget))
+            parts.append(_BatchPart(name, lambda data=data: data))
+        else:
+            raise HTTPException(status_code=400, detail=f"Unsupported batch file: {name} (CAD files or .zip)")
+        budget -= len(data)
+        if METRICS_ENABLED:
+            UPLOAD_BYTES.observe(len(data))
+    if not parts:
+        raise HTTPException(status_code=400, detail="No CAD files in the batch.")
+    if len(parts) > MAX_BATCH_PARTS:
+        raise HTTPException(status_code=400, detail=f"Batch has {len(parts)} parts (max {MAX_BATCH_PARTS}).")
+    return parts
+
+
+def _deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _deep_merge(base[key], value)
         else:
-            assert input_file is not None
-            if _safe_ext(input_file.filename or "") != ".json":
-                raise HTTPException(status_code=400, detail="input_file must be a .json file.")
-            data = await _read_upload_limited(input_file)
-            input_json_path.write_bytes(data)
-
-        # Optional CAD file
-        cad_path: Optional[Path] = None
-        if cad_file is not None:
-            ext = _safe_ext(cad_file.filename or "")
-            if ext not in ALLOWED_EXTS:
-                raise HTTPException(status_code=400, detail=f"Unsupported CAD extension: {ext}")
-            # Enforce 10MB for CAD file too
-            cad_bytes = await _read_upload_limited(cad_file)
-            cad_path = td_path / f"cad{ext}"
-            cad_path.write_bytes(cad_bytes)
-
-        # Run quote generation (writes artifacts to out_dir)
+            base[key] = value
+    return base
+
+
+async def _quote_batch_part(
+    index: int,
+    part: _BatchPart,
+    template: Dict[str, Any],
+    overrides: Dict[str, Any],
+    job_args: Dict[str, Any],
+    keep_timings: bool,
+) -> Dict[str, Any]:
+    """One NDJSON line: the priced part, or its error."""
+    stem = PurePosixPath(part.name).stem
+    line: Dict[str, Any] = {"index": index, "file": part.name}
+    try:
+        data = copy.deepcopy(template)
+        data["quote_id"] = f"{template['quote_id']}-{index + 1:03d}"
+        data["part"].update({"name": stem, "part_number": stem})
+        override = overrides.get(part.name, overrides.get(PurePosixPath(part.name).name))
+        q = QuoteInput.model_validate(_deep_merge(data, override or {}))
+        ext = PurePosixPath(part.name).suffix.lower()
+        if ext != ".stl":
+            raise NotImplementedError(f"{ext} accepted but not automated; export to STL for batch quoting.")
+        cad_bytes = await asyncio.to_thread(part.load)
+        job = QuoteJob(quote=q, cad_name=f"cad{ext}", cad_bytes=cad_bytes, **job_args)
+
+        t0 = time.perf_counter()
+        # other requests may hold the queue; a batch waits for a place instead of failing the part
+        result = await _get_pool().run(run_quote_job, job, wait=True)
+        _finish_result(result, time.perf_counter() - t0, keep_timings)
+    except ValidationError as e:
+        return {**line, "ok": False, "status": 400, "error": f"Not a valid quote input: {e}"}
+    except (_PartTooLarge, StlTooLargeToPlace) as e:
+        # over the upload limit, or a large STL asking for work that would load the whole mesh
+        return {**line, "ok": False, "status": 413, "error": str(e)}
+    except ValueError as e:
+        return {**line, "ok": False, "status": 400, "error": str(e)}
+    except NotImplementedError as e:
+        return {**line, "ok": False, "status": 422, "error": str(e)}
+    except Exception as e:
+        return {**line, "ok": False, "status": 500, "error": f"Quote generation failed: {e}"}
+    return {**line, "ok": True, "quote": result, "artifacts": _artifact_links(result, job_args["lazy"])}
+
+
+async def _batch_lines(
+    parts: List[_BatchPart],
+    template: Dict[str, Any],
+    overrides: Dict[str, Any],
+    job_args: Dict[str, Any],
+    keep_timings: bool,
+) -> AsyncIterator[bytes]:
+    """NDJSON lines in completion order, then {"totals": ...}."""
+    t0 = time.perf_counter()
+    # at most one part per worker, so a big batch does not shut out single /quote requests
+    slots = asyncio.Semaphore(_get_pool().workers)
+
+    async def run(index: int, part: _BatchPart) -> Dict[str, Any]:
+        async with slots:
+            return await _quote_batch_part(index, part, template, overrides, job_args, keep_timings)
+
+    tasks = [asyncio.ensure_future(run(i, p)) for i, p in enumerate(parts)]
+    totals: Dict[str, Any] = {"parts": len(parts), "ok": 0, "failed": 0, "qty": 0, "sell_price": 0.0}
+    try:
+        for next_line in asyncio.as_completed(tasks):
+            line = await next_line
+            if line["ok"]:
+                totals["ok"] += 1
+                totals["qty"] += line["quote"]["qty"]
+                totals["sell_price"] += line["quote"]["sell_price"]
+                totals.setdefault("currency", line["quote"]["currency"])
+            else:
+                totals["failed"] += 1
+            yield (json.dumps(line) + "\n").encode("utf-8")
+    finally:
+        for task in tasks:
+            task.cancel()  # client went away: stop queueing the remaining parts
+    totals["sell_price"] = round(totals["sell_price"], 2)
+    totals["seconds"] = round(time.perf_counter() - t0, 3)
+    yield (json.dumps({"totals": totals}) + "\n").encode("utf-8")
+
+
+@app.post("/quote/batch")
+async def quote_batch(
+    # Template applied to every part: quote_id becomes <quote_id>-001.., part name/number the file stem
+    input_json: Optional[str] = Form(default=None),
+    input_file: Optional[UploadFile] = File(default=None),
+
+    # CAD files and/or zips of CAD files
+    files: List[UploadFile] = File(...),
+
+    # Per-part overrides by file name, e.g. {"bracket.stl": {"process": {"qty": 4}}}
+    parts_json: Optional[str] = Form(default=None),
+
+    config_name: str = Form(default=DEFAULT_CONFIG),
+    out_dir: str = Form(default="dist"),
+    artifacts: str = Form(default="eager"),
+    timings: bool = Form(default=False),
+):
+    """Quote every part of an assembly; streams one NDJSON line per part as it completes."""
+    if (input_json is None) == (input_file is None):
+        raise HTTPException(
+            status_code=400, detail="Provide exactly one of input_json (string) or input_file (upload)."
+        )
+    if artifacts not in ("eager", "lazy"):
+        raise HTTPException(status_code=400, detail="artifacts must be 'eager' or 'lazy'.")
+    lazy = artifacts == "lazy"
+
+    config = _config(config_name)
+
+    if input_json is not None:
+        template_q = _validate_input(input_json, "input_json")
+    else:
+        assert input_file is not None
+        template_q = _validate_input(await _read_upload_limited(input_file, MAX_INPUT_BYTES), "input_file")
+    if lazy:
         try:
-            result = generate_quote_from_files(
-                input_json_path=input_json_path,
-                config_path=cfg_path,
-                cad_file_path=cad_path if cad_path else None,
-                out_dir=out_dir,
-            )
-        except NotImplementedError as e:
-            # Non-STL CAD types are accepted but not automated (yet)
-            raise HTTPException(status_code=422, detail=str(e)) from e
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Quote generation failed: {e}") from e
-
-        artifacts = {
-            "pdf": result.get("artifact_pdf"),
-            "xlsx": result.get("artifact_xlsx"),
-            "json": result.get("artifact_json"),
-        }
-
-        return JSONResponse({"quote": result, "artifacts": artifacts})
+            safe_quote_id(f"{template_q.quote_id}-{MAX_BATCH_PARTS:03d}")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+    try:
+        overrides = json.loads(parts_json) if parts_json else {}
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"parts_json is not valid JSON: {e}") from e
+    if not isinstance(overrides, dict):
+        raise HTTPException(status_code=400, detail="parts_json must map file names to overrides.")
+
+    parts = await _collect_batch_parts(files)
+    job_args = dict(
+        config_path=config.path,
+        config=config.config,
+        out_dir=str(Path(out_dir).resolve()),
+        lazy=lazy,
+        store_dir=str(default_store_dir().resolve()),
+        timings=timings or METRICS_ENABLED,
+    )
+    return StreamingResponse(
+        _batch_lines(parts, template_q.model_dump(), overrides, job_args, timings),
+        media_type="application/x-ndjson",
+    )
+
+
+_MEDIA_TYPES = {
+    "pdf": "application/pdf",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+async def _stored_artifact(quote_id: str, kind: str) -> FileResponse:
+    try:
+        safe_quote_id(quote_id)
+        path = await _get_pool().run(render_stored_artifact, str(default_store_dir().resolve()), quote_id, kind)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except PoolSaturated as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"}) from e
+    return FileResponse(path, media_type=_MEDIA_TYPES[kind], filename=Path(path).name)
+
+
+@app.get("/quote/{quote_id}/pdf")
+async def quote_pdf(quote_id: str):
+    return await _stored_artifact(quote_id, "pdf")
+
+
+@app.get("/quote/{quote_id}/xlsx")
+async def quote_xlsx(quote_id: str):
+    return await _stored_artifact(quote_id, "xlsx")
+
+
+def _job_body(job: Job, queue: JobQueue) -> Dict[str, Any]:
+    body = job.to_dict()
+    if job.status == "queued":
+        body["position"] = queue.position(job)
+    if job.status == "done" and job.result is not None:
+        body["quote"] = job.result
+        body["artifacts"] = _artifact_links(job.result, job.request["lazy"])
+    return body
+
+
+async def _find_job(job_id: str) -> Job:
+    job = await asyncio.to_thread(_get_jobs().queue.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    # the same fields as POST /quote
+    input_json: Optional[str] = Form(default=None),
+    input_file: Optional[UploadFile] = File(default=None),
+    cad_file: Optional[UploadFile] = File(default=None),
+    config_name: str = Form(default=DEFAULT_CONFIG),
+    out_dir: str = Form(default="dist"),
+    artifacts: str = Form(default="eager"),
+    timings: bool = Form(default=False),
+):
+    """
+    Queue a quote and answer 202 at once; poll GET /jobs/{id} or stream /jobs/{id}/events.
+    Jobs run by priority (config job_priority: customer tier, expedite), then in order.
+    """
+    req = await _read_quote_request(input_json, input_file, cad_file, config_name, artifacts)
+    runner = _get_jobs()
+    runner.ensure_started()
+    request = {
+        "out_dir": str(Path(out_dir).resolve()),
+        "lazy": req.lazy,
+        "store_dir": str(default_store_dir().resolve()),
+        "timings": timings or METRICS_ENABLED,
+        "keep_timings": timings,
+    }
+    try:
+        job = await asyncio.to_thread(
+            runner.queue.submit,
+            req.quote,
+            req.config.name,
+            job_priority(req.quote, req.config.config),
+            request,
+            req.cad_name,
+            req.cad_path if req.cad_path is not None else req.cad_bytes,
+        )
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"}) from e
+    finally:
+        if req.cad_path is not None:
+            req.cad_path.unlink(missing_ok=True)  # moved into the queue's spool unless submit failed
+    # status and position as submitted, before the runner is woken to claim it
+    body = await asyncio.to_thread(_job_body, job, runner.queue)
+    runner.notify()
+    return JSONResponse(body, status_code=202, headers={"Location": f"/jobs/{job.id}"})
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await _find_job(job_id)
+    return await asyncio.to_thread(_job_body, job, _get_jobs().queue)
+
+
+async def _job_events(job_id: str) -> AsyncIterator[bytes]:
+    runner = _get_jobs()
+    last = None
+    while True:
+        job = await asyncio.to_thread(runner.queue.get, job_id)
+        if job is None:
+            return
+        body = await asyncio.to_thread(_job_body, job, runner.queue)
+        state = (job.status, job.attempts, body.get("position"))
+        if state != last:
+            last = state
+            yield (json.dumps(body) + "\n").encode("utf-8")
+        if job.status in FINISHED:
+            return
+        await runner.changed(timeout=1.0)
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """NDJSON: the job (as GET /jobs/{id}) each time its status or queue position changes, until it finishes."""
+    await _find_job(job_id)
+    return StreamingResponse(_job_events(job_id), media_type="application/x-ndjson")
@@ -0,0 +1,479 @@
+from __future__ import annotations
+
+import math
+import re
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .config import SupportSpec
+from .geometry import (
+    MM3_PER_ML,
+    STL_FACET_DTYPE,
+    STL_HEADER_BYTES,
+    StlMetrics,
+    StlSource,
+    _mm_to_in,
+    _vertex_array,
+    edge_use_counts,
+    signed_volume_mm3,
+    source_size,
+)
+from .nesting import Footprint, footprint
+from .orientation import hull_points
+from .print_time import LayerProfile, _layer_areas2
+from .supports import MAX_SAMPLES_PER_CHUNK, SupportEstimate, _rasterize, _support_grid, _supported_heights
+
+BLOCK_TRIANGLES = 1 << 17  # 6.25 MiB of binary facets per block
+EDGE_MEMORY_BYTES = 64 * 1024 * 1024  # edge records held (and sorted) in memory at once
+# sniff this much before deciding binary vs ASCII when the total size is unknown
+_SNIFF_BYTES = 512
+# spilled edge records are split 2**_FANOUT_BITS ways by hash bits, recursively if needed
+_FANOUT_BITS = 6
+_VERTEX_RE = re.compile(rb"vertex\s+([^\r\n]*)")
+
+_M1 = np.uint64(0xBF58476D1CE4E5B9)
+_M2 = np.uint64(0x94D049BB133111EB)
+_SEEDS = tuple(np.uint64(s) for s in (0x9E3779B97F4A7C15, 0xD1B54A32D192ED03, 0x8CB92BA72F3D8DD7, 0xABC98388FB8FAC03))
+
+
+def _mix(z: np.ndarray) -> np.ndarray:
+    """splitmix64 finalizer (a bijection on uint64), in place."""
+    z ^= z >> np.uint64(30)
+    z *= _M1
+    z ^= z >> np.uint64(27)
+    z *= _M2
+    z ^= z >> np.uint64(31)
+    return z
+
+
+def edge_hashes(verts: np.ndarray) -> np.ndarray:
+    """
+    (3 * faces, 2) uint64: a 128-bit hash per undirected edge, from (3 * faces, 3) float32
+    vertices. Equal coordinate bits give equal hashes, so this is the same edge identity as
+    geometry.vertex_ids/edge_keys without a global vertex table.
+    """
+    bits = verts.view(np.uint32).astype(np.uint64)
+    a = bits[:, 0] | (bits[:, 1] << np.uint64(32))
+    b = bits[:, 2]
+    out = np.empty((len(verts), 2), dtype=np.uint64)
+    for col, (vseed, eseed) in enumerate(((_SEEDS[0], _SEEDS[2]), (_SEEDS[1], _SEEDS[3]))):
+        hv = (a ^ _mix(b + vseed)).reshape(-1, 3)
+        _mix(hv)
+        nxt = hv[:, [1, 2, 0]]
+        lo = np.minimum(hv, nxt)
+        hi = np.maximum(hv, nxt)
+        hi += eseed
+        out[:, col] = (lo ^ _mix(hi)).reshape(-1)
+        _mix(out[:, col])
+    return out
+
+
+def _count_records(records: np.ndarray) -> Tuple[int, int, int]:
+    """edge_use_counts for 128-bit edge records."""
+    if len(records) == 0:
+        return 0, 0, 0
+    order = np.argsort(records[:, 0])
+    s1 = records[order, 0]
+    s2 = records[order, 1]
+    if np.any((s1[1:] == s1[:-1]) & (s2[1:] != s2[:-1])):
+        # distinct edges share the first word: order by both
+        order = np.lexsort((records[:, 1], records[:, 0]))
+        s1 = records[order, 0]
+        s2 = records[order, 1]
+    new = np.empty(len(s1), dtype=bool)
+    new[0] = True
+    new[1:] = (s1[1:] != s1[:-1]) | (s2[1:] != s2[:-1])
+    starts = np.flatnonzero(new)
+    counts = np.diff(np.append(starts, len(s1)))
+    return len(counts), int(np.count_nonzero(counts == 1)), int(np.count_nonzero(counts > 2))
+
+
+def _sum_counts(parts: Iterable[Tuple[int, int, int]]) -> Tuple[int, int, int]:
+    edges = boundary = non_manifold = 0
+    for e, b, n in parts:
+        edges, boundary, non_manifold = edges + e, boundary + b, non_manifold + n
+    return edges, boundary, non_manifold
+
+
+class _EdgeCounter:
+    """
+    Counts how many faces use each edge. Records stay in memory up to a budget; past it they
+    are hash-partitioned into files under a temp dir and counted one partition at a time.
+    """
+
+    def __init__(self, memory_bytes: int, spill_dir: Optional[str | Path] = None) -> None:
+        # sorting a partition needs about twice its size again (order, sorted columns)
+        self.limit = max(memory_bytes // 3, 1024)
+        self.spill_dir = spill_dir
+        self.spilled = 0
+        self._chunks: List[np.ndarray] = []
+        self._held = 0
+        self._tmp: Optional[Path] = None
+
+    def add(self, records: np.ndarray) -> None:
+        self._chunks.append(records)
+        self._held += records.nbytes
+        if self._held > self.limit:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._tmp is None:
+            self._tmp = Path(tempfile.mkdtemp(prefix="sla-quote-edges-", dir=self.spill_dir))
+        if self._chunks:
+            records = np.concatenate(self._chunks)
+            self._chunks, self._held = [], 0
+            self.spilled += records.nbytes
+            _write_partitions(records, self._tmp, "p", level=0)
+
+    def _count_file(self, path: Path, level: int) -> Tuple[int, int, int]:
+        if path.stat().st_size <= self.limit or (level + 1) * _FANOUT_BITS > 64:
+            return _count_records(np.fromfile(path, dtype=np.uint64).reshape(-1, 2))
+        # too many records share the top hash bits: split this partition by the next bits
+        with path.open("rb") as f:
+            while True:
+                block = np.fromfile(f, dtype=np.uint64, count=self.limit // 8).reshape(-1, 2)
+                if not len(block):
+                    break
+                _write_partitions(block, path.parent, path.name + ".", level)
+        path.unlink()
+        return _sum_counts(self._count_file(sub, level + 1) for sub in sorted(path.parent.glob(path.name + ".*")))
+
+    def finish(self) -> Tuple[int, int, int]:
+        """(distinct edges, boundary edges, non-manifold edges)."""
+        try:
+            if self._tmp is None:
+                return _count_records(np.concatenate(self._chunks) if self._chunks else np.empty((0, 2), np.uint64))
+            self._spill()
+            assert self._tmp is not None
+            return _sum_counts(self._count_file(path, 1) for path in sorted(self._tmp.iterdir()))
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._chunks, self._held = [], 0
+        if self._tmp is not None:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+            self._tmp = None
+
+
+def _write_partitions(records: np.ndarray, directory: Path, prefix: str, level: int) -> None:
+    """Append records to <prefix>NN files, NN = the level-th group of _FANOUT_BITS hash bits."""
+    shift = np.uint64(64 - _FANOUT_BITS * (level + 1))
+    bucket = (records[:, 0] >> shift) & np.uint64((1 << _FANOUT_BITS) - 1)
+    order = np.argsort(bucket, kind="stable")
+    bucket = bucket[order]
+    bounds = np.searchsorted(bucket, np.arange((1 << _FANOUT_BITS) + 1, dtype=np.uint64))
+    for b in range(1 << _FANOUT_BITS):
+        lo, hi = bounds[b], bounds[b + 1]
+        if hi > lo:
+            with (directory / f"{prefix}{b:02d}").open("ab") as f:
+                records[order[lo:hi]].tofile(f)
+
+
+class _StlReader:
+    """
+    Splits an STL byte stream into triangle blocks: feed() chunks as they arrive, end() after
+    the last one; subclasses consume the (n, 3, 3) float32 blocks in _add(). Binary and ASCII
+    STLs are both accepted; size_hint (the total byte count, when known) settles binary files
+    whose header happens to start with "solid".
+    """
+
+    def __init__(self, size_hint: Optional[int] = None, block_triangles: int = BLOCK_TRIANGLES) -> None:
+        self.size_hint = size_hint
+        self.block_triangles = int(block_triangles)
+        self.block_bytes = self.block_triangles * STL_FACET_DTYPE.itemsize
+        self.received = 0
+        self.triangles = 0
+        self.mode: Optional[str] = None  # "binary" | "ascii", once sniffed
+        self._pending = bytearray()
+        self._coords = np.empty(0, dtype=np.float64)  # ASCII vertex values not yet a whole triangle
+
+    def feed(self, data: bytes | bytearray | memoryview) -> None:
+        view = memoryview(data).cast("B")
+        self.received += view.nbytes
+        self._pending += view
+        if self.mode is None:
+            if len(self._pending) < max(_SNIFF_BYTES, STL_HEADER_BYTES):
+                return
+            self._sniff()
+        if self.mode == "binary":
+            self._binary_blocks(final=False)
+        else:
+            self._ascii_lines(final=False)
+
+    def _sniff(self) -> None:
+        head = bytes(self._pending[:_SNIFF_BYTES])
+        binary = not (head.lstrip()[:5].lower() == b"solid" and b"facet" in head)
+        if not binary and len(head) >= STL_HEADER_BYTES and self.size_hint is not None:
+            # some exporters write "solid ..." into binary headers; a matching facet count settles it
+            n_facets = int(np.frombuffer(head[80:84], dtype="<u4")[0])
+            binary = self.size_hint == STL_HEADER_BYTES + n_facets * STL_FACET_DTYPE.itemsize
+        if binary and len(head) < STL_HEADER_BYTES:
+            raise ValueError(f"Not an STL file: {self.received} bytes is shorter than a binary STL header.")
+        self.mode = "binary" if binary else "ascii"
+        if binary:
+            del self._pending[:STL_HEADER_BYTES]
+
+    def _binary_blocks(self, final: bool) -> None:
+        n = len(self._pending) // STL_FACET_DTYPE.itemsize
+        if n == 0 or (n < self.block_triangles and not final):
+            return
+        facets = np.frombuffer(self._pending, dtype=STL_FACET_DTYPE, count=n)
+        self._blocks(facets["vertices"])
+        del facets  # release the buffer export before resizing
+        del self._pending[: n * STL_FACET_DTYPE.itemsize]
+
+    def _ascii_lines(self, final: bool) -> None:
+        end = len(self._pending) if final else self._pending.rfind(b"\n") + 1
+        if end <= 0 or (end < self.block_bytes and not final):
+            return
+        values = b" ".join(_VERTEX_RE.findall(self._pending, 0, end)).split()
+        del self._pending[:end]
+        if values:
+            self._coords = np.concatenate([self._coords, np.array(values, dtype=np.float64)])
+        whole = len(self._coords) // 9 * 9
+        if whole:
+            self._blocks(self._coords[:whole].astype(np.float32).reshape(-1, 3, 3))
+            self._coords = self._coords[whole:]
+
+    def _blocks(self, triangles: np.ndarray) -> None:
+        for start in range(0, len(triangles), self.block_triangles):
+            block = triangles[start : start + self.block_triangles]
+            self._add(block)
+            self.triangles += len(block)
+
+    def _add(self, block: np.ndarray) -> None:
+        raise NotImplementedError
+
+    def end(self) -> None:
+        """Flush what is left; raises ValueError for truncated or empty STLs."""
+        if self.mode is None:
+            self._sniff()
+        if self.mode == "binary":
+            self._binary_blocks(final=True)
+            if self._pending:
+                raise ValueError(
+                    f"Truncated binary STL: {len(self._pending)} bytes left over after {self.triangles} facets."
+                )
+        else:
+            self._ascii_lines(final=True)
+            if len(self._coords):
+                raise ValueError("Truncated ASCII STL: a facet has fewer than three vertices.")
+        if self.triangles == 0:
+            raise ValueError("STL mesh is empty.")
+
+    def close(self) -> None:
+        self._pending = bytearray()
+
+
+class StlAccumulator(_StlReader):
+    """
+    STL metrics from a byte stream in fixed-size blocks: feed() chunks as they arrive
+    (upload reads, file reads), then finish().
+
+    Volume, bounds and the triangle count are running sums. Each edge becomes a 128-bit
+    hash of its endpoint coordinates; the hashes are counted in memory up to memory_bytes
+    and partitioned to temp files beyond that, so memory stays flat as the file grows.
+    """
+
+    def __init__(
+        self,
+        size_hint: Optional[int] = None,
+        block_triangles: int = BLOCK_TRIANGLES,
+        memory_bytes: int = EDGE_MEMORY_BYTES,
+        spill_dir: Optional[str | Path] = None,
+    ) -> None:
+        super().__init__(size_hint, block_triangles)
+        self._volume_mm3 = 0.0
+        self._lo = np.full(3, np.inf)
+        self._hi = np.full(3, -np.inf)
+        self._edges = _EdgeCounter(memory_bytes, spill_dir)
+
+    def __enter__(self) -> "StlAccumulator":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    @property
+    def spilled_bytes(self) -> int:
+        """Edge records written to temp files so far (0 when everything fit in memory)."""
+        return self._edges.spilled
+
+    def _add(self, block: np.ndarray) -> None:
+        verts = _vertex_array(block)
+        self._lo = np.minimum(self._lo, verts.min(axis=0))
+        self._hi = np.maximum(self._hi, verts.max(axis=0))
+        self._volume_mm3 += signed_volume_mm3(block)
+        self._edges.add(edge_hashes(verts))
+
+    def finish(self) -> StlMetrics:
+        try:
+            self.end()
+            edges, boundary, non_manifold = self._edges.finish()
+        finally:
+            self.close()
+
+        extents = self._hi.astype(np.float64) - self._lo.astype(np.float64)
+        return StlMetrics(
+            volume_ml=abs(self._volume_mm3) / MM3_PER_ML,
+            bounds_in=(_mm_to_in(float(extents[0])), _mm_to_in(float(extents[1])), _mm_to_in(float(extents[2]))),
+            is_watertight=edges > 0 and boundary == 0 and non_manifold == 0,
+            triangles=self.triangles,
+            boundary_edges=boundary,
+            non_manifold_edges=non_manifold,
+        )
+
+    def close(self) -> None:
+        super().close()
+        self._edges.close()
+
+
+class _BlockQueue(_StlReader):
+    def __init__(self, size_hint: Optional[int], block_triangles: int) -> None:
+        super().__init__(size_hint, block_triangles)
+        self.ready: List[np.ndarray] = []
+
+    def _add(self, block: np.ndarray) -> None:
+        self.ready.append(np.array(block, dtype=np.float32))  # a copy: the read buffer is reused
+
+    def take(self) -> List[np.ndarray]:
+        ready, self.ready = self.ready, []
+        return ready
+
+
+def _source_chunks(source: StlSource, chunk_bytes: int) -> Iterator[memoryview]:
+    """The source's bytes, chunk_bytes at a time; file chunks share one buffer."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        buf = memoryview(source).cast("B")
+        for start in range(0, buf.nbytes, chunk_bytes):
+            yield buf[start : start + chunk_bytes]
+        return
+    chunk = bytearray(chunk_bytes)
+    with Path(source).open("rb") as f:
+        while True:
+            n = f.readinto(chunk)
+            if not n:
+                break
+            yield memoryview(chunk)[:n]
+
+
+def iter_stl_blocks(source: StlSource, block_triangles: int = BLOCK_TRIANGLES) -> Iterator[np.ndarray]:
+    """The triangles of an STL path or buffer as (n, 3, 3) float32 blocks of at most block_triangles."""
+    reader = _BlockQueue(source_size(source), block_triangles)
+    try:
+        for chunk in _source_chunks(source, reader.block_bytes):
+            reader.feed(chunk)
+            yield from reader.take()
+        reader.end()
+        yield from reader.take()
+    finally:
+        reader.close()
+
+
+def scan_stl_metrics(
+    source: StlSource,
+    block_triangles: int = BLOCK_TRIANGLES,
+    memory_bytes: int = EDGE_MEMORY_BYTES,
+    spill_dir: Optional[str | Path] = None,
+) -> StlMetrics:
+    """
+    load_stl_metrics in bounded memory: the file is read (or the buffer sliced) one block at
+    a time instead of being memory-mapped or loaded as a mesh.
+    """
+    acc = StlAccumulator(source_size(source), block_triangles, memory_bytes, spill_dir)
+    with acc:
+        for chunk in _source_chunks(source, acc.block_bytes):
+            acc.feed(chunk)
+        return acc.finish()
+
+
+def scan_bounds(source: StlSource, block_triangles: int = BLOCK_TRIANGLES) -> Tuple[np.ndarray, np.ndarray]:
+    """(lowest, highest) vertex coordinates in mm, one block at a time."""
+    lo = np.full(3, np.inf)
+    hi = np.full(3, -np.inf)
+    for block in iter_stl_blocks(source, block_triangles):
+        verts = block.reshape(-1, 3)
+        lo = np.minimum(lo, verts.min(axis=0))
+        hi = np.maximum(hi, verts.max(axis=0))
+    return lo, hi
+
+
+def scan_layer_profile(
+    source: StlSource, layer_height_mm: float, block_triangles: int = BLOCK_TRIANGLES
+) -> LayerProfile:
+    """
+    print_time.layer_profile one block at a time, as modeled. Each triangle's share of every
+    layer's shoelace sum is independent of the others, so the blocks' sums just add up.
+    """
+    if layer_height_mm <= 0:
+        raise ValueError("layer_height_mm must be > 0.")
+    h = float(layer_height_mm)
+    lo, hi = scan_bounds(source, block_triangles)
+    centre = (lo + hi) / 2.0
+    n_layers = max(1, math.ceil(float(hi[2] - lo[2]) / h - 1e-9))
+    areas2 = np.zeros(n_layers, dtype=np.float64)
+    for block in iter_stl_blocks(source, block_triangles):
+        v = np.ascontiguousarray(block.transpose(2, 1, 0), dtype=np.float64)
+        v[0] -= centre[0]
+        v[1] -= centre[1]
+        v[2] -= lo[2]
+        areas2 += _layer_areas2(v, h, n_layers)
+    areas = np.abs(areas2) * 0.5
+    return LayerProfile(
+        layer_height_mm=h,
+        layers=n_layers,
+        height_mm=float(hi[2] - lo[2]),
+        area_mm2_total=float(areas.sum()),
+        area_mm2_max=float(areas.max()),
+    )
+
+
+def scan_footprint(source: StlSource, block_triangles: int = BLOCK_TRIANGLES) -> Footprint:
+    """nesting.footprint one block at a time, as modeled: the hull of the blocks' hull points."""
+    return footprint(np.concatenate([hull_points(block) for block in iter_stl_blocks(source, block_triangles)]))
+
+
+def scan_supports(source: StlSource, spec: SupportSpec, block_triangles: int = BLOCK_TRIANGLES) -> SupportEstimate:
+    """
+    supports.estimate_supports one block at a time, as modeled. The raster samples are kept
+    (their number grows with the part's footprint and layering, not its triangle count) and
+    sorted once at the end, when the winding of the whole mesh is known.
+    """
+    lo, hi = scan_bounds(source, block_triangles)
+    cell, n_x = _support_grid(float(lo[0]), float(lo[1]), float(hi[0]), float(hi[1]), spec)
+    cos_limit = math.cos(math.radians(spec.self_supporting_deg))
+    facing = 0.0
+    # (up or down by winding, steeper than the limit) -> raster samples
+    samples: Dict[Tuple[bool, bool], Tuple[List[np.ndarray], List[np.ndarray]]] = {
+        (up, steep): ([], []) for up in (True, False) for steep in (True, False)
+    }
+    for block in iter_stl_blocks(source, block_triangles):
+        v = np.ascontiguousarray(block.transpose(2, 1, 0), dtype=np.float64)
+        v[2] -= lo[2] - spec.lift_mm
+        (xa, xb, xc), (ya, yb, yc), (za, zb, zc) = v
+        nz = (xb - xa) * (yc - ya) - (yb - ya) * (xc - xa)
+        facing += float(np.dot(za, nz) + np.dot(zb, nz) + np.dot(zc, nz))
+        nx = (yb - ya) * (zc - za) - (zb - za) * (yc - ya)
+        ny = (zb - za) * (xc - xa) - (xb - xa) * (zc - za)
+        with np.errstate(invalid="ignore"):
+            cos_up = nz / np.sqrt(nx * nx + ny * ny + nz * nz)  # NaN for degenerate faces
+        steep = np.abs(cos_up) > cos_limit
+        for (up, is_steep), (cells, zs) in samples.items():
+            faces = ((cos_up > 0.0) if up else (cos_up < 0.0)) & (steep == is_steep)
+            c, z = _rasterize(v[:, :, faces], float(lo[0]), float(lo[1]), cell, n_x, MAX_SAMPLES_PER_CHUNK)
+            cells.append(c)
+            zs.append(z)
+
+    # inside-out meshes: the faces that wind downward are the upward-facing ones
+    up = facing >= 0.0
+    c_up = np.concatenate(samples[(up, True)][0] + samples[(up, False)][0])
+    z_up = np.concatenate(samples[(up, True)][1] + samples[(up, False)][1])
+    c_down = np.concatenate(samples[(not up, True)][0])
+    z_down = np.concatenate(samples[(not up, True)][1])
+    span = float(hi[2] - lo[2]) + spec.lift_mm + 1.0
+    return _supported_heights(c_up, z_up, c_down, z_down, span, cell, spec)
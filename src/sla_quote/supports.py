@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .config import SupportSpec
+from .geometry import MM3_PER_ML
+from .orientation import Matrix3, rotate_triangles
+from .print_time import _chunk_bounds
+
+# The raster never has more cells than this over the part's plate footprint; larger parts
+# get coarser cells than support.raster_mm.
+MAX_CELLS = 250_000
+# Upper bound on (face, cell) candidates held in memory at once while rasterizing.
+MAX_SAMPLES_PER_CHUNK = 2_000_000
+# Direction that settles raster centres lying exactly on an edge; not parallel to any axis or diagonal.
+_TIE_BREAK = (1.0, 0.3183098861837907)
+
+
+@dataclass(frozen=True)
+class SupportEstimate:
+    volume_ml: float  # support resin (density applied)
+    overhang_area_mm2: float  # plate-projected area of the surfaces that need supports
+    mean_height_mm: float  # average support column height under them
+    cell_mm: float  # raster cell size used
+
+
+def _rasterize(
+    v: np.ndarray, x0: float, y0: float, cell: float, n_x: int, max_samples: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (cell index, z) of every raster cell centre covered by a face's plate projection, with z on
+    the face's plane. v is (3 coords, 3 vertices, faces). Each centre lands in exactly one face
+    of a surface, so sample counts add up to projected area even for faces smaller than a cell.
+    """
+    (xa, xb, xc), (ya, yb, yc), (za, zb, zc) = v
+    ix0 = np.ceil((np.minimum(np.minimum(xa, xb), xc) - x0) / cell - 0.5).astype(np.int64)
+    ix1 = np.floor((np.maximum(np.maximum(xa, xb), xc) - x0) / cell - 0.5).astype(np.int64)
+    iy0 = np.ceil((np.minimum(np.minimum(ya, yb), yc) - y0) / cell - 0.5).astype(np.int64)
+    iy1 = np.floor((np.maximum(np.maximum(ya, yb), yc) - y0) / cell - 0.5).astype(np.int64)
+    width = np.maximum(ix1 - ix0 + 1, 0)
+    counts = width * np.maximum(iy1 - iy0 + 1, 0)
+    # Edge functions (barycentric weights x det) of the projection; faces given here are never
+    # vertical, so det != 0. Flipping by sign(det) makes "inside" positive for either winding.
+    det = (yb - yc) * (xa - xc) + (xc - xb) * (ya - yc)
+    flip = np.sign(det)
+    edges = (
+        (yb - yc, xc - xb, xc, yc),  # opposite a
+        (yc - ya, xa - xc, xc, yc),  # opposite b
+        (ya - yb, xb - xa, xb, yb),  # opposite c
+    )
+    # A centre exactly on a shared edge goes to the face a nudge along _TIE_BREAK moves it into.
+    ties = [(ex * _TIE_BREAK[0] + ey * _TIE_BREAK[1]) * flip > 0 for ex, ey, _, _ in edges]
+
+    cells, zs = [], []
+    bounds = _chunk_bounds(counts, max_samples)
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        c = counts[start:stop]
+        total = int(c.sum())
+        if total == 0:
+            continue
+        idx = np.repeat(np.arange(start, stop), c)
+        local = np.arange(total) - np.repeat(np.cumsum(c) - c, c)
+        iy, ix = np.divmod(local, width[idx])
+        ix += ix0[idx]
+        iy += iy0[idx]
+        px = x0 + (ix + 0.5) * cell
+        py = y0 + (iy + 0.5) * cell
+        inside = np.ones(total, dtype=bool)
+        w = []
+        for (ex, ey, ox, oy), tie in zip(edges, ties):
+            we = ex[idx] * (px - ox[idx]) + ey[idx] * (py - oy[idx])
+            side = we * flip[idx]
+            inside &= (side > 0) | ((side == 0) & tie[idx])
+            w.append(we)
+        d = det[idx]
+        la, lb = w[0] / d, w[1] / d
+        z = la * za[idx] + lb * zb[idx] + (1.0 - la - lb) * zc[idx]
+        cells.append((iy * n_x + ix)[inside])
+        zs.append(z[inside])
+    if not cells:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+    return np.concatenate(cells), np.concatenate(zs)
+
+
+def estimate_supports(
+    triangles: np.ndarray,
+    spec: SupportSpec,
+    rotation: Optional[Matrix3] = None,
+    max_samples: int = MAX_SAMPLES_PER_CHUNK,
+) -> SupportEstimate:
+    """
+    Support resin for a part printed as modeled (or after a PrinterFit.rotation), resting on
+    the plate or raised spec.lift_mm above it.
+
+    Faces are classified by their normal in one vectorized pass: down-facing ones flatter than
+    spec.self_supporting_deg are overhangs, up-facing ones are surfaces a support can stand on.
+    Both are rasterized onto a plate-aligned height map; in each cell every overhang sample is
+    supported from the nearest up-facing sample below it, or from the plate.
+    """
+    tri = np.asarray(triangles)
+    if len(tri) == 0:
+        raise ValueError("STL mesh is empty.")
+    if rotation is not None:
+        tri = rotate_triangles(tri, rotation)
+    v = np.ascontiguousarray(tri.transpose(2, 1, 0), dtype=np.float64)
+    v[2] -= v[2].min() - spec.lift_mm
+
+    (xa, xb, xc), (ya, yb, yc), (za, zb, zc) = v
+    nx = (yb - ya) * (zc - za) - (zb - za) * (yc - ya)
+    ny = (zb - za) * (xc - xa) - (xb - xa) * (zc - za)
+    nz = (xb - xa) * (yc - ya) - (yb - ya) * (xc - xa)
+    length = np.sqrt(nx * nx + ny * ny + nz * nz)
+    # inside-out meshes (negative signed volume) are common in the wild; face them outward
+    if float(np.dot(za, nz) + np.dot(zb, nz) + np.dot(zc, nz)) < 0:
+        nz = -nz
+    with np.errstate(invalid="ignore"):
+        cos_down = -nz / length  # NaN for degenerate faces, which match neither class
+    overhang = cos_down > math.cos(math.radians(spec.self_supporting_deg))
+    upward = cos_down < 0.0
+
+    x0, y0 = float(v[0].min()), float(v[1].min())
+    cell, n_x = _support_grid(x0, y0, float(v[0].max()), float(v[1].max()), spec)
+    if not overhang.any():
+        return SupportEstimate(0.0, 0.0, 0.0, cell)
+
+    c_down, z_down = _rasterize(v[:, :, overhang], x0, y0, cell, n_x, max_samples)
+    c_up, z_up = _rasterize(v[:, :, upward], x0, y0, cell, n_x, max_samples)
+    return _supported_heights(c_up, z_up, c_down, z_down, float(v[2].max()) + 1.0, cell, spec)
+
+
+def _support_grid(x0: float, y0: float, x1: float, y1: float, spec: SupportSpec) -> Tuple[float, int]:
+    """(cell size, cells per row) of the height map over the plate footprint x0..x1, y0..y1."""
+    ex, ey = x1 - x0, y1 - y0
+    cell = max(spec.raster_mm, math.sqrt(ex * ey / MAX_CELLS))
+    return cell, int(math.ceil(ex / cell)) + 1
+
+
+def _supported_heights(
+    c_up: np.ndarray,
+    z_up: np.ndarray,
+    c_down: np.ndarray,
+    z_down: np.ndarray,
+    span: float,
+    cell: float,
+    spec: SupportSpec,
+) -> SupportEstimate:
+    """The estimate from the up-facing and overhang samples; span exceeds every sample's z."""
+    if c_down.size == 0:
+        return SupportEstimate(0.0, 0.0, 0.0, cell)
+
+    # Sort all samples by (cell, z), up-facing first on ties (z compared to within rounding,
+    # so a surface resting on another gets no support). A running maximum over
+    # z + cell * span, which only ever grows within a cell, gives the nearest floor below;
+    # a value carried over from an earlier cell drops below zero, i.e. onto the plate.
+    cells = np.concatenate([c_up, c_down])
+    z = np.concatenate([z_up, z_down])
+    is_up = np.arange(len(cells)) < c_up.size
+    order = np.lexsort((~is_up, np.round(z / (span * 1e-9)), cells))
+    cells, z, is_up = cells[order], z[order], is_up[order]
+    offset = cells * span
+    below = np.maximum.accumulate(np.where(is_up, z + offset, -np.inf)) - offset
+    heights = np.maximum(z - np.maximum(below, 0.0), 0.0)[~is_up]
+
+    area = cell * cell
+    return SupportEstimate(
+        volume_ml=float(heights.sum()) * area * spec.density / MM3_PER_ML,
+        overhang_area_mm2=heights.size * area,
+        mean_height_mm=float(heights.mean()),
+        cell_mm=cell,
+    )
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .batch import _LABOR_STEPS, compute_quotes_batch
+from .config import CompiledConfig, ConfigLike, ensure_compiled
+from .model import QuoteInput
+from .print_time import LayerProfile, estimate_print_hours
+
+DEFAULT_SWEEP_QTYS = (1, 5, 10, 20, 50)
+
+
+@dataclass(frozen=True)
+class PrinterPlacement:
+    """
+    What the part's STL gives a sweep on one printer: copies per build plate (nesting; None:
+    q's builds), the layer profile to time builds with (None: q's print_hours held constant)
+    and support resin per part (None: q's).
+    """
+    copies_per_build: Optional[int] = None
+    profile: Optional[LayerProfile] = None
+    support_volume_ml: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class PriceBreakTable:
+    """
+    Price breaks for one part: one row per (printer, resin) combination, one column per qty.
+    sell_price / price_per_part are rounded like compute_quote (2 decimals).
+    """
+    quote_id: str
+    currency: str
+    quantities: Tuple[int, ...]
+    combos: Tuple[Tuple[str, str], ...]
+    unit_discount_pct: Tuple[float, ...]
+    sell_price: np.ndarray  # (len(combos), len(quantities))
+    price_per_part: np.ndarray
+    print_hours: np.ndarray  # per build, as charged
+    builds: np.ndarray
+    # per combo: print hours timed from the STL for that printer and qty, else q's held constant
+    hours_estimated: Tuple[bool, ...]
+
+    def __len__(self) -> int:
+        return self.sell_price.size
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """One flat record per grid cell."""
+        out: List[Dict[str, Any]] = []
+        sell = self.sell_price.tolist()
+        ppp = self.price_per_part.tolist()
+        hours = self.print_hours.tolist()
+        builds = self.builds.tolist()
+        for i, (printer, resin) in enumerate(self.combos):
+            for j, qty in enumerate(self.quantities):
+                out.append(
+                    {
+                        "printer": printer,
+                        "resin": resin,
+                        "qty": qty,
+                        "unit_discount_pct": self.unit_discount_pct[j],
+                        "sell_price": sell[i][j],
+                        "price_per_part": ppp[i][j],
+                        "print_hours": hours[i][j],
+                        "builds": builds[i][j],
+                    }
+                )
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "quote_id": self.quote_id,
+            "currency": self.currency,
+            "quantities": list(self.quantities),
+            "unit_discount_pct": list(self.unit_discount_pct),
+            "rows": [
+                {
+                    "printer": printer,
+                    "resin": resin,
+                    "sell_price": self.sell_price[i].tolist(),
+                    "price_per_part": self.price_per_part[i].tolist(),
+                    "print_hours": self.print_hours[i].tolist(),
+                    "print_hours_estimated": self.hours_estimated[i],
+                    "builds": self.builds[i].tolist(),
+                }
+                for i, (printer, resin) in enumerate(self.combos)
+            ],
+        }
+
+
+def sweep_combos(
+    cfg: ConfigLike,
+    printers: Optional[Sequence[str]] = None,
+    resins: Optional[Sequence[str]] = None,
+) -> List[Tuple[str, str]]:
+    """(printer, resin) pairs allowed by printers.<name>.materials, optionally filtered."""
+    cc = ensure_compiled(cfg)
+    names = list(printers) if printers else list(cc.printers)
+    combos: List[Tuple[str, str]] = []
+    for name in names:
+        spec = cc.printer(name)
+        for resin in spec.materials:
+            if resins and resin not in resins:
+                continue
+            cc.resin(resin)  # fail early on a material without resin pricing
+            combos.append((name, resin))
+    if not combos:
+        raise ValueError("No printer/resin combinations to sweep (check printers.<name>.materials).")
+    return combos
+
+
+def sweep_quote(
+    q: QuoteInput,
+    cfg: ConfigLike,
+    quantities: Sequence[int] = DEFAULT_SWEEP_QTYS,
+    printers: Optional[Sequence[str]] = None,
+    resins: Optional[Sequence[str]] = None,
+    copies_per_build: Optional[int] = None,
+    placements: Optional[Mapping[str, PrinterPlacement]] = None,
+) -> PriceBreakTable:
+    """
+    Price `q` for every qty x compatible printer/resin in one vectorized pass.
+    Everything except printer, resin and qty (volume, supports, print hours, options,
+    outside services) is taken from `q`, so its print hours are held constant across printers
+    and quantities. With copies_per_build (from nesting), each qty is charged
+    ceil(qty / copies_per_build) builds; otherwise q.process.builds for all.
+    placements (api.sweep_cad_quote, from the STL) override these per printer: builds from that
+    printer's nesting, print hours from its print_time model for each qty, and its supports.
+    """
+    cc: CompiledConfig = ensure_compiled(cfg)
+    qtys = tuple(int(n) for n in quantities)
+    if not qtys or min(qtys) < 1:
+        raise ValueError("Sweep quantities must be >= 1.")
+    combos = sweep_combos(cc, printers, resins)
+    placements = placements or {}
+
+    n_combo, n_qty = len(combos), len(qtys)
+    qty_arr = np.asarray(qtys, dtype=np.int64)
+    builds = np.empty((n_combo, n_qty), dtype=np.int64)
+    hours = np.empty((n_combo, n_qty))
+    supports = np.empty(n_combo)
+    estimated: List[bool] = []
+    for i, (printer, _) in enumerate(combos):
+        placed = placements.get(printer)
+        per_build = copies_per_build if placed is None else placed.copies_per_build
+        placed = placed or PrinterPlacement()
+        builds[i] = -(-qty_arr // int(per_build)) if per_build else (q.process.builds or 1)
+        if placed.profile is not None:
+            spec = cc.printer(printer).print_time
+            # as price_quote: qty copies in that many builds, charged per build
+            hours[i] = [
+                max(round(estimate_print_hours(placed.profile, spec, n, b) / b, 2), 0.01)
+                for n, b in zip(qtys, builds[i].tolist())
+            ]
+        elif q.process.print_hours is None:
+            raise ValueError(
+                f"print_hours is required for a sweep on {printer} (give print_hours, or the STL "
+                "and a print_time model for the printer)."
+            )
+        else:
+            hours[i] = q.process.print_hours
+        estimated.append(placed.profile is not None)
+        support = placed.support_volume_ml if placed.support_volume_ml is not None else q.process.support_volume_ml
+        supports[i] = support or 0.0
+    n = n_combo * n_qty
+    combo_printers = [p for p, _ in combos]
+    combo_resins = [r for _, r in combos]
+
+    outside = 0.0
+    for svc in q.outside_services:
+        outside += float(svc.vendor_cost) * (1.0 + float(svc.markup_pct))
+
+    cols: Dict[str, Any] = {
+        "quote_id": [q.quote_id] * n,
+        "printer": [p for p in combo_printers for _ in qtys],
+        "resin": [r for r in combo_resins for _ in qtys],
+        "part_volume_ml": np.full(n, q.process.part_volume_ml),
+        "support_volume_ml": np.repeat(supports, n_qty),
+        "qty": np.tile(qty_arr, n_combo),
+        "print_hours": hours.ravel(),
+        "builds": builds.ravel(),
+        "expedite_multiplier": np.full(n, q.options.expedite_multiplier),
+        "outside_services": np.full(n, outside),
+    }
+    for flag, _, _ in _LABOR_STEPS:
+        cols[flag] = np.full(n, getattr(q.options, flag), dtype=bool)
+
+    batch = compute_quotes_batch(cols, cc)
+
+    # Python round() per cell so every number matches compute_quote exactly
+    sell = np.array([round(v, 2) for v in batch.sell_price.tolist()]).reshape(n_combo, n_qty)
+    ppp = np.array([round(v, 2) for v in batch.price_per_part.tolist()]).reshape(n_combo, n_qty)
+    return PriceBreakTable(
+        quote_id=q.quote_id,
+        currency=cc.currency,
+        quantities=qtys,
+        combos=tuple(combos),
+        unit_discount_pct=tuple(round(v, 4) for v in batch.unit_discount_pct[:n_qty].tolist()),
+        sell_price=sell,
+        price_per_part=ppp,
+        print_hours=hours,
+        builds=builds,
+        hours_estimated=tuple(estimated),
+    )
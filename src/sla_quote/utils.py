@@ -1,14 +1,31 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
-import yaml
+
+# CAD files above this are refused by the CLI, server and watch folder (SLA_QUOTE_MAX_CAD_MB)
+DEFAULT_MAX_CAD_MB = 10.0
 
 def load_config(path: str | Path) -> dict:
     path = Path(path)
     if not path.exists():
         raise FileNotFoundError(f"Config not found: {path}")
-    with path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    return parse_config(path.read_bytes())
+
+def parse_config(text: str | bytes) -> dict:
+    import yaml
+
+    data = yaml.safe_load(text)
     if not isinstance(data, dict):
         raise ValueError("Config must be a YAML mapping at the top level.")
     return data
+
+def max_cad_bytes() -> int:
+    """CAD size limit for this deployment: SLA_QUOTE_MAX_CAD_MB (default 10)."""
+    mb = float(os.environ.get("SLA_QUOTE_MAX_CAD_MB", DEFAULT_MAX_CAD_MB))
+    if mb <= 0:
+        raise ValueError(f"SLA_QUOTE_MAX_CAD_MB must be positive, got {mb:g}.")
+    return int(mb * 1024 * 1024)
+
+def too_large_message(size: int, max_bytes: int) -> str:
+    return f"File too large: {size/1024/1024:.2f} MB. Max is {max_bytes/1024/1024:g} MB."
@@ -0,0 +1,316 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import shutil
+import signal
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from .config import load_compiled_config
+from .model import QuoteInput
+from .utils import max_cad_bytes as configured_max_cad_bytes, too_large_message
+from .workers import QuoteJob, QuotePool, run_quote_job
+
+CAD_EXTS = {".sldprt", ".igs", ".iges", ".x_t", ".step", ".stp", ".stl"}
+# partial downloads / editor temp files that must never be picked up
+_TEMP_SUFFIXES = (".tmp", ".part", ".partial", ".crdownload", ".swp")
+
+
+def _is_candidate(name: str) -> bool:
+    return not name.startswith(".") and not name.lower().endswith(_TEMP_SUFFIXES)
+
+
+def _move(src: Path, dest_dir: Path) -> Path:
+    """Move src into dest_dir, keeping an earlier file of the same name."""
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    dest = dest_dir / src.name
+    n = 1
+    while dest.exists():
+        dest = dest_dir / f"{src.stem}.{time.strftime('%Y%m%dT%H%M%S')}-{n}{src.suffix}"
+        n += 1
+    os.replace(src, dest)
+    return dest
+
+
+class QuoteFolderWatcher:
+    """
+    Quotes request files dropped into `inbox` with a warm worker pool.
+
+    <name>.json is a quote input; an optional CAD file with the same stem (<name>.stl, ...)
+    is quoted with it, so drop the CAD file first or together with the JSON. A file is
+    picked up once it has not changed for `settle` seconds. Artifacts are rendered into a
+    staging directory and moved into `out_dir` only when complete; the inputs then go to
+    <inbox>/done, or to <inbox>/failed next to a <name>.error.txt.
+
+    The config is re-read when its mtime changes. While it does not load, inputs stay
+    queued in the inbox instead of failing.
+    """
+
+    def __init__(
+        self,
+        inbox: str | Path,
+        config_path: str | Path,
+        out_dir: str | Path | None = None,
+        pool: Optional[QuotePool] = None,
+        settle: float = 0.5,
+        poll_interval: float = 1.0,
+        use_notify: bool = True,
+        log: Callable[[str], None] = print,
+        max_cad_bytes: Optional[int] = None,
+    ) -> None:
+        self.inbox = Path(inbox)
+        self.config_path = Path(config_path).resolve()
+        self.out_dir = Path(out_dir) if out_dir else self.inbox / "out"
+        self.done_dir = self.inbox / "done"
+        self.failed_dir = self.inbox / "failed"
+        self.pool = pool or QuotePool.from_env(preload_configs=[str(self.config_path)])
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.use_notify = use_notify
+        self.log = log
+        self.max_cad_bytes = max_cad_bytes or configured_max_cad_bytes()
+        self.processed = 0
+        self.failed = 0
+        self._active: Dict[str, asyncio.Task] = {}
+        self._ambiguous: Dict[str, str] = {}
+        self._config_mtime: Optional[int] = None
+        self._config_ok = False
+        self._kick: Optional[asyncio.Event] = None
+
+    # -- config -----------------------------------------------------------------
+
+    def check_config(self) -> bool:
+        """Re-validate the config if it changed; False while it is missing or broken."""
+        try:
+            mtime = self.config_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            if self._config_ok or self._config_mtime is None:
+                self.log(f"Config not found: {self.config_path} (inputs stay queued)")
+            self._config_mtime, self._config_ok = -1, False
+            return False
+        if mtime == self._config_mtime:
+            return self._config_ok
+        first = self._config_mtime is None
+        self._config_mtime = mtime
+        try:
+            load_compiled_config(self.config_path)
+        except Exception as e:
+            self._config_ok = False
+            self.log(f"Config error, inputs stay queued until it is fixed: {e}")
+            return False
+        self._config_ok = True
+        if not first:
+            self.log(f"Config reloaded: {self.config_path}")
+        return True
+
+    # -- discovery --------------------------------------------------------------
+
+    def _settled(self, st: os.stat_result, now: float, settle: float) -> bool:
+        return now - st.st_mtime >= settle
+
+    def ready_inputs(self, settle: Optional[float] = None) -> List[Tuple[Path, Optional[Path]]]:
+        """(request JSON, CAD file or None) for every settled request not already in progress."""
+        settle = self.settle if settle is None else settle
+        now = time.time()
+        requests: Dict[str, Tuple[Path, os.stat_result]] = {}
+        cad: Dict[str, List[Tuple[Path, os.stat_result]]] = {}
+        with os.scandir(self.inbox) as it:
+            for entry in it:
+                if not entry.is_file() or not _is_candidate(entry.name):
+                    continue
+                path = Path(entry.path)
+                ext = path.suffix.lower()
+                if ext == ".json":
+                    requests[path.stem] = (path, entry.stat())
+                elif ext in CAD_EXTS:
+                    cad.setdefault(path.stem, []).append((path, entry.stat()))
+
+        ready = []
+        for stem, (path, st) in sorted(requests.items(), key=lambda kv: kv[1][1].st_mtime):
+            if path.name in self._active:
+                continue
+            parts = cad.get(stem, [])
+            if not all(self._settled(s, now, settle) for _, s in [(path, st), *parts]):
+                continue
+            if len(parts) > 1:
+                names = ", ".join(sorted(p.name for p, _ in parts))
+                ready.append((path, None))
+                self._ambiguous[path.name] = f"More than one CAD file for {path.name}: {names}"
+                continue
+            ready.append((path, parts[0][0] if parts else None))
+        return ready
+
+    # -- processing -------------------------------------------------------------
+
+    def _job(self, request: Path, cad: Optional[Path], staging: Path) -> QuoteJob:
+        if request.name in self._ambiguous:
+            raise ValueError(self._ambiguous.pop(request.name))
+        with request.open("r", encoding="utf-8") as f:
+            q = QuoteInput.model_validate(json.load(f))
+        if cad is not None:
+            size = cad.stat().st_size
+            if size > self.max_cad_bytes:
+                raise ValueError(too_large_message(size, self.max_cad_bytes))
+        # the worker reads the CAD file in place; it is only moved once the quote is done
+        return QuoteJob(
+            quote=q,
+            config_path=str(self.config_path),
+            out_dir=str(staging),
+            cad_name=cad.name if cad else None,
+            cad_path=str(cad) if cad else None,
+        )
+
+    def _publish(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Move the staged artifacts into out_dir (one atomic rename each)."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        for key in ("artifact_pdf", "artifact_xlsx", "artifact_json"):
+            if result.get(key):
+                src = Path(result[key])
+                dest = self.out_dir / src.name
+                os.replace(src, dest)
+                result[key] = str(dest)
+        return result
+
+    async def process(self, request: Path, cad: Optional[Path]) -> bool:
+        """Quote one request; True on success. Never raises for a bad input."""
+        t0 = time.perf_counter()
+        (self.out_dir / ".staging").mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=f"{request.stem}-", dir=self.out_dir / ".staging"))
+        inputs = [p for p in (request, cad) if p is not None]
+        try:
+            job = self._job(request, cad, staging)
+            result = self._publish(await self.pool.run(run_quote_job, job))
+        except Exception as e:
+            self.failed += 1
+            for p in inputs:
+                if p.exists():
+                    _move(p, self.failed_dir)
+            note = self.failed_dir / f"{request.stem}.error.txt"
+            note.write_text(f"{type(e).__name__}: {e}\n", encoding="utf-8")
+            self.log(f"FAILED {request.name}: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+            return False
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self.processed += 1
+        for p in inputs:
+            if p.exists():
+                _move(p, self.done_dir)
+        self.log(
+            f"OK {request.name} -> {Path(result['artifact_json']).name} "
+            f"{result['currency']} {result['sell_price']:,.2f} ({time.perf_counter() - t0:.2f}s)"
+        )
+        return True
+
+    def _capacity(self) -> int:
+        return self.pool.workers + self.pool.max_queue - len(self._active)
+
+    def submit_ready(self, settle: Optional[float] = None) -> int:
+        """Start tasks for settled requests, up to what the pool will accept."""
+        if not self.check_config():
+            return 0
+        started = 0
+        for request, cad in self.ready_inputs(settle):
+            if self._capacity() <= 0:
+                break
+            task = asyncio.ensure_future(self.process(request, cad))
+            self._active[request.name] = task
+            task.add_done_callback(lambda _, name=request.name: self._finished(name))
+            started += 1
+        return started
+
+    def _finished(self, name: str) -> None:
+        self._active.pop(name, None)
+        if self._kick is not None:
+            self._kick.set()  # capacity freed: look at the inbox again
+
+    # -- loops ------------------------------------------------------------------
+
+    async def _wakeups(self, stop: asyncio.Event) -> AsyncIterator[None]:
+        """Yield on inbox changes (inotify/FSEvents via watchfiles) and at least every poll_interval."""
+        tick_ms = int(self.poll_interval * 1000)
+        if self.use_notify:
+            try:
+                from watchfiles import awatch
+            except ImportError:
+                self.log("watchfiles not installed; polling the inbox")
+            else:
+                async for _ in awatch(
+                    self.inbox,
+                    stop_event=stop,
+                    recursive=False,
+                    debounce=min(200, tick_ms),
+                    rust_timeout=tick_ms,
+                    yield_on_timeout=True,
+                ):
+                    yield
+                return
+        while not stop.is_set():
+            try:
+                await asyncio.wait_for(stop.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            yield
+
+    async def _pump(self, stop: asyncio.Event, kick: asyncio.Event) -> None:
+        try:
+            async for _ in self._wakeups(stop):
+                kick.set()
+        finally:
+            kick.set()  # let run() see the stop
+
+    async def run(self, stop: Optional[asyncio.Event] = None, once: bool = False) -> None:
+        """
+        Watch until `stop` is set, then finish the quotes in progress.
+        once=True quotes what is in the inbox now (no settle delay) and returns.
+        """
+        self.inbox.mkdir(parents=True, exist_ok=True)
+        await self.pool.warm()
+
+        if once:
+            self.check_config()
+            while True:
+                self.submit_ready(settle=0.0)
+                if not self._active:
+                    return
+                await asyncio.wait(list(self._active.values()), return_when=asyncio.FIRST_COMPLETED)
+
+        stop = stop or asyncio.Event()
+        kick = self._kick = asyncio.Event()
+        pump = asyncio.ensure_future(self._pump(stop, kick))
+        try:
+            kick.set()  # pick up whatever is already waiting
+            while True:
+                await kick.wait()
+                kick.clear()
+                if stop.is_set():
+                    break
+                self.submit_ready()
+        finally:
+            stop.set()
+            await pump
+            if self._active:
+                await asyncio.wait(list(self._active.values()))
+            self._kick = None
+
+
+def watch_folder(watcher: QuoteFolderWatcher, once: bool = False) -> None:
+    """Run a watcher until SIGINT/SIGTERM (or, with once=True, until the inbox is empty)."""
+
+    async def main() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # not available on this platform / thread; Ctrl-C still interrupts
+        await watcher.run(stop, once=once)
+
+    try:
+        asyncio.run(main())
+    finally:
+        watcher.pool.shutdown()
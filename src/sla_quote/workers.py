@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, Sequence, Tuple
+
+from .artifacts import ArtifactStore
+from .config import CompiledConfig, load_compiled_config
+from .geometry_cache import GeometryCache
+from .journal import QuoteJournal
+from .metrics import NO_TIMINGS, Timings
+from .model import QuoteInput
+from .result_cache import ResultCache
+
+# Per-process state. In process mode every worker has its own copy, filled by _init_worker.
+_configs: Dict[str, Tuple[int, CompiledConfig]] = {}
+_configs_lock = threading.Lock()
+_geometry_cache: Optional[GeometryCache] = None
+_journal: Optional[QuoteJournal] = None
+_result_cache: Optional[ResultCache] = None
+_artifact_stores: Dict[Optional[str], ArtifactStore] = {}
+
+
+class PoolSaturated(RuntimeError):
+    """Raised by QuotePool.run when every worker is busy and the wait queue is full."""
+
+
+@dataclass(frozen=True)
+class QuoteJob:
+    """Everything a worker needs to price and render one quote; picklable."""
+    quote: QuoteInput
+    config_path: str
+    out_dir: str
+    cad_name: Optional[str] = None
+    cad_bytes: Optional[bytes | bytearray] = None
+    # content in a file instead of cad_bytes (large uploads); cad_name stays the reported name
+    cad_path: Optional[str] = None
+    # lazy: price only and persist to the ArtifactStore at store_dir; render on first GET
+    lazy: bool = False
+    store_dir: Optional[str] = None
+    # add per-stage wall times to the result as "timings"
+    timings: bool = False
+    # the caller's compiled config (the server's ConfigRegistry); when set, config_path is never read
+    config: Optional[CompiledConfig] = None
+
+
+def worker_config(config_path: str | Path) -> CompiledConfig:
+    """Compiled config for this process, re-read only when the file's mtime changes."""
+    key = str(Path(config_path).resolve())
+    mtime = Path(key).stat().st_mtime_ns
+    with _configs_lock:
+        cached = _configs.get(key)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+    cc = load_compiled_config(key)
+    with _configs_lock:
+        _configs[key] = (mtime, cc)
+    return cc
+
+
+def _worker_geometry_cache() -> Optional[GeometryCache]:
+    global _geometry_cache
+    if _geometry_cache is None and os.environ.get("SLA_QUOTE_GEOMETRY_CACHE", "1") != "0":
+        _geometry_cache = GeometryCache()
+    return _geometry_cache
+
+
+def _worker_result_cache() -> Optional[ResultCache]:
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache.from_env()
+    return _result_cache
+
+
+def _worker_journal() -> QuoteJournal:
+    global _journal
+    if _journal is None:
+        _journal = QuoteJournal()
+    return _journal
+
+
+def _worker_artifact_store(store_dir: Optional[str]) -> ArtifactStore:
+    # one per store so its SQLite index stays open across jobs
+    store = _artifact_stores.get(store_dir)
+    if store is None:
+        store = _artifact_stores.setdefault(store_dir, ArtifactStore(store_dir))
+    return store
+
+
+def _init_worker(config_paths: Sequence[str]) -> None:
+    # Pay imports and config parsing once per worker instead of on the first request.
+    import openpyxl  # noqa: F401
+    import reportlab.pdfgen.canvas  # noqa: F401
+    import trimesh  # noqa: F401
+
+    for path in config_paths:
+        try:
+            worker_config(path)
+        except Exception:  # missing or broken: only the jobs that use it fail, not the worker
+            pass
+    _worker_geometry_cache()
+
+
+def _init_process_worker(config_paths: Sequence[str]) -> None:
+    # Ctrl-C reaches the whole process group; the parent decides how to wind down the pool.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _init_worker(config_paths)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _job_cad_content(job: QuoteJob) -> Optional[bytes | bytearray | Path]:
+    return Path(job.cad_path) if job.cad_path else job.cad_bytes
+
+
+def _job_config(job: QuoteJob) -> CompiledConfig:
+    return job.config if job.config is not None else worker_config(job.config_path)
+
+
+def run_quote_job(job: QuoteJob) -> Dict[str, Any]:
+    from .api import generate_quote_from_dict, price_quote, result_to_dict, write_result_json
+
+    timings = Timings() if job.timings else None
+    t = timings or NO_TIMINGS
+
+    if job.lazy:
+        cfg = _job_config(job)
+        q, r, cad_meta = price_quote(
+            job.quote,
+            cfg,
+            cad_file=Path(job.cad_name) if job.cad_name else None,
+            geometry_cache=_worker_geometry_cache(),
+            cad_bytes=_job_cad_content(job),
+            timings=t,
+        )
+        result = result_to_dict(r, cad_meta)
+        with t.stage("store"):
+            _worker_artifact_store(job.store_dir).save(q, result)
+        with t.stage("journal"):
+            _worker_journal().record(q, result, cfg.digest)
+        if timings is not None:
+            result["timings"] = timings.to_dict()
+        return result
+
+    result, pdf_path, xlsx_path = generate_quote_from_dict(
+        input_data=job.quote,
+        cfg=_job_config(job),
+        cad_file=Path(job.cad_name) if job.cad_name else None,
+        out_dir=job.out_dir,
+        geometry_cache=_worker_geometry_cache(),
+        cad_bytes=_job_cad_content(job),
+        journal=_worker_journal(),
+        timings=timings,
+        result_cache=_worker_result_cache(),
+    )
+    with t.stage("write_json"):
+        result = write_result_json(result, pdf_path, xlsx_path, job.out_dir)
+    if timings is not None:
+        result["timings"] = timings.to_dict()
+    return result
+
+
+def render_stored_artifact(store_dir: Optional[str], quote_id: str, kind: str) -> str:
+    return str(_worker_artifact_store(store_dir).artifact(quote_id, kind))
+
+
+class QuotePool:
+    """
+    Bounded executor for CPU-bound quote work (geometry, PDF/XLSX rendering).
+
+    At most `workers` jobs run at once and at most `max_queue` more may wait; beyond
+    that run() raises PoolSaturated so callers can shed load (the server answers 503).
+    run(..., wait=True) instead waits, without polling, until a finishing job frees a place.
+    """
+
+    def __init__(
+        self,
+        kind: str = "process",
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        preload_configs: Sequence[str] = (),
+    ) -> None:
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown executor kind: {kind} (expected 'process' or 'thread')")
+        self.kind = kind
+        self.workers = int(workers or min(4, os.cpu_count() or 1))
+        self.max_queue = int(self.workers * 2 if max_queue is None else max_queue)
+        self.in_flight = 0
+        self.rejected = 0
+        self._preload = tuple(str(p) for p in preload_configs)
+        self._lock = threading.Lock()
+        self._waiters: Deque[asyncio.Future] = deque()  # run(wait=True) callers, oldest first
+        self._executor = self._new_executor()
+
+    def _new_executor(self) -> Executor:
+        if self.kind == "process":
+            return ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_process_worker,
+                initargs=(self._preload,),
+            )
+        _init_worker(self._preload)
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sla-quote")
+
+    @classmethod
+    def from_env(
+        cls, preload_configs: Sequence[str] = (), kind: Optional[str] = None, workers: Optional[int] = None
+    ) -> "QuotePool":
+        """SLA_QUOTE_EXECUTOR (process|thread), SLA_QUOTE_WORKERS, SLA_QUOTE_MAX_QUEUE; arguments win."""
+        env_workers = os.environ.get("SLA_QUOTE_WORKERS")
+        max_queue = os.environ.get("SLA_QUOTE_MAX_QUEUE")
+        return cls(
+            kind=kind or os.environ.get("SLA_QUOTE_EXECUTOR", "process"),
+            workers=workers or (int(env_workers) if env_workers else None),
+            max_queue=int(max_queue) if max_queue else None,
+            preload_configs=preload_configs,
+        )
+
+    async def warm(self) -> None:
+        """Start every worker process now so the first requests don't pay spawn + imports."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)))
+
+    def _admit(self) -> None:
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise PoolSaturated(f"All {self.workers} quote workers busy and {self.max_queue} requests queued.")
+            self.in_flight += 1
+
+    async def _admit_when_free(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if self.in_flight < self.workers + self.max_queue:
+                    self.in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._waiters.append(waiter)
+            await waiter
+
+    def _release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        self._wake_next()
+
+    def _wake_next(self) -> None:
+        """Hand a freed place to the oldest waiter still waiting, on its own event loop."""
+        while True:
+            with self._lock:
+                if not self._waiters:
+                    return
+                waiter = self._waiters.popleft()
+            try:
+                waiter.get_loop().call_soon_threadsafe(self._wake, waiter)
+                return
+            except RuntimeError:
+                continue  # its loop has closed
+
+    def _wake(self, waiter: asyncio.Future) -> None:
+        if waiter.done():  # cancelled while the wake-up was on its way: pass the place on
+            self._wake_next()
+        else:
+            waiter.set_result(None)
+
+    async def run(self, fn: Callable[..., Any], *args: Any, wait: bool = False) -> Any:
+        if wait:
+            await self._admit_when_free()
+        else:
+            self._admit()
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge mesh); replace the pool so later requests still work.
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = self._new_executor()
+            executor.shutdown(wait=False)
+            raise
+        finally:
+            self._release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
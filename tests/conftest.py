@@ -0,0 +1,75 @@
+import sys
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+import pytest
+
+from sla_quote.geometry import STL_FACET_DTYPE
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+CONFIG_PATH = REPO_ROOT / "config" / "default.example.yaml"
+INPUT_PATH = REPO_ROOT / "examples" / "input_form4_basic.json"
+
+
+def box_triangles(size=(10.0, 10.0, 10.0), origin=(0.0, 0.0, 0.0)) -> np.ndarray:
+    """Closed, outward-wound box as an (12, 3, 3) triangle array."""
+    sx, sy, sz = size
+    c = np.array(
+        [[0, 0, 0], [sx, 0, 0], [sx, sy, 0], [0, sy, 0], [0, 0, sz], [sx, 0, sz], [sx, sy, sz], [0, sy, sz]],
+        dtype=np.float64,
+    ) + np.asarray(origin, dtype=np.float64)
+    faces = [
+        (0, 2, 1), (0, 3, 2),  # bottom
+        (4, 5, 6), (4, 6, 7),  # top
+        (0, 1, 5), (0, 5, 4),  # front
+        (1, 2, 6), (1, 6, 5),  # right
+        (2, 3, 7), (2, 7, 6),  # back
+        (3, 0, 4), (3, 4, 7),  # left
+    ]
+    return c[np.array(faces)]
+
+
+def write_binary_stl(path: Path, triangles: np.ndarray) -> Path:
+    facets = np.zeros(len(triangles), dtype=STL_FACET_DTYPE)
+    facets["vertices"] = triangles
+    with Path(path).open("wb") as f:
+        f.write(b"\0" * 80)
+        f.write(np.uint32(len(triangles)).tobytes())
+        f.write(facets.tobytes())
+    return Path(path)
+
+
+@pytest.fixture
+def binary_stl(tmp_path: Path) -> Callable[..., Path]:
+    def make(triangles: np.ndarray, name: str = "part.stl") -> Path:
+        return write_binary_stl(tmp_path / name, triangles)
+
+    return make
+
+
+def _reset_process_state() -> None:
+    from sla_quote import workers
+
+    if workers._journal is not None:
+        workers._journal.close()
+    workers._journal = workers._geometry_cache = workers._result_cache = None
+    server = sys.modules.get("sla_quote.server")
+    if server is not None:
+        if server._pool is not None:
+            server._pool.shutdown(wait=False)
+        if server._registry is not None:
+            server._registry.stop()
+        server._pool = server._registry = server._jobs = None
+
+
+@pytest.fixture
+def server_env(tmp_path: Path, monkeypatch) -> Iterator[None]:
+    """Thread workers, no caches and a journal in tmp_path; server and worker globals start and end empty."""
+    monkeypatch.setenv("SLA_QUOTE_EXECUTOR", "thread")
+    monkeypatch.setenv("SLA_QUOTE_GEOMETRY_CACHE", "0")
+    monkeypatch.setenv("SLA_QUOTE_RESULT_CACHE", "0")
+    monkeypatch.setenv("SLA_QUOTE_JOURNAL", str(tmp_path / "quotes.sqlite"))
+    _reset_process_state()
+    yield
+    _reset_process_state()
@@ -0,0 +1,68 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from sla_quote.api import price_quote, result_to_dict
+from sla_quote.artifacts import ArtifactStore
+from sla_quote.utils import load_config
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _priced(quote_id: str):
+    with (REPO_ROOT / "examples" / "input_form4_basic.json").open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["quote_id"] = quote_id
+    q, r, meta = price_quote(data, load_config(REPO_ROOT / "config" / "default.example.yaml"))
+    return q, result_to_dict(r, meta)
+
+
+def test_lazy_render_on_first_access(tmp_path: Path) -> None:
+    store = ArtifactStore(tmp_path)
+    q, result = _priced("LAZY-1")
+    store.save(q, result)
+    assert not list(tmp_path.glob("*/*.pdf"))
+
+    pdf = store.artifact("LAZY-1", "pdf")
+    assert pdf.read_bytes().startswith(b"%PDF")
+    assert store.artifact("LAZY-1", "pdf") == pdf
+    assert store.load("LAZY-1")[1]["sell_price"] == result["sell_price"]
+
+
+def test_rendered_artifacts_are_evicted_lru(tmp_path: Path) -> None:
+    store = ArtifactStore(tmp_path, max_bytes=1)
+    for qid in ("E-1", "E-2"):
+        store.save(*_priced(qid))
+
+    store.artifact("E-1", "pdf")
+    store.artifact("E-2", "pdf")
+
+    assert [p.name for p in tmp_path.glob("*/*.pdf")] == ["QUOTE-E-2.pdf"]
+    assert (tmp_path / "E-1" / "result.json").exists()
+
+
+def test_eviction_uses_the_index_not_the_store(tmp_path: Path, monkeypatch) -> None:
+    """Sizes and last access come from artifacts.sqlite; reading a file keeps it over older renders."""
+    for qid in ("I-1", "I-2", "I-3"):
+        ArtifactStore(tmp_path).save(*_priced(qid))
+    store = ArtifactStore(tmp_path)
+    size = store.artifact("I-1", "pdf").stat().st_size
+    store.max_bytes = 2 * size + size // 2
+
+    def no_walk(*args, **kwargs):
+        raise AssertionError("eviction walked the store")
+
+    monkeypatch.setattr(Path, "glob", no_walk)
+    store.artifact("I-2", "pdf")
+    store.artifact("I-1", "pdf")  # I-1 is now the most recently used
+    store.artifact("I-3", "pdf")
+
+    assert not (tmp_path / "I-2" / "QUOTE-I-2.pdf").exists()
+    assert (tmp_path / "I-1" / "QUOTE-I-1.pdf").exists() and (tmp_path / "I-3" / "QUOTE-I-3.pdf").exists()
+    store.close()
+
+
+def test_unsafe_quote_ids_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError):
+        ArtifactStore(tmp_path).artifact("../escape", "pdf")
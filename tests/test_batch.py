@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from sla_quote.batch import compute_quotes_batch
+from sla_quote.engine import compute_quote
+from sla_quote.model import QuoteInput
+from sla_quote.utils import load_config
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _base_input() -> dict:
+    with (REPO_ROOT / "examples" / "input_form4_basic.json").open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_batch_matches_golden_values() -> None:
+    """
+    Same case as the golden test (cube STL -> 1.0 mL) priced through the batch path.
+    """
+    cfg = load_config(REPO_ROOT / "config" / "default.example.yaml")
+    data = _base_input()
+    data["process"]["part_volume_ml"] = 1.0
+
+    (r,) = compute_quotes_batch([QuoteInput.model_validate(data)], cfg).results()
+
+    assert r.unit_discount_pct == pytest.approx(0.05, abs=1e-9)
+    assert r.sell_price == pytest.approx(360.38, abs=0.05)
+    assert r.price_per_part == pytest.approx(180.19, abs=0.05)
+    line_items = {li.name: li.cost for li in r.line_items}
+    assert line_items["Material"] == pytest.approx(0.67, abs=0.05)
+    assert line_items["Machine Time"] == pytest.approx(150.00, abs=0.01)
+    assert line_items["Labor"] == pytest.approx(39.00, abs=0.01)
+
+
+def test_batch_identical_to_compute_quote() -> None:
+    cfg = load_config(REPO_ROOT / "config" / "default.example.yaml")
+    quotes = []
+    for i, (printer, resin) in enumerate(
+        [("Form 4", "Grey"), ("Viper Si2", "Accura Xtreme White"), ("Unknown SLA", "Clear")] * 12
+    ):
+        data = _base_input()
+        data["quote_id"] = f"B-{i}"
+        data["process"].update(printer=printer, resin=resin, qty=1 + i * 3, part_volume_ml=3.3 + i)
+        data["options"].update(
+            finishing=bool(i % 2), docs_packet=bool(i % 3), inspection=bool(i % 5), expedite_multiplier=1 + (i % 4) / 4
+        )
+        if i % 4 == 0:
+            data["outside_services"] = [{"description": "Paint", "vendor_cost": 12.5 * i, "markup_pct": 0.15}]
+        quotes.append(QuoteInput.model_validate(data))
+
+    batch = compute_quotes_batch(quotes, cfg).results()
+    assert batch == [compute_quote(q, cfg) for q in quotes]
+
+
+def test_batch_unknown_resin_raises() -> None:
+    cfg = load_config(REPO_ROOT / "config" / "default.example.yaml")
+    data = _base_input()
+    data["process"]["resin"] = "Unobtainium"
+
+    with pytest.raises(KeyError):
+        compute_quotes_batch([QuoteInput.model_validate(data)], cfg)
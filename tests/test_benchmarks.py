@@ -0,0 +1,34 @@
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _run(*args: str) -> subprocess.CompletedProcess:
+    cmd = [sys.executable, "-m", "benchmarks.run", "--case", "engine.compute_quote", "--repeat", "3", "--min-time", "0"]
+    return subprocess.run(cmd + list(args), cwd=REPO_ROOT, capture_output=True, text=True)
+
+
+def test_runner_reports_and_flags_regressions(tmp_path) -> None:
+    out = tmp_path / "bench.json"
+    proc = _run("--output", str(out))
+    assert proc.returncode == 0, proc.stderr
+    (r,) = json.loads(out.read_text(encoding="utf-8"))["results"]
+    assert r["case"] == "engine.compute_quote" and r["runs"] >= 3
+    assert r["min_s"] <= r["p50_s"] <= r["p90_s"] <= r["p99_s"] <= r["max_s"]
+    assert r["peak_rss_mb"] > 0 and r["ops_per_s"] > 0
+
+    # same numbers as the baseline: no regression
+    proc = _run("--baseline", str(out), "--threshold", "100")
+    assert proc.returncode == 0, proc.stderr
+
+    # a baseline 1000x faster than reality fails the run
+    r["p50_s"] /= 1000.0
+    fast = tmp_path / "fast.json"
+    fast.write_text(json.dumps({"results": [r]}), encoding="utf-8")
+    proc = _run("--baseline", str(fast))
+    assert proc.returncode == 1
+    assert "REGRESSION engine.compute_quote" in proc.stderr
+    assert json.loads(proc.stdout)["regressions"][0]["case"] == "engine.compute_quote"
@@ -0,0 +1,89 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from conftest import CONFIG_PATH, INPUT_PATH, box_triangles, write_binary_stl
+from sla_quote import api
+from sla_quote.api import generate_quote_from_dict, price_quote
+from sla_quote.config import load_compiled_config
+from sla_quote.engine import compute_quote
+from sla_quote.geometry import metrics_from_triangles, split_bodies
+from sla_quote.geometry_cache import GeometryCache
+
+
+def _plate(open_box: bool = True) -> np.ndarray:
+    hollow = box_triangles((30.0, 30.0, 30.0))
+    cavity = box_triangles((10.0, 10.0, 10.0), origin=(10.0, 10.0, 10.0))[:, ::-1]  # inward-facing wall
+    small = box_triangles((10.0, 20.0, 5.0), origin=(40.0, 0.0, 0.0))
+    holed = box_triangles((5.0, 5.0, 5.0), origin=(60.0, 0.0, 0.0))[:-1]
+    return np.concatenate([small, cavity] + ([holed] if open_box else []) + [hollow])
+
+
+def _input(**process) -> dict:
+    data = json.loads(INPUT_PATH.read_text(encoding="utf-8"))
+    data["process"].update(process)
+    return data
+
+
+def test_split_bodies_merges_cavities_and_orders_by_volume() -> None:
+    tri = _plate()
+    b = split_bodies(tri)
+    assert [m.triangles for m in b.metrics] == [24, 12, 11]
+    assert [m.volume_ml for m in b.metrics[:2]] == pytest.approx([26.0, 1.0])  # 27 ml box minus its cavity
+    assert b.metrics[0].bounds_in == pytest.approx((30.0 / 25.4,) * 3)
+    assert [m.is_watertight for m in b.metrics] == [True, True, False]
+    assert b.metrics[2].boundary_edges == 3
+    assert b.whole == metrics_from_triangles(tri)
+    assert np.array_equal(b.triangles(tri, 1), tri[:12])
+
+    # many bodies in shuffled triangle order
+    grid = np.concatenate([box_triangles((2.0, 2.0, 2.0 + k % 3), origin=(5.0 * k, 0.0, 0.0)) for k in range(300)])
+    shuffled = grid[np.random.default_rng(0).permutation(len(grid))]
+    many = split_bodies(shuffled)
+    assert len(many.metrics) == 300 and all(m.is_watertight and m.triangles == 12 for m in many.metrics)
+    assert many.metrics[0].volume_ml == pytest.approx(0.016)
+    assert np.bincount(many.labels).tolist() == [12] * 300
+
+
+def test_bodies_modes_price_the_plate(tmp_path: Path) -> None:
+    cfg = load_compiled_config(CONFIG_PATH)
+    stl = write_binary_stl(tmp_path / "plate.stl", _plate(open_box=False))
+    data = _input(print_hours=None, qty=3)
+
+    q, combined, meta = price_quote(data, cfg, cad_file=stl)
+    assert meta["stl_bodies"] == 2 and meta["bodies_mode"] == "combined"
+    assert [b["volume_ml"] for b in meta["bodies"]] == pytest.approx([26.0, 1.0])
+    assert q.process.part_volume_ml == pytest.approx(27.0) and combined.qty == 3
+
+    q, as_qty, meta = price_quote({**data, "process": {**data["process"], "bodies": "as_qty"}}, cfg, cad_file=stl)
+    assert as_qty.qty == q.process.qty == 6 and q.process.part_volume_ml == pytest.approx(13.5)
+
+    data["options"]["docs_packet"] = True
+    separate_input = {**data, "process": {**data["process"], "bodies": "separate"}}
+    q, separate, meta = price_quote(separate_input, cfg, cad_file=stl)
+    assert meta["bodies_mode"] == "separate" and separate.qty == 6
+    one = [compute_quote(q.model_copy(update={"process": q.process.model_copy(update=b["process"])}), cfg)
+           for b in meta["bodies"]]
+    assert meta["bodies"][1]["process"]["part_volume_ml"] == pytest.approx(1.0)
+    # the docs packet is charged once, on the first body
+    docs = cfg.docs_cost_per_job * (1 + cfg.overhead_pct) / (1 - cfg.margin_pct) * (1 - separate.unit_discount_pct)
+    assert separate.sell_price == pytest.approx(one[0].sell_price + one[1].sell_price - docs, abs=0.02)
+    assert meta["bodies"][0]["sell_price"] == one[0].sell_price
+
+    # a geometry cache hit has no body labels; the per-body geometry is re-split and then cached
+    cache = GeometryCache(tmp_path / "geometry.sqlite")
+    for expected_cache in ("miss", "hit"):
+        result, _, _ = generate_quote_from_dict(separate_input, cfg, cad_file=stl, geometry_cache=cache, render=False)
+        assert result["geometry_cache"] == expected_cache
+        assert result["sell_price"] == separate.sell_price
+    cache.close()
+
+
+def test_separate_bodies_are_capped(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(api, "MAX_SEPARATE_BODIES", 2)
+    stl = write_binary_stl(tmp_path / "plate.stl", _plate())
+    data = _input(bodies="separate")
+    with pytest.raises(ValueError, match="3 bodies; pricing them separately is limited to 2"):
+        price_quote(data, load_compiled_config(CONFIG_PATH), cad_file=stl)
@@ -0,0 +1,42 @@
+import json
+import subprocess
+import sys
+
+from conftest import CONFIG_PATH, INPUT_PATH, REPO_ROOT, box_triangles, write_binary_stl
+from sla_quote.api import generate_quote_from_dict
+from sla_quote.cli import main
+from sla_quote.config import load_compiled_config
+
+
+def test_cli_import_defers_heavy_dependencies() -> None:
+    code = (
+        "import sys, sla_quote.cli, sla_quote.api; "
+        "print([m for m in ('numpy', 'trimesh', 'reportlab', 'openpyxl') if m in sys.modules])"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == "[]"
+
+
+def test_json_only_prints_result_and_skips_renderers(tmp_path, capsys) -> None:
+    out = tmp_path / "dist"
+    main([str(INPUT_PATH), "--config", str(CONFIG_PATH), "--out", str(out), "--json-only", "--no-journal"])
+    captured = capsys.readouterr()
+    result = json.loads(captured.out)
+    assert result["sell_price"] > 0
+    assert sorted(p.name for p in out.iterdir()) == [f"QUOTE-{result['quote_id']}.json"]
+    assert "Wrote:" in captured.err
+
+
+def test_cli_writes_the_same_result_as_the_api(tmp_path, capsys) -> None:
+    stl = write_binary_stl(tmp_path / "part.stl", box_triangles((40.0, 30.0, 20.0)))
+    data = json.loads(INPUT_PATH.read_text(encoding="utf-8"))
+    del data["process"]["print_hours"]
+    (tmp_path / "input.json").write_text(json.dumps(data), encoding="utf-8")
+    argv = [str(tmp_path / "input.json"), "--config", str(CONFIG_PATH), "--file", str(stl), "--out", str(tmp_path)]
+    main(argv + ["--json-only", "--no-journal", "--no-geometry-cache"])
+    result = json.loads(capsys.readouterr().out)
+
+    cfg = load_compiled_config(CONFIG_PATH)
+    expected, _, _ = generate_quote_from_dict(data, cfg, stl, tmp_path / "api", render=False)
+    assert result == expected and result["print_hours_estimated"] > 0 and "nesting" in result
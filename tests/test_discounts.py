@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+
+from sla_quote.config import compile_config, ensure_compiled
+from sla_quote.pricing import volume_unit_discount_pct
+from sla_quote.utils import load_config
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_compiled_tiers_match_dict_lookup() -> None:
+    cfg = load_config(REPO_ROOT / "config" / "default.example.yaml")
+    cc = compile_config(cfg)
+
+    for qty in [1, 2, 3, 4, 5, 9, 10, 19, 20, 21, 500]:
+        assert cc.unit_discount_pct(qty) == volume_unit_discount_pct(cfg, qty)
+        assert volume_unit_discount_pct(cc, qty) == volume_unit_discount_pct(cfg, qty)
+
+
+def test_discount_is_clamped_and_unordered_tiers_ok() -> None:
+    cfg = load_config(REPO_ROOT / "config" / "default.example.yaml")
+    cfg["policies"]["volume_discounts"] = [
+        {"min_qty": 50, "unit_discount_pct": 0.35},
+        {"min_qty": 3, "unit_discount_pct": 0.10},
+        {"min_qty": 10, "unit_discount_pct": 0.05},
+    ]
+    cc = compile_config(cfg)
+
+    assert cc.unit_discount_pct(2) == 0.0
+    assert cc.unit_discount_pct(12) == pytest.approx(0.10)
+    assert cc.unit_discount_pct(50) == pytest.approx(0.20)
+
+
+def test_malformed_config_fails_at_compile_time() -> None:
+    cfg = load_config(REPO_ROOT / "config" / "default.example.yaml")
+    cfg["materials"]["resins"]["Grey"]["cost_per_ml"] = "cheap"
+
+    with pytest.raises(ValueError, match="materials.resins.Grey.cost_per_ml"):
+        compile_config(cfg)
+
+
+def test_raw_configs_are_compiled_once_until_edited() -> None:
+    cfg = load_config(REPO_ROOT / "config" / "default.example.yaml")
+    cc = ensure_compiled(cfg)
+    assert ensure_compiled(cfg) is cc
+
+    cfg["policies"]["margin_pct"] = 0.5
+    edited = ensure_compiled(cfg)
+    assert edited is not cc and edited.margin_pct == 0.5 and edited.digest != cc.digest
+    assert ensure_compiled(edited) is edited
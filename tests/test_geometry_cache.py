@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+
+from sla_quote.geometry_cache import GeometryCache
+
+from conftest import box_triangles
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_cache_hits_on_same_content(tmp_path: Path, binary_stl) -> None:
+    cache = GeometryCache(tmp_path / "geo.sqlite")
+    a = binary_stl(box_triangles(), name="a.stl")
+    b = binary_stl(box_triangles(), name="renamed.stl")
+
+    m1, hit1 = cache.stl_metrics(a)
+    m2, hit2 = cache.stl_metrics(b)
+
+    assert (hit1, hit2) == (False, True)
+    assert m1 == m2
+    assert m2.volume_ml == pytest.approx(1.0, rel=1e-6)
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path) -> None:
+    cache = GeometryCache(tmp_path / "geo.sqlite", max_entries=2)
+    cache.put("a", "k", {"v": 1})
+    cache.put("b", "k", {"v": 2})
+    assert cache.get("a", "k") == {"v": 1}
+    cache.put("c", "k", {"v": 3})
+
+    assert cache.get("b", "k") is None
+    assert cache.get("a", "k") == {"v": 1}
+    assert cache.stats()["entries"] == 2
+
+
+def test_cache_counts_rows_only_past_the_cap(tmp_path: Path) -> None:
+    cache = GeometryCache(tmp_path / "geo.sqlite", max_entries=3)
+    counts = []
+    cache._db.set_trace_callback(lambda sql: counts.append(sql) if "COUNT(*)" in sql else None)
+    for key in "abc":
+        cache.put(key, "k", {"v": key})
+    assert counts == []
+
+    cache.put("d", "k", {"v": "d"})
+    assert len(counts) == 1
+    assert cache.get("a", "k") is None
+    assert cache.stats()["entries"] == 3
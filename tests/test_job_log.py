@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+import pytest
+from openpyxl import load_workbook
+
+from sla_quote.api import price_quote
+from sla_quote.render_xlsx import JOB_LOG_COLUMNS, write_job_log
+from sla_quote.utils import load_config
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _priced(quote_id: str):
+    with (REPO_ROOT / "examples" / "input_form4_basic.json").open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["quote_id"] = quote_id
+    q, r, _ = price_quote(data, load_config(REPO_ROOT / "config" / "default.example.yaml"))
+    return q, r
+
+
+def test_job_log_append_keeps_rows_and_formats(tmp_path: Path) -> None:
+    log = tmp_path / "jobs.xlsx"
+    write_job_log(log, [_priced(f"A-{i}") for i in range(3)])
+    write_job_log(log, [_priced("B-0")], append=True)
+
+    ws = load_workbook(log).active
+    rows = list(ws.iter_rows(values_only=True))
+    assert list(rows[0]) == JOB_LOG_COLUMNS
+    assert [row[1] for row in rows[1:]] == ["A-0", "A-1", "A-2", "B-0"]
+
+    assert rows[1][JOB_LOG_COLUMNS.index("Builds")] == 1
+    sell_col = JOB_LOG_COLUMNS.index("Sell Price (pre-tax)") + 1
+    assert ws.cell(row=2, column=sell_col).value == pytest.approx(rows[4][sell_col - 1])
+    assert ws.cell(row=2, column=sell_col).number_format == '"$"#,##0.00'
+
+
+def test_job_log_append_carries_rows_of_older_logs_across(tmp_path: Path) -> None:
+    from openpyxl import Workbook
+
+    old_columns = [c for c in JOB_LOG_COLUMNS if c not in ("Builds", "Support Volume (ml)")]
+    log = tmp_path / "jobs.xlsx"
+    wb = Workbook()
+    wb.active.append(old_columns)
+    wb.active.append([f"v-{c}" for c in old_columns])
+    wb.save(log)
+    write_job_log(log, [_priced("B-0")], append=True)
+
+    rows = list(load_workbook(log).active.iter_rows(values_only=True))
+    assert list(rows[0]) == JOB_LOG_COLUMNS
+    old = dict(zip(JOB_LOG_COLUMNS, rows[1]))
+    assert old["Quote ID"] == "v-Quote ID" and old["Print Hours"] == "v-Print Hours" and old["Labor"] == "v-Labor"
+    assert old["Builds"] is None and old["Support Volume (ml)"] is None
+    assert rows[2][1] == "B-0"
+
+
+def test_job_log_refuses_foreign_workbook(tmp_path: Path) -> None:
+    from openpyxl import Workbook
+
+    other = tmp_path / "other.xlsx"
+    wb = Workbook()
+    wb.active.append(["something", "else"])
+    wb.save(other)
+
+    with pytest.raises(ValueError):
+        write_job_log(other, [_priced("X")], append=True)
@@ -0,0 +1,157 @@
+import json
+import time
+from pathlib import Path
+
+import anyio
+import httpx
+import pytest
+
+from conftest import CONFIG_PATH, INPUT_PATH, box_triangles, write_binary_stl
+from sla_quote.config import load_compiled_config
+from sla_quote.jobs import STALE_AFTER_SECONDS, JobQueue, JobRunner, QueueFull, job_priority
+from sla_quote.model import QuoteInput
+
+
+def _quote(quote_id: str, tier=None, expedite: float = 1.0) -> QuoteInput:
+    data = json.loads(INPUT_PATH.read_text(encoding="utf-8"))
+    data["quote_id"] = quote_id
+    data["customer"]["tier"] = tier
+    data["options"]["expedite_multiplier"] = expedite
+    return QuoteInput.model_validate(data)
+
+
+def test_queue_orders_by_priority_retries_and_survives_restarts(tmp_path: Path) -> None:
+    cfg = load_compiled_config(CONFIG_PATH)
+    path = tmp_path / "jobs.sqlite"
+    queue = JobQueue(path, max_queued=4, max_attempts=2, retry_seconds=0.0)
+
+    quotes = [_quote("routine"), _quote("rush", expedite=1.5), _quote("key", tier="key"), _quote("routine-2")]
+    assert [job_priority(q, cfg) for q in quotes] == [0.0, 5.0, 20.0, 0.0]
+    jobs = [queue.submit(q, "default.example", job_priority(q, cfg), {}, "cad.stl", b"solid") for q in quotes]
+    assert [queue.position(j) for j in jobs] == [2, 1, 0, 3]
+    with pytest.raises(QueueFull, match="4 jobs already queued"):
+        queue.submit(_quote("late"), "default.example", 0.0, {}, "cad.stl", b"solid")
+    assert len(list(queue.spool_dir.iterdir())) == 4
+
+    key = queue.claim()
+    assert (key.quote_id, key.status, key.attempts) == ("key", "running", 1)
+    queue.release(key.id)  # no free worker: back in line, attempt not counted
+    assert queue.claim().attempts == 1
+    assert queue.complete(key.id, {"sell_price": 1.0}).result == {"sell_price": 1.0}
+    assert not Path(key.cad_path).exists()
+
+    rush = queue.claim()
+    assert rush.quote_id == "rush"
+    retried = queue.fail(rush.id, "Quote generation failed: boom", 500, retry=True)
+    assert (retried.status, retried.error_status) == ("queued", 500)
+    assert queue.claim().id == rush.id
+    failed = queue.fail(rush.id, "Quote generation failed: boom", 500, retry=True)
+    assert (failed.status, failed.attempts) == ("failed", 2) and not Path(failed.cad_path).exists()
+
+    # a server that dies mid-job stops heart-beating; its job is queued again
+    routine = queue.claim()
+    assert routine.quote_id == "routine"
+    queue.close()
+    queue = JobQueue(path, max_queued=4, max_attempts=2)
+    assert queue.requeue_stale(now=time.time() + STALE_AFTER_SECONDS + 1) == 1
+    assert queue.get(routine.id).status == "queued"
+    assert queue.counts() == {"queued": 2, "running": 0, "done": 1, "failed": 1}
+    assert queue.purge(now=time.time() + queue.ttl_seconds + 1) == 2
+    queue.close()
+
+
+def test_queue_refuses_sqlite_without_returning(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr("sqlite3.sqlite_version_info", (3, 31, 1))
+    with pytest.raises(RuntimeError, match="SQLite 3.35.0 or later"):
+        JobQueue(tmp_path / "jobs.sqlite")
+
+
+def test_server_runs_submitted_jobs_and_streams_their_status(tmp_path: Path, monkeypatch, server_env) -> None:
+    from sla_quote import server
+
+    runner = JobRunner(
+        JobQueue(tmp_path / "jobs.sqlite"),
+        server._get_pool,
+        lambda name: server._get_registry().get(name),
+        server._finish_result,
+        poll_interval=0.05,
+    )
+    monkeypatch.setattr(server, "_jobs", runner)
+    stl = write_binary_stl(tmp_path / "part.stl", box_triangles((20.0, 20.0, 20.0))).read_bytes()
+    form = {"input_json": INPUT_PATH.read_text(encoding="utf-8"), "out_dir": str(tmp_path / "dist")}
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as c:
+            sync = await c.post("/quote", data=form, files={"cad_file": ("part.stl", stl, "model/stl")})
+            submitted = await c.post("/jobs", data=form, files={"cad_file": ("part.stl", stl, "model/stl")})
+            job_id = submitted.json()["id"]
+            events = await c.get(f"/jobs/{job_id}/events")
+            done = await c.get(f"/jobs/{job_id}")
+            empty = {"cad_file": ("empty.stl", bytes(80) + b"\0\0\0\0", "model/stl")}
+            bad_sync = await c.post("/quote", data=form, files=empty)
+            bad = await c.post("/jobs", data=form, files=empty)
+            failed = [json.loads(x) for x in (await c.get(f"/jobs/{bad.json()['id']}/events")).text.splitlines()]
+            bad_config = await c.post("/jobs", data={**form, "config_name": "nope"})
+            missing = await c.get("/jobs/nope")
+            metrics = await c.get("/metrics")
+        await runner.stop()
+        return sync, submitted, events, done, bad_sync, failed, bad_config, missing, metrics
+
+    sync, submitted, events, done, bad_sync, failed, bad_config, missing, metrics = anyio.run(scenario)
+    runner.queue.close()
+
+    assert submitted.status_code == 202 and submitted.headers["location"] == f"/jobs/{submitted.json()['id']}"
+    assert submitted.json()["status"] == "queued" and submitted.json()["position"] == 0
+    lines = [json.loads(x) for x in events.text.splitlines()]
+    assert lines[0]["status"] in ("queued", "running") and lines[-1]["status"] == "done"
+    assert lines[-1]["quote"]["sell_price"] == sync.json()["quote"]["sell_price"]
+    assert done.json()["status"] == "done" and done.json()["artifacts"]["pdf"].endswith(".pdf")
+    # bad input fails at once, with the same status /quote answers; only unexpected errors are retried
+    assert bad_sync.status_code == 400 and "STL mesh is empty" in bad_sync.json()["detail"]
+    assert (failed[-1]["status"], failed[-1]["error_status"], failed[-1]["attempts"]) == ("failed", 400, 1)
+    assert bad_config.status_code == 400 and "Unknown config" in bad_config.json()["detail"]
+    assert missing.status_code == 404
+    assert 'sla_quote_jobs{status="done"} 1' in metrics.text
+    assert 'sla_quote_job_events_total{event="submitted"}' in metrics.text
+
+
+def test_submitted_job_is_answered_as_queued_even_if_claimed_at_once(tmp_path: Path, monkeypatch, server_env) -> None:
+    """POST /jobs answers with the row as inserted, not one re-read after a runner took it."""
+    from sla_quote import jobs, server
+
+    runner = JobRunner(
+        JobQueue(tmp_path / "jobs.sqlite"),
+        server._get_pool,
+        lambda name: server._get_registry().get(name),
+        server._finish_result,
+    )
+    monkeypatch.setattr(server, "_jobs", runner)
+    other = JobQueue(tmp_path / "jobs.sqlite")  # another server's dispatcher on the same queue
+    inc = jobs.JOB_EVENTS.inc
+
+    def claim_once_inserted(*args, **labels):
+        # submit() counts the job once its row is committed, before it returns
+        if labels == {"event": "submitted"}:
+            other.claim()  # unless this server's own dispatcher got there first
+            assert runner.queue.counts()["queued"] == 0
+        inc(*args, **labels)
+
+    monkeypatch.setattr(jobs.JOB_EVENTS, "inc", claim_once_inserted)
+    form = {"input_json": INPUT_PATH.read_text(encoding="utf-8"), "out_dir": str(tmp_path / "dist")}
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as c:
+            submitted = await c.post("/jobs", data=form)
+            now = await c.get(f"/jobs/{submitted.json()['id']}")
+        await runner.stop()
+        return submitted, now
+
+    submitted, now = anyio.run(scenario)
+    runner.queue.close()
+    other.close()
+
+    body = submitted.json()
+    assert submitted.status_code == 202
+    assert (body["status"], body["position"], body["attempts"]) == ("queued", 0, 0)
+    assert body["quote_id"] == json.loads(form["input_json"])["quote_id"]
+    assert now.json()["status"] != "queued" and "position" not in now.json()
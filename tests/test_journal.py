@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from openpyxl import load_workbook
+
+from sla_quote.api import price_quote, result_to_dict
+from sla_quote.cli import main
+from sla_quote.config import load_compiled_config
+from sla_quote.journal import QuoteJournal
+from sla_quote.render_xlsx import JOB_LOG_COLUMNS
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _record(journal: QuoteJournal, quote_id: str, customer: str, day: int) -> None:
+    with (REPO_ROOT / "examples" / "input_form4_basic.json").open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["quote_id"] = quote_id
+    data["customer"]["name"] = customer
+    cfg = load_compiled_config(REPO_ROOT / "config" / "default.example.yaml")
+    q, r, meta = price_quote(data, cfg)
+    journal.record(q, result_to_dict(r, meta), cfg.digest, created_at=datetime(2024, 3, day, tzinfo=timezone.utc))
+
+
+def test_journal_query_filters_and_export(tmp_path: Path) -> None:
+    journal = QuoteJournal(tmp_path / "quotes.sqlite")
+    _record(journal, "Q-1", "Acme", 1)
+    _record(journal, "Q-2", "Globex", 2)
+    _record(journal, "Q-3", "acme", 3)
+
+    assert [r["quote_id"] for r in journal.query(customer="ACME")] == ["Q-3", "Q-1"]
+    assert [r["quote_id"] for r in journal.query(since="2024-03-02", until="2024-03-03")] == ["Q-2"]
+
+    (row,) = journal.query(quote_id="Q-2", full=True)
+    assert row["input"]["customer"]["name"] == "Globex"
+    assert row["result"]["sell_price"] == row["sell_price"]
+    assert len(row["config_hash"]) == 64
+
+    buf = io.StringIO()
+    assert journal.export(buf, "csv", limit=None) == 3
+    assert [r["quote_id"] for r in csv.DictReader(io.StringIO(buf.getvalue()))] == ["Q-3", "Q-2", "Q-1"]
+    # a limit keeps the newest rows even when they come back oldest first (the xlsx job log)
+    assert [r["quote_id"] for r in journal.query(limit=2, oldest_first=True)] == ["Q-2", "Q-3"]
+    journal.close()
+
+
+def test_cli_records_and_lists_history(tmp_path: Path, capsys) -> None:
+    journal = tmp_path / "journal.sqlite"
+    main([
+        str(REPO_ROOT / "examples" / "input_form4_basic.json"),
+        "--config", str(REPO_ROOT / "config" / "default.example.yaml"),
+        "--out", str(tmp_path),
+        "--journal", str(journal),
+    ])
+    capsys.readouterr()
+
+    main(["history", "--journal", str(journal), "list", "--json"])
+    rows = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert len(rows) == 1
+    assert json.loads((tmp_path / f"QUOTE-{rows[0]['quote_id']}.json").read_text())["sell_price"] == rows[0]["sell_price"]
+
+    # the job log in one pass from the journal
+    main(["history", "--journal", str(journal), "export", "--format", "xlsx", "--output", str(tmp_path / "log.xlsx")])
+    logged = list(load_workbook(tmp_path / "log.xlsx").active.iter_rows(values_only=True))
+    assert len(logged) == 2 and logged[1][0] == rows[0]["created_at"]
+    assert logged[1][JOB_LOG_COLUMNS.index("Sell Price (pre-tax)")] == rows[0]["sell_price"]
+
+
+def test_cli_history_reads_the_journal_quotes_record_into_by_default(tmp_path: Path, monkeypatch, capsys) -> None:
+    monkeypatch.delenv("SLA_QUOTE_JOURNAL", raising=False)
+    monkeypatch.chdir(tmp_path)
+    main([
+        str(REPO_ROOT / "examples" / "input_form4_basic.json"),
+        "--config", str(REPO_ROOT / "config" / "default.example.yaml"),
+        "--out", "elsewhere",
+        "--json-only",
+    ])
+    capsys.readouterr()
+
+    main(["history", "list", "--json"])
+    assert len(capsys.readouterr().out.splitlines()) == 1
+    assert (tmp_path / "dist" / "quotes.sqlite").exists() and not (tmp_path / "elsewhere" / "quotes.sqlite").exists()
@@ -0,0 +1,69 @@
+import io
+import json
+
+import anyio
+import httpx
+
+from conftest import CONFIG_PATH, INPUT_PATH, box_triangles, write_binary_stl
+from sla_quote.metrics import NO_TIMINGS, Histogram, Registry, Timings
+
+
+def test_timings_accumulate_and_null_timings_record_nothing() -> None:
+    t = Timings()
+    for _ in range(2):
+        with t.stage("a"):
+            pass
+    t.add("b", 0.5)
+    d = t.to_dict()
+    assert set(d) == {"a", "b", "total"} and d["b"] == 0.5
+    with NO_TIMINGS.stage("a"):
+        pass
+    assert NO_TIMINGS.to_dict() == {}
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    reg = Registry()
+    h = reg.register(Histogram("x_seconds", "Test.", (0.1, 1.0)))
+    for v in (0.05, 0.5, 0.5, 2.0):
+        h.observe(v, stage="s")
+    lines = reg.render().splitlines()
+    assert lines[:2] == ["# HELP x_seconds Test.", "# TYPE x_seconds histogram"]
+    assert 'x_seconds_bucket{stage="s",le="0.1"} 1' in lines
+    assert 'x_seconds_bucket{stage="s",le="1"} 3' in lines
+    assert 'x_seconds_bucket{stage="s",le="+Inf"} 4' in lines
+    assert 'x_seconds_count{stage="s"} 4' in lines
+
+
+def test_server_quote_timings_and_metrics_endpoint(tmp_path, server_env) -> None:
+    from sla_quote.server import app
+
+    stl = write_binary_stl(tmp_path / "part.stl", box_triangles((20.0, 20.0, 20.0))).read_bytes()
+    form = {
+        "input_json": INPUT_PATH.read_text(encoding="utf-8"),
+        "config_name": str(CONFIG_PATH),
+        "out_dir": str(tmp_path / "dist"),
+    }
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            files = {"cad_file": ("part.stl", io.BytesIO(stl), "model/stl")}
+            plain = await client.post("/quote", data=form, files=files)
+            files = {"cad_file": ("part.stl", io.BytesIO(stl), "model/stl")}
+            timed = await client.post("/quote", data={**form, "timings": "true"}, files=files)
+            metrics = await client.get("/metrics")
+        return plain, timed, metrics
+
+    plain, timed, metrics = anyio.run(scenario)
+    assert plain.status_code == 200 and "timings" not in plain.json()["quote"]
+    stages = timed.json()["quote"]["timings"]
+    for stage in ("read_upload", "stl_metrics", "compute_quote", "write_pdf", "write_json", "pool_overhead", "total"):
+        assert stages[stage] >= 0.0, stage
+
+    text = metrics.text
+    assert metrics.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'sla_quote_requests_total{route="/quote",status="200"}' in text
+    assert 'sla_quote_stage_seconds_count{stage="compute_quote"}' in text
+    assert 'sla_quote_mesh_triangles_bucket{le="100"}' in text
+    assert "sla_quote_upload_bytes_sum" in text
+    assert "sla_quote_in_flight_requests 1" in text  # the /metrics request itself
@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from conftest import box_triangles
+from sla_quote.api import price_quote
+from sla_quote.batch import compute_quotes_batch
+from sla_quote.config import load_compiled_config
+from sla_quote.engine import compute_quote
+from sla_quote.model import QuoteInput
+from sla_quote.nesting import footprint, nest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _input() -> dict:
+    with (REPO_ROOT / "examples" / "input_form4_basic.json").open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_nest_counts_copies_and_builds() -> None:
+    cubes = nest(footprint(box_triangles((10.0, 10.0, 10.0))), (254.0, 254.0), qty=500, spacing_mm=3.0)
+    # 13 mm pitch: 19 x 19 on the plate
+    assert cubes.copies_per_build == 361
+    assert cubes.builds == 2
+
+    fp = footprint(box_triangles((60.0, 40.0, 10.0)))
+    assert (fp.width_mm, fp.depth_mm) == pytest.approx((60.0, 40.0))
+    plate = nest(fp, (200.0, 124.0), qty=40, spacing_mm=3.0)
+    # a row of four turned copies plus a row of three: more than either orientation alone (6 / 4)
+    assert plate.copies_per_build == 7
+    assert {t for _, _, t in plate.placements} == {0, 1}
+    assert plate.builds == 6
+
+    assert nest(fp, (200.0, 124.0), qty=3).copies_per_build == 3
+    with pytest.raises(ValueError, match="does not fit"):
+        nest(fp, (30.0, 30.0), qty=1)
+
+
+def test_builds_multiply_machine_time_and_setup() -> None:
+    cfg = load_compiled_config(REPO_ROOT / "config" / "default.example.yaml")
+    one = QuoteInput.model_validate(_input())
+    three = one.model_copy(deep=True)
+    three.process.builds = 3
+
+    r1, r3 = compute_quote(one, cfg), compute_quote(three, cfg)
+    items1 = {li.name: li.cost for li in r1.line_items}
+    items3 = {li.name: li.cost for li in r3.line_items}
+    assert items3["Machine Time"] == pytest.approx(3 * items1["Machine Time"], abs=0.01)
+    assert items3["Labor"] == pytest.approx(items1["Labor"] + 2 * cfg.setup_cost_per_job, abs=0.01)
+    assert items3["Material"] == items1["Material"]
+    assert compute_quotes_batch([one, three], cfg).results() == [r1, r3]
+
+
+def test_price_quote_nests_stl_quantity(binary_stl) -> None:
+    cfg = load_compiled_config(REPO_ROOT / "config" / "default.example.yaml")
+    data = _input()
+    data["process"]["qty"] = 40
+    del data["process"]["print_hours"]
+    q, _, meta = price_quote(data, cfg, cad_file=binary_stl(box_triangles((60.0, 40.0, 10.0))))
+
+    assert meta["nesting"]["copies_per_build"] == 7
+    assert q.process.builds == 6
+    spec = cfg.printer("Form 4").print_time
+    per_build = (spec.fixed_minutes * 60 + 200 * spec.seconds_per_layer) / 3600
+    assert q.process.print_hours == pytest.approx(per_build, abs=0.005)
+
+    # an explicit builds count is respected
+    data["process"]["builds"] = 2
+    q, _, meta = price_quote(data, cfg, cad_file=binary_stl(box_triangles((60.0, 40.0, 10.0))))
+    assert q.process.builds == 2 and "nesting" not in meta
+
+
+def test_given_print_hours_are_not_multiplied_by_builds(binary_stl) -> None:
+    cfg = load_compiled_config(REPO_ROOT / "config" / "default.example.yaml")
+    data = _input()
+    data["process"]["qty"] = 10
+    plain = compute_quote(QuoteInput.model_validate(data), cfg)
+    # only one 100 x 100 mm plate fits a Form 4 build: nested, this would be ten builds
+    q, r, meta = price_quote(data, cfg, cad_file=binary_stl(box_triangles((100.0, 100.0, 20.0))))
+
+    assert q.process.builds is None and "nesting" not in meta
+    items = {li.name: li.cost for li in r.line_items}
+    assert items["Machine Time"] == {li.name: li.cost for li in plain.line_items}["Machine Time"]
+    assert items["Machine Time"] == pytest.approx(data["process"]["print_hours"] * cfg.machine_rate("Form 4"))
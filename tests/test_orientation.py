@@ -0,0 +1,65 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from conftest import box_triangles
+from sla_quote.api import price_quote
+from sla_quote.config import load_compiled_config
+from sla_quote.geometry import check_fits_printer
+from sla_quote.orientation import orientation_report, rotate_triangles
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _cfg():
+    return load_compiled_config(REPO_ROOT / "config" / "default.example.yaml")
+
+
+def test_rotated_box_reports_its_own_extents() -> None:
+    c, s = np.cos(0.7), np.sin(0.7)
+    rot = np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]]) @ np.array([[1, 0, 0], [0, c, -s], [0, s, c]])
+    tri = box_triangles((40.0, 20.0, 10.0), origin=(-20.0, -10.0, -5.0)) @ rot.T
+
+    report = orientation_report(tri, _cfg())
+    assert sorted(report.obb_extents_in) == pytest.approx(sorted(np.array([40.0, 20.0, 10.0]) / 25.4), rel=0.01)
+    for fit in report.printers.values():
+        assert fit.fits and fit.as_modeled_fits
+        assert fit.z_height_in == pytest.approx(10.0 / 25.4, rel=0.01)
+        # the reported rotation really produces the reported extents
+        out = rotate_triangles(tri, fit.rotation).reshape(-1, 3)
+        assert np.ptp(out, axis=0) / 25.4 == pytest.approx(fit.extents_in, rel=1e-4)
+
+
+def test_long_bar_fits_only_when_rotated() -> None:
+    cfg = _cfg()
+    tri = box_triangles((240.0, 10.0, 10.0))
+    bounds_in = (240.0 / 25.4, 10.0 / 25.4, 10.0 / 25.4)
+    report = orientation_report(tri, cfg)
+
+    form4 = report.printers["Form 4"]  # 7.9 x 4.9 x 8.3 in: too long on x, needs a tilt
+    assert form4.fits and not form4.as_modeled_fits
+    assert all(e <= b + 1e-9 for e, b in zip(form4.extents_in, cfg.printer("Form 4").build_volume_in))
+    with pytest.raises(ValueError, match="does not fit"):
+        check_fits_printer(cfg, "Form 4", bounds_in)
+    check_fits_printer(cfg, "Form 4", bounds_in, form4)
+
+    longer = orientation_report(box_triangles((300.0, 10.0, 10.0)), cfg).printers["Form 4"]
+    assert not longer.fits
+    with pytest.raises(ValueError, match="in any orientation"):
+        check_fits_printer(cfg, "Form 4", (300.0 / 25.4, 0.4, 0.4), longer)
+
+
+def test_price_quote_slices_rotated_part(binary_stl) -> None:
+    path = binary_stl(box_triangles((240.0, 10.0, 10.0)), name="bar.stl")
+    with (REPO_ROOT / "examples" / "input_form4_basic.json").open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    del data["process"]["print_hours"]
+    q, _, meta = price_quote(data, _cfg(), cad_file=path)
+    assert meta["printer_fit"]["Form 4"]["needs_rotation"]
+    assert not meta["printer_fit"]["Viper Si2"]["needs_rotation"]
+    assert len(meta["orientation"]) == 3
+    # sliced along the tilted bar, not its 10 mm modeled height
+    assert meta["print_layers"] == pytest.approx(meta["printer_fit"]["Form 4"]["z_height_in"] * 25.4 / 0.05, abs=1)
+    assert q.process.print_hours > 0
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from conftest import box_triangles
+from sla_quote.api import price_quote
+from sla_quote.config import PrintTimeSpec, load_compiled_config
+from sla_quote.print_time import estimate_print_hours, layer_areas_mm2, layer_profile
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_layer_areas_of_box_and_prism() -> None:
+    areas = layer_areas_mm2(box_triangles((10.0, 20.0, 30.0), origin=(100.0, -50.0, 7.0)), 0.07)
+    assert len(areas) == 429
+    assert np.allclose(areas, 200.0)
+
+    # flipped winding (inward normals) gives the same areas
+    assert np.allclose(layer_areas_mm2(box_triangles((10.0, 20.0, 30.0))[:, ::-1], 0.5), 200.0)
+
+    # box rotated 45 degrees about x: cross-sections grow then shrink (a diamond in yz)
+    c, s = np.cos(np.pi / 4), np.sin(np.pi / 4)
+    rot = np.array([[1, 0, 0], [0, c, -s], [0, s, c]])
+    tri = box_triangles((10.0, 10.0, 10.0), origin=(-5.0, -5.0, -5.0)) @ rot.T
+    h = 0.01
+    areas = layer_areas_mm2(tri, h)
+    assert areas.sum() * h == pytest.approx(1000.0, rel=1e-4)
+    assert areas.max() == pytest.approx(10.0 * 10.0 * np.sqrt(2), rel=1e-3)
+
+
+def test_estimate_print_hours_model() -> None:
+    profile = layer_profile(box_triangles((10.0, 10.0, 10.0)), 0.05)
+    assert profile.layers == 200
+    spec = PrintTimeSpec(layer_height_mm=0.05, seconds_per_layer=9.0, seconds_per_cm2=0.5, fixed_minutes=30)
+    # 30 min + 200 * 9 s + 2 parts * 200 layers * 1 cm2 * 0.5 s
+    assert estimate_print_hours(profile, spec, qty=2) == pytest.approx((1800 + 1800 + 200) / 3600)
+
+
+def test_price_quote_fills_missing_print_hours(binary_stl) -> None:
+    cfg = load_compiled_config(REPO_ROOT / "config" / "default.example.yaml")
+    with (REPO_ROOT / "examples" / "input_form4_basic.json").open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    del data["process"]["print_hours"]
+
+    stl = binary_stl(box_triangles((10.0, 10.0, 10.0)))
+    q, r, meta = price_quote(data, cfg, cad_file=stl)
+
+    spec = cfg.printer(q.process.printer).print_time
+    expected = (spec.fixed_minutes * 60 + 200 * spec.seconds_per_layer) / 3600
+    assert q.process.print_hours == pytest.approx(expected, abs=0.005)
+    assert meta["print_layers"] == 200
+
+    with pytest.raises(ValueError, match="print_hours"):
+        price_quote(data, cfg)
@@ -0,0 +1,104 @@
+import os
+import shutil
+from pathlib import Path
+
+import anyio
+import httpx
+import pytest
+
+from conftest import CONFIG_PATH, INPUT_PATH
+from sla_quote.registry import ConfigRegistry
+from sla_quote.workers import QuotePool
+
+
+def _edit(path: Path, old: str, new: str) -> None:
+    text = path.read_text(encoding="utf-8")
+    assert old in text
+    st = path.stat()
+    path.write_text(text.replace(old, new), encoding="utf-8")
+    # a rewrite inside one mtime tick must still be seen
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_registry_reloads_changed_files_and_keeps_the_last_good_version(tmp_path: Path) -> None:
+    shop = tmp_path / "shop.yaml"
+    shutil.copy(CONFIG_PATH, shop)
+    (tmp_path / "notes.txt").write_text("not a config", encoding="utf-8")
+    logs = []
+    reg = ConfigRegistry(tmp_path, poll_interval=0, log=logs.append)
+
+    first = reg.get("shop")
+    assert reg.get(str(shop)) is first and first.version == 1
+    assert [e.name for e in reg.entries()] == ["shop"]
+    for name in ("default.example", str(CONFIG_PATH), "../shop"):
+        with pytest.raises(ValueError, match="Unknown config"):
+            reg.get(name)
+
+    assert reg.reload() == []
+    os.utime(shop)  # touched, same bytes
+    assert reg.reload() == []
+    assert (reg.get("shop").version, reg.get("shop").loaded_at) == (1, first.loaded_at)
+
+    _edit(shop, "margin_pct: 0.35", "margin_pct: 0.4")
+    assert reg.reload() == ["shop"]
+    second = reg.get("shop")
+    assert second.version == 2 and second.digest != first.digest and second.config.margin_pct == 0.4
+    assert first.config.margin_pct == 0.35  # entries are swapped, not mutated
+
+    _edit(shop, "margin_pct: 0.4", "margin_pct: [")
+    (tmp_path / "shop.yml").write_text("x: 1\n", encoding="utf-8")
+    assert reg.reload() == []
+    assert reg.get("shop") is second
+    errors = reg.describe()["errors"]
+    assert set(errors) == {"shop.yaml", "shop.yml"} and "already taken" in errors["shop.yml"]
+    assert reg.reload() == [] and len(logs) == 1  # a broken file is reported once
+
+    shop.unlink()
+    (tmp_path / "shop.yml").unlink()
+    assert reg.reload() == ["shop"]
+    with pytest.raises(ValueError, match="Unknown config"):
+        reg.get("shop")
+    with pytest.raises(ValueError, match="No loadable configs"):
+        ConfigRegistry(tmp_path, poll_interval=0)
+
+
+def test_server_quotes_by_config_name_and_lists_configs(tmp_path: Path, monkeypatch, server_env) -> None:
+    from sla_quote import server
+
+    config_dir = tmp_path / "configs"
+    config_dir.mkdir()
+    shop = config_dir / "shop.yaml"
+    shutil.copy(CONFIG_PATH, shop)
+    registry = ConfigRegistry(config_dir, poll_interval=0)
+    monkeypatch.setattr(server, "_registry", registry)
+    form = {"input_json": INPUT_PATH.read_text(encoding="utf-8"), "out_dir": str(tmp_path / "dist")}
+
+    async def post(config_name: str) -> httpx.Response:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as c:
+            return await c.post("/quote", data={**form, "config_name": config_name})
+
+    async def listing() -> httpx.Response:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as c:
+            return await c.get("/configs")
+
+    first = anyio.run(post, "shop")
+    assert first.status_code == 200
+    assert anyio.run(post, str(shop)).json()["quote"]["sell_price"] == first.json()["quote"]["sell_price"]
+    refused = anyio.run(post, str(CONFIG_PATH))
+    assert refused.status_code == 400 and "Unknown config" in refused.json()["detail"]
+
+    _edit(shop, "margin_pct: 0.35", "margin_pct: 0.5")
+    registry.reload()
+    second = anyio.run(post, "shop")
+    assert second.json()["quote"]["sell_price"] > first.json()["quote"]["sell_price"]
+
+    listed = anyio.run(listing).json()
+    assert [(c["name"], c["file"], c["version"]) for c in listed["configs"]] == [("shop", "shop.yaml", 2)]
+    assert listed["configs"][0]["digest"] == registry.get("shop").digest and listed["errors"] == {}
+
+    # a bad edit keeps serving v2: workers get the registry's config, not the file
+    _edit(shop, "margin_pct: 0.5", "margin_pct: [")
+    registry.reload()
+    third = anyio.run(post, "shop")
+    assert third.status_code == 200 and third.json()["quote"]["sell_price"] == second.json()["quote"]["sell_price"]
+    QuotePool(kind="thread", workers=1, preload_configs=[str(shop)]).shutdown()
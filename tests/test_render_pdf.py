@@ -0,0 +1,37 @@
+import io
+import json
+from pathlib import Path
+
+from sla_quote.api import price_quote
+from sla_quote.render_pdf import render_pdf_bytes, write_pdf, write_quotes_pdf
+from sla_quote.utils import load_config
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _priced(qty: int):
+    with (REPO_ROOT / "examples" / "input_form4_basic.json").open("r", encoding="utf-8") as f:
+        data = json.load(f)
+    data["process"]["qty"] = qty
+    q, r, _ = price_quote(data, load_config(REPO_ROOT / "config" / "default.example.yaml"))
+    return q, r
+
+
+def test_pdf_bytes_are_stable(tmp_path: Path) -> None:
+    q, r = _priced(2)
+    a = render_pdf_bytes(q, r)
+
+    assert a.startswith(b"%PDF")
+    assert a == render_pdf_bytes(q, r)
+    assert write_pdf(tmp_path / "q.pdf", q, r).read_bytes() == a
+
+
+def test_multi_quote_pdf_shares_layout_form() -> None:
+    # qty 1 has no discount line, qty 2 does: two layout variants, one form each
+    pages = [_priced(1), _priced(2)] * 5
+    buf = io.BytesIO()
+    write_quotes_pdf(buf, pages)
+    pdf = buf.getvalue()
+
+    assert b"/Count 10" in pdf
+    assert pdf.count(b"/Subtype /Form") == 2
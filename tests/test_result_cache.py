@@ -0,0 +1,62 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from conftest import CONFIG_PATH, INPUT_PATH, box_triangles, write_binary_stl
+from sla_quote.api import generate_quote_from_files
+from sla_quote.result_cache import ResultCache
+
+
+def test_repeat_quote_is_served_from_cache(tmp_path) -> None:
+    config = Path(shutil.copy(CONFIG_PATH, tmp_path / "config.yaml"))
+    stl = write_binary_stl(tmp_path / "part.stl", box_triangles((20.0, 20.0, 20.0)))
+    data = json.loads(INPUT_PATH.read_text(encoding="utf-8"))
+    first_input = tmp_path / "a.json"
+    first_input.write_text(json.dumps(data), encoding="utf-8")
+    # same quote, different key order and whitespace
+    second_input = tmp_path / "b.json"
+    second_input.write_text(json.dumps(dict(reversed(list(data.items()))), indent=4), encoding="utf-8")
+
+    cache = ResultCache(tmp_path / "cache")
+
+    def run(inp: Path, out: str, c: ResultCache = cache) -> dict:
+        return generate_quote_from_files(inp, config, stl, tmp_path / out, result_cache=c)
+
+    miss = run(first_input, "out1")
+    hit = run(second_input, "out2")
+    assert (miss["result_cache"], hit["result_cache"]) == ("miss", "memory")
+    assert hit["sell_price"] == miss["sell_price"] and hit["stl_volume_ml"] == miss["stl_volume_ml"]
+    assert Path(hit["artifact_pdf"]).parent == tmp_path / "out2"
+    assert Path(hit["artifact_pdf"]).read_bytes() == Path(miss["artifact_pdf"]).read_bytes()
+
+    # another process sharing the directory hits the disk tier
+    assert run(first_input, "out3", ResultCache(tmp_path / "cache"))["result_cache"] == "disk"
+
+    # new CAD bytes or an edited config change the key
+    write_binary_stl(stl, box_triangles((21.0, 20.0, 20.0)))
+    assert run(first_input, "out4")["result_cache"] == "miss"
+    config.write_text(config.read_text(encoding="utf-8") + "\n# edited\nunused_key: 1\n", encoding="utf-8")
+    assert run(first_input, "out5")["result_cache"] == "miss"
+
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"]) == (1, 3)
+    assert stats["hit_ratio"] == pytest.approx(0.25)
+
+
+def test_ttl_and_size_eviction(tmp_path) -> None:
+    art = tmp_path / "QUOTE-X.pdf"
+    art.write_bytes(b"%PDF" + b"x" * 1000)
+
+    expired = ResultCache(tmp_path / "ttl", ttl_seconds=0)
+    expired.put("k", {"quote_id": "X"}, {"pdf": art})
+    assert expired.get("k") is None
+
+    small = ResultCache(tmp_path / "size", max_bytes=2500)
+    for key in ("a", "b", "c"):
+        small.put(key, {"quote_id": key}, {"pdf": art})
+    fresh = ResultCache(tmp_path / "size")  # no memory tier to hide the eviction
+    assert fresh.get("a") is None and fresh.get("c") is not None
+    assert not (tmp_path / "size" / "a" / "a").exists()
+    assert fresh.stats()["bytes"] <= 2500
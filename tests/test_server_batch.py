@@ -0,0 +1,68 @@
+import io
+import json
+import zipfile
+from pathlib import Path
+
+import anyio
+import httpx
+import pytest
+
+from conftest import CONFIG_PATH, INPUT_PATH, box_triangles, write_binary_stl
+
+
+@pytest.fixture
+def app(server_env):
+    from sla_quote.server import app
+
+    return app
+
+
+def _post(app, files, **form):
+    data = {"input_json": INPUT_PATH.read_text(encoding="utf-8"), "config_name": str(CONFIG_PATH), **form}
+
+    async def go() -> httpx.Response:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/quote/batch", data=data, files=files)
+
+    return anyio.run(go)
+
+
+def test_batch_streams_a_line_per_part_and_totals(app, tmp_path) -> None:
+    stl = lambda size: write_binary_stl(tmp_path / "p.stl", box_triangles(size)).read_bytes()  # noqa: E731
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("asm/bracket.stl", stl((20.0, 20.0, 20.0)))
+        zf.writestr("asm/notes.txt", "ignored")
+        zf.writestr("__MACOSX/asm/._bracket.stl", "ignored")
+        zf.writestr("asm/bomb.stl", b"\0" * (11 * 1024 * 1024))  # compresses to a few KB
+    files = [
+        ("files", ("asm.zip", buf.getvalue(), "application/zip")),
+        ("files", ("plate.stl", stl((30.0, 10.0, 10.0)), "model/stl")),
+    ]
+    overrides = json.dumps({"plate.stl": {"process": {"qty": 5}}})
+    resp = _post(app, files, out_dir=str(tmp_path / "dist"), parts_json=overrides)
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    *parts, last = lines
+    by_file = {p["file"]: p for p in parts}
+    assert set(by_file) == {"asm/bracket.stl", "asm/bomb.stl", "plate.stl"}
+
+    bracket, plate = by_file["asm/bracket.stl"]["quote"], by_file["plate.stl"]["quote"]
+    assert bracket["stl_volume_ml"] == pytest.approx(8.0) and plate["qty"] == 5
+    assert {bracket["quote_id"], plate["quote_id"]} == {"DEMO-001-001", "DEMO-001-003"}
+    assert Path(by_file["plate.stl"]["artifacts"]["pdf"]).exists()
+    assert by_file["asm/bomb.stl"]["ok"] is False and by_file["asm/bomb.stl"]["status"] == 413
+
+    totals = last["totals"]
+    assert (totals["parts"], totals["ok"], totals["failed"]) == (3, 2, 1)
+    assert totals["qty"] == bracket["qty"] + 5
+    assert totals["sell_price"] == pytest.approx(bracket["sell_price"] + plate["sell_price"], abs=0.01)
+
+
+def test_batch_rejects_bad_uploads_up_front(app) -> None:
+    resp = _post(app, [("files", ("asm.zip", b"not a zip", "application/zip"))])
+    assert resp.status_code == 400 and "not a valid zip" in resp.json()["detail"]
+    resp = _post(app, [("files", ("notes.txt", b"x", "text/plain"))])
+    assert resp.status_code == 400
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+import trimesh
+
+from sla_quote.geometry import load_stl_metrics
+
+from conftest import REPO_ROOT, box_triangles
+
+
+def test_binary_fast_path_matches_trimesh(binary_stl) -> None:
+    stl = binary_stl(box_triangles(size=(20.0, 10.0, 5.0), origin=(-3.0, 4.0, 1.0)))
+    m = load_stl_metrics(stl)
+    mesh = trimesh.load_mesh(str(stl), force="mesh")
+
+    assert m.is_watertight is True
+    assert m.is_watertight == mesh.is_watertight
+    assert m.volume_ml == pytest.approx(abs(mesh.volume) / 1000.0, rel=1e-9)
+    assert m.volume_ml == pytest.approx(1.0, rel=1e-6)
+    assert np.allclose(m.bounds_in, mesh.extents / 25.4)
+
+
+def test_binary_open_mesh_is_not_watertight(binary_stl) -> None:
+    stl = binary_stl(box_triangles()[:-1])
+    assert load_stl_metrics(stl).is_watertight is False
+
+
+def test_truncated_binary_falls_back_and_fails(binary_stl) -> None:
+    stl = binary_stl(box_triangles())
+    stl.write_bytes(stl.read_bytes()[:-10])
+
+    # not a whole binary STL, so trimesh parses it and finds no faces
+    with pytest.raises(ValueError, match="STL mesh is empty"):
+        load_stl_metrics(stl)
+
+
+def test_metrics_from_upload_bytes_match_file(binary_stl) -> None:
+    stl = binary_stl(box_triangles(size=(4.0, 5.0, 6.0)))
+    assert load_stl_metrics(bytearray(stl.read_bytes())) == load_stl_metrics(stl)
+
+
+def test_ascii_bytes_fall_back_to_trimesh() -> None:
+    stl = REPO_ROOT / "examples" / "cube_mm.stl"
+    assert load_stl_metrics(stl.read_bytes()) == load_stl_metrics(stl)
@@ -0,0 +1,157 @@
+import io
+import json
+from pathlib import Path
+
+import anyio
+import httpx
+import numpy as np
+import pytest
+
+from conftest import CONFIG_PATH, INPUT_PATH, box_triangles, write_binary_stl
+from sla_quote.geometry import StlTooLargeToPlace, load_stl_metrics
+from sla_quote.stl_stream import StlAccumulator, scan_stl_metrics
+
+
+def _ascii_stl(triangles: np.ndarray) -> bytes:
+    lines = ["solid part"]
+    for tri in triangles:
+        lines += ["  facet normal 0 0 0", "    outer loop"]
+        lines += [f"      vertex {x:.6e} {y:.6e} {z:.6e}" for x, y, z in tri]
+        lines += ["    endloop", "  endfacet"]
+    lines.append("endsolid part")
+    return ("\n".join(lines) + "\n").encode("ascii")
+
+
+def test_scan_matches_in_memory_metrics_and_spills_edges(tmp_path: Path) -> None:
+    # 27 separate boxes, so the edge records outgrow a tiny memory budget and go to disk
+    parts = [box_triangles((5.0, 6.0, 7.0), origin=(10.0 * i, 10.0 * j, 10.0 * k))
+             for i in range(3) for j in range(3) for k in range(3)]
+    open_box = box_triangles((4.0, 4.0, 4.0), origin=(-10.0, 0.0, 0.0))[:-1]  # one face missing
+    tri = np.concatenate(parts + [open_box])
+    path = write_binary_stl(tmp_path / "parts.stl", tri)
+    expected = load_stl_metrics(path)
+    assert expected.boundary_edges == 3 and not expected.is_watertight
+
+    acc = StlAccumulator(path.stat().st_size, block_triangles=16, memory_bytes=6 * 1024)
+    data = path.read_bytes()
+    for start in range(0, len(data), 77):  # chunks that split facets and the header
+        acc.feed(data[start:start + 77])
+    spilled = acc.spilled_bytes
+    got = acc.finish()
+    assert spilled > 0
+    for m in (got, scan_stl_metrics(path, block_triangles=10), scan_stl_metrics(data)):
+        assert m.triangles == expected.triangles
+        assert (m.boundary_edges, m.non_manifold_edges) == (3, 0) and not m.is_watertight
+        assert m.volume_ml == pytest.approx(expected.volume_ml)
+        assert m.bounds_in == pytest.approx(expected.bounds_in)
+
+    ascii_box = scan_stl_metrics(_ascii_stl(box_triangles((20.0, 10.0, 5.0))), block_triangles=2)
+    assert ascii_box.is_watertight and ascii_box.triangles == 12
+    assert ascii_box.volume_ml == pytest.approx(1.0)
+
+
+def test_scan_rejects_truncated_binary_and_counts_non_manifold_edges(tmp_path: Path) -> None:
+    data = write_binary_stl(tmp_path / "box.stl", box_triangles()).read_bytes()
+    with pytest.raises(ValueError, match="Truncated binary STL"):
+        scan_stl_metrics(data[:-7])
+
+    doubled = np.concatenate([box_triangles(), box_triangles()[:2]])  # two faces listed twice
+    m = scan_stl_metrics(write_binary_stl(tmp_path / "doubled.stl", doubled))
+    assert m.non_manifold_edges == load_stl_metrics(tmp_path / "doubled.stl").non_manifold_edges == 5
+    assert not m.is_watertight
+
+
+def test_large_stls_are_placed_block_by_block(tmp_path: Path, monkeypatch, server_env) -> None:
+    from sla_quote import geometry, geometry_cache, server
+    from sla_quote.api import price_quote, sweep_cad_quote
+    from sla_quote.config import load_compiled_config
+
+    cfg = load_compiled_config(CONFIG_PATH)
+    # a 30 x 30 mm top on a leg: nesting, print time and supports all have work to do
+    table = np.concatenate([box_triangles((10.0, 10.0, 20.0), origin=(10.0, 10.0, 0.0)),
+                            box_triangles((30.0, 30.0, 5.0), origin=(0.0, 0.0, 20.0))])
+    stl = write_binary_stl(tmp_path / "scan.stl", table)
+    data = json.loads(INPUT_PATH.read_text(encoding="utf-8"))
+    del data["process"]["print_hours"]
+    in_memory, expected, _ = price_quote(data, cfg, cad_file=stl)
+    expected_sweep = sweep_cad_quote(data, cfg, stl, quantities=[1, 50], printers=["Form 4"])[1]
+
+    def no_triangles(source):
+        raise AssertionError("a large STL must not be loaded whole")
+
+    monkeypatch.setattr(geometry, "CHUNKED_METRICS_BYTES", 256)
+    monkeypatch.setattr(geometry, "load_stl_triangles", no_triangles)
+    monkeypatch.setattr(geometry_cache, "load_stl_triangles", no_triangles)
+    cache = geometry_cache.GeometryCache(tmp_path / "geometry.sqlite")
+    for gc in (None, cache):
+        q, r, meta = price_quote(data, cfg, cad_file=stl, geometry_cache=gc)
+        assert "Large STL" in meta["cad_note"] and meta["nesting"]["copies_per_build"] == 2
+        assert q.process.print_hours == in_memory.process.print_hours
+        assert q.process.support_volume_ml == pytest.approx(in_memory.process.support_volume_ml, abs=1e-3)
+        assert r.sell_price == pytest.approx(expected.sell_price, abs=0.01)
+    cache.close()
+    swept = sweep_cad_quote(data, cfg, stl, quantities=[1, 50], printers=["Form 4"])[1]
+    assert np.array_equal(swept.builds, expected_sweep.builds)
+    assert swept.sell_price == pytest.approx(expected_sweep.sell_price, abs=0.01)
+
+    # splitting into bodies needs the whole mesh
+    separate = {**data, "process": {**data["process"], "bodies": "separate"}}
+    with pytest.raises(StlTooLargeToPlace, match="Quote it with bodies 'combined'"):
+        price_quote(separate, cfg, cad_file=stl)
+
+    async def post() -> httpx.Response:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as c:
+            form = {"input_json": json.dumps(separate), "out_dir": str(tmp_path / "dist")}
+            return await c.post("/quote", data=form, files={"cad_file": ("scan.stl", stl.read_bytes(), "model/stl")})
+
+    refused = anyio.run(post)
+    assert refused.status_code == 413 and "splits the mesh" in refused.json()["detail"]
+
+
+def test_server_spools_large_uploads_to_disk(tmp_path, monkeypatch, server_env) -> None:
+    monkeypatch.setenv("TMPDIR", str(tmp_path / "spool"))
+    (tmp_path / "spool").mkdir()
+    import tempfile
+
+    from sla_quote import server
+
+    monkeypatch.setattr(tempfile, "tempdir", None)  # re-read TMPDIR
+    monkeypatch.setattr(server, "SPOOL_BYTES", 100)
+    stl = write_binary_stl(tmp_path / "part.stl", box_triangles((20.0, 20.0, 20.0))).read_bytes()
+    form = {
+        "input_json": INPUT_PATH.read_text(encoding="utf-8"),
+        "config_name": str(CONFIG_PATH),
+        "out_dir": str(tmp_path / "dist"),
+    }
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            files = {"cad_file": ("part.stl", io.BytesIO(stl), "model/stl")}
+            return await client.post("/quote", data=form, files=files)
+
+    resp = anyio.run(scenario)
+    assert resp.status_code == 200, resp.text
+    quote = resp.json()["quote"]
+    assert quote["input_file"] == "cad.stl"
+    assert quote["stl_volume_ml"] == pytest.approx(8.0) and quote["stl_is_watertight"]
+    assert json.loads(Path(quote["artifact_json"]).read_text())["stl_boundary_edges"] == 0
+    assert list((tmp_path / "spool").iterdir()) == []  # the spooled copy is gone
+
+
+def test_server_refuses_declared_oversize_before_reading_the_body(tmp_path, monkeypatch, server_env) -> None:
+    from sla_quote import server
+
+    monkeypatch.setitem(server.MAX_REQUEST_BYTES, "/quote", 4096)
+    stl = write_binary_stl(tmp_path / "part.stl", box_triangles((20.0, 20.0, 20.0))).read_bytes() * 20
+    form = {"input_json": INPUT_PATH.read_text(encoding="utf-8"), "out_dir": str(tmp_path / "dist")}
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test") as c:
+            refused = await c.post("/quote", data=form, files={"cad_file": ("part.stl", stl, "model/stl")})
+            metrics = await c.get("/metrics")
+        return refused, metrics
+
+    refused, metrics = anyio.run(scenario)
+    assert refused.status_code == 413 and "Request too large" in refused.json()["detail"]
+    assert 'sla_quote_requests_total{route="/quote",status="413"}' in metrics.text
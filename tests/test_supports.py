@@ -0,0 +1,88 @@
+import copy
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from conftest import CONFIG_PATH, INPUT_PATH, box_triangles, write_binary_stl
+from sla_quote.api import price_quote
+from sla_quote.batch import compute_quotes_batch
+from sla_quote.config import SupportSpec, compile_config, load_compiled_config
+from sla_quote.engine import compute_quote
+from sla_quote.supports import estimate_supports
+from sla_quote.utils import load_config
+
+
+def _table() -> np.ndarray:
+    """A 30 x 30 x 5 mm top on a 10 x 10 x 20 mm leg: 800 mm² of overhang 20 mm up."""
+    return np.concatenate([box_triangles((10.0, 10.0, 20.0), origin=(10.0, 10.0, 0.0)),
+                           box_triangles((30.0, 30.0, 5.0), origin=(0.0, 0.0, 20.0))])
+
+
+def test_overhangs_are_supported_down_to_the_plate_or_the_part_below() -> None:
+    solid = SupportSpec(density=1.0)
+    assert estimate_supports(box_triangles((20.0, 20.0, 20.0)), solid).volume_ml == 0.0
+
+    table = estimate_supports(_table(), solid)
+    assert table.volume_ml == pytest.approx(800 * 20 / 1000)
+    assert table.overhang_area_mm2 == pytest.approx(1000.0)  # the leg's foot and the top's underside
+    # winding, chunking and density
+    assert estimate_supports(_table()[:, ::-1], solid, max_samples=64) == table
+    assert estimate_supports(_table(), SupportSpec(density=0.1)).volume_ml == pytest.approx(1.6)
+    # upside down the top rests on the plate and the leg needs nothing
+    flipped = ((1.0, 0.0, 0.0), (0.0, -1.0, 0.0), (0.0, 0.0, -1.0))
+    assert estimate_supports(_table(), solid, rotation=flipped).volume_ml == 0.0
+    # raised off the plate every downward face is supported, the leg's foot included
+    lifted = estimate_supports(_table(), SupportSpec(density=1.0, lift_mm=5.0))
+    assert lifted.volume_ml == pytest.approx((800 * 25 + 100 * 5) / 1000)
+
+    # a bridge: the span is supported down to the base it crosses, not to the plate
+    base = box_triangles((40.0, 10.0, 5.0))
+    span = box_triangles((40.0, 10.0, 2.0), origin=(0.0, 0.0, 15.0))
+    posts = [box_triangles((5.0, 10.0, 10.0), origin=(x, 0.0, 5.0)) for x in (0.0, 35.0)]
+    bridge = estimate_supports(np.concatenate([base, span] + posts), solid)
+    assert bridge.volume_ml == pytest.approx(30 * 10 * 10 / 1000)
+
+
+def test_sphere_support_matches_the_analytic_volume() -> None:
+    # UV sphere of radius 25 resting on the plate: supports under the cap within 45 deg of the bottom
+    from benchmarks.synthetic import sphere
+
+    r = 25.0
+    rho = r * math.sin(math.radians(45.0))
+    expected = math.pi * rho ** 2 * r - 2.0 * math.pi / 3.0 * (r ** 3 - (r ** 2 - rho ** 2) ** 1.5)
+    est = estimate_supports(sphere(200_000, radius=r), SupportSpec(density=1.0, raster_mm=0.5))
+    assert est.volume_ml * 1000 == pytest.approx(expected, rel=0.03)
+    assert est.overhang_area_mm2 == pytest.approx(math.pi * rho ** 2, rel=0.03)
+
+
+def test_quotes_charge_estimated_support_resin(tmp_path: Path) -> None:
+    cfg = load_compiled_config(CONFIG_PATH)
+    stl = write_binary_stl(tmp_path / "table.stl", _table())
+    data = json.loads(INPUT_PATH.read_text(encoding="utf-8"))
+
+    q, r, meta = price_quote(data, cfg, cad_file=stl)
+    assert meta["support_volume_ml"] == q.process.support_volume_ml == pytest.approx(800 * 20 * 0.15 / 1000)
+    bare = q.model_copy(update={"process": q.process.model_copy(update={"support_volume_ml": 0.0})})
+    without = compute_quote(bare, cfg)
+    resin = cfg.resin(q.process.resin)
+    extra = q.process.support_volume_ml * q.process.qty * (1 + resin.waste_pct) * resin.cost_per_ml
+    assert r.line_items[0].cost == pytest.approx(without.line_items[0].cost + extra, abs=0.01)
+    batch = compute_quotes_batch([q], cfg).results()[0]
+    assert batch == r
+
+    # an explicit support volume wins; a config without a support section estimates nothing
+    data["process"]["support_volume_ml"] = 0.5
+    q, _, meta = price_quote(data, cfg, cad_file=stl)
+    assert q.process.support_volume_ml == 0.5 and "support_volume_ml" not in meta
+    raw = copy.deepcopy(load_config(CONFIG_PATH))
+    del raw["support"]
+    del data["process"]["support_volume_ml"]
+    q, _, meta = price_quote(data, compile_config(raw), cad_file=stl)
+    assert q.process.support_volume_ml is None and "support_volume_ml" not in meta
+
+    raw["support"] = {"density": 0}
+    with pytest.raises(ValueError, match="support.density"):
+        compile_config(raw)
@@ -0,0 +1,70 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+from conftest import box_triangles, write_binary_stl
+from sla_quote.api import price_quote, sweep_cad_quote
+from sla_quote.config import load_compiled_config
+from sla_quote.engine import compute_quote
+from sla_quote.model import QuoteInput
+from sla_quote.render_pdf import write_price_break_pdf
+from sla_quote.sweep import sweep_quote
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _input() -> QuoteInput:
+    with (REPO_ROOT / "examples" / "input_form4_basic.json").open("r", encoding="utf-8") as f:
+        return QuoteInput.model_validate(json.load(f))
+
+
+def test_sweep_matches_compute_quote_per_cell() -> None:
+    cfg = load_compiled_config(REPO_ROOT / "config" / "default.example.yaml")
+    q = _input()
+    table = sweep_quote(q, cfg, quantities=[1, 2, 5, 10, 20, 50])
+
+    # every printer with every resin listed in its materials
+    assert len(table.combos) == sum(len(p.materials) for p in cfg.printers.values())
+    assert table.unit_discount_pct == (0.0, 0.05, 0.10, 0.15, 0.20, 0.20)
+
+    for i, (printer, resin) in enumerate(table.combos):
+        for j, qty in enumerate(table.quantities):
+            single = q.model_copy(deep=True)
+            single.process.printer, single.process.resin, single.process.qty = printer, resin, qty
+            r = compute_quote(single, cfg)
+            assert table.sell_price[i, j] == r.sell_price
+            assert table.price_per_part[i, j] == r.price_per_part
+
+
+def test_sweep_filters_and_renders_pdf() -> None:
+    cfg = load_compiled_config(REPO_ROOT / "config" / "default.example.yaml")
+    table = sweep_quote(_input(), cfg, quantities=[1, 10], printers=["Form 4"], resins=["Clear", "Grey"])
+    assert table.combos == (("Form 4", "Clear"), ("Form 4", "Grey"))
+
+    buf = io.BytesIO()
+    write_price_break_pdf(buf, _input(), table)
+    assert buf.getvalue().startswith(b"%PDF")
+
+    with pytest.raises(ValueError):
+        sweep_quote(_input(), cfg, printers=["Form 4"], resins=["Accura Xtreme White"])
+
+
+def test_cad_sweep_times_and_nests_each_printer_like_a_single_quote(tmp_path: Path) -> None:
+    cfg = load_compiled_config(REPO_ROOT / "config" / "default.example.yaml")
+    stl = write_binary_stl(tmp_path / "part.stl", box_triangles((60.0, 60.0, 20.0)))
+    assert not any(sweep_quote(_input(), cfg, quantities=[1, 10]).hours_estimated)  # held constant
+
+    data = _input().model_dump(mode="json")
+    del data["process"]["print_hours"]
+    _, table = sweep_cad_quote(data, cfg, stl, quantities=[1, 10, 50])
+    assert all(table.hours_estimated) and {p for p, _ in table.combos} == set(cfg.printers)
+    for i, (printer, resin) in enumerate(table.combos):
+        for j, qty in enumerate(table.quantities):
+            single = json.loads(json.dumps(data))
+            single["process"].update(printer=printer, resin=resin, qty=qty)
+            priced, r, _ = price_quote(single, cfg, cad_file=stl)
+            assert table.sell_price[i, j] == r.sell_price
+            assert table.print_hours[i, j] == priced.process.print_hours
+            assert table.builds[i, j] == (priced.process.builds or 1)
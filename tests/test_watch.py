@@ -0,0 +1,82 @@
+import asyncio
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from conftest import CONFIG_PATH, INPUT_PATH, box_triangles, write_binary_stl
+from sla_quote.watch import QuoteFolderWatcher
+from sla_quote.workers import QuotePool
+
+
+@pytest.fixture
+def watcher(tmp_path, server_env):
+    config = shutil.copy(CONFIG_PATH, tmp_path / "config.yaml")
+    pool = QuotePool(kind="thread", workers=2)
+    w = QuoteFolderWatcher(
+        tmp_path / "inbox", config, pool=pool, settle=0.0, poll_interval=0.05, use_notify=False, log=lambda _: None
+    )
+    w.inbox.mkdir()
+    yield w
+    pool.shutdown()
+
+
+def _drop(inbox: Path, name: str, quote_id: str) -> Path:
+    data = json.loads(INPUT_PATH.read_text(encoding="utf-8"))
+    data["quote_id"] = quote_id
+    path = inbox / name
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def test_once_quotes_inbox_and_sorts_inputs(watcher) -> None:
+    inbox = watcher.inbox
+    _drop(inbox, "part.json", "W-1")
+    write_binary_stl(inbox / "part.stl", box_triangles((20.0, 20.0, 20.0)))
+    (inbox / "broken.json").write_text("{not json", encoding="utf-8")
+    (inbox / "upload.json.part").write_text("{", encoding="utf-8")  # still being written
+
+    asyncio.run(watcher.run(once=True))
+
+    assert (watcher.processed, watcher.failed) == (1, 1)
+    assert sorted(p.name for p in (inbox / "done").iterdir()) == ["part.json", "part.stl"]
+    assert sorted(p.name for p in (inbox / "failed").iterdir()) == ["broken.error.txt", "broken.json"]
+    assert (inbox / "upload.json.part").exists()
+    out = sorted(p.name for p in watcher.out_dir.iterdir() if not p.name.startswith("."))
+    assert out == ["QUOTE-W-1.json", "QUOTE-W-1.pdf", "QUOTE-W-1.xlsx"]
+    assert not any((watcher.out_dir / ".staging").iterdir())
+    result = json.loads((watcher.out_dir / "QUOTE-W-1.json").read_text(encoding="utf-8"))
+    assert result["stl_volume_ml"] == pytest.approx(8.0)
+
+
+def test_watch_picks_up_new_files_and_holds_them_while_config_is_broken(watcher) -> None:
+    inbox = watcher.inbox
+    config = watcher.config_path
+    good = config.read_text(encoding="utf-8")
+
+    async def wait_for(path: Path) -> None:
+        for _ in range(200):
+            if path.exists():
+                return
+            await asyncio.sleep(0.025)
+        raise AssertionError(f"{path} never appeared")
+
+    async def scenario() -> None:
+        stop = asyncio.Event()
+        task = asyncio.ensure_future(watcher.run(stop))
+        _drop(inbox, "a.json", "W-A")
+        await wait_for(inbox / "done" / "a.json")
+
+        config.write_text(good + "\noops: [\n", encoding="utf-8")
+        _drop(inbox, "b.json", "W-B")
+        await asyncio.sleep(0.3)
+        assert (inbox / "b.json").exists()  # queued, not failed
+
+        config.write_text(good, encoding="utf-8")
+        await wait_for(inbox / "done" / "b.json")
+        stop.set()
+        await task
+
+    asyncio.run(scenario())
+    assert (watcher.processed, watcher.failed) == (2, 0)
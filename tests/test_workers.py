@@ -0,0 +1,52 @@
+import asyncio
+import threading
+
+import pytest
+
+from sla_quote.workers import PoolSaturated, QuotePool
+
+
+def test_pool_rejects_when_saturated() -> None:
+    """1 worker + 1 queued slot: the third concurrent job is shed, not queued."""
+    release = threading.Event()
+    pool = QuotePool(kind="thread", workers=1, max_queue=1)
+
+    async def scenario() -> None:
+        first = asyncio.ensure_future(pool.run(release.wait, 5))
+        second = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PoolSaturated):
+            await pool.run(release.wait, 5)
+        release.set()
+        assert await first is True and await second is True
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+    assert pool.stats()["rejected"] == 1
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_pool_wait_takes_the_next_free_place() -> None:
+    """run(wait=True) on a full pool waits for the running job to finish instead of being shed."""
+    release = threading.Event()
+    pool = QuotePool(kind="thread", workers=1, max_queue=0)
+
+    async def scenario() -> None:
+        first = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        waiting = asyncio.ensure_future(pool.run(lambda: "done", wait=True))
+        await asyncio.sleep(0.05)
+        assert not waiting.done()
+        release.set()
+        assert await first is True and await waiting == "done"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+
+    assert pool.stats()["rejected"] == 0
+    assert pool.stats()["in_flight"] == 0